@@ -16,6 +16,10 @@ class scpi (object):
         self.host    = host
         self.port    = port
         self.timeout = timeout
+        # data received from the socket but not yet consumed by rx_* methods
+        self._buffer = bytearray()
+        # exception raised while connecting, None if connected
+        self.error   = None
 
         try:
             self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -26,47 +30,100 @@ class scpi (object):
             self._socket.connect((host, port))
 
         except socket.error as e:
-            print('SCPI >> connect({:s}:{:d}) failed: {:s}'.format(host, port, e))
+            self.error = e
+            print('SCPI >> connect({:s}:{:d}) failed: {:s}'.format(host, port, str(e)))
+
+    @property
+    def connected(self):
+        """True if the connection was established and is not closed."""
+        return self.error is None and self._socket is not None
+
+    def _rx_fill(self, chunksize):
+        """Append a chunk of received data to the receive buffer."""
+        chunk = self._socket.recv(chunksize)
+        if not chunk:
+            raise socket.error('SCPI >> connection to {:s}:{:d} closed'.format(self.host, self.port))
+        self._buffer += chunk
 
     def rx_txt(self, chunksize = 4096):
         """Receive text string and return it after removing the delimiter."""
-        msg = ''
+        delimiter = self.delimiter.encode('utf-8')
+        start = 0
         while 1:
-            chunk = self._socket.recv(chunksize + len(self.delimiter)).decode('utf-8') # Receive chunk size of 2^n preferably
-            msg += chunk
-            if (len(chunk) and chunk[-2:] == self.delimiter):
+            end = self._buffer.find(delimiter, start)
+            if end >= 0:
                 break
-        return msg[:-2]
-
-    def rx_arb(self):
-        numOfBytes = 0
-        """ Recieve binary data from scpi server"""
-        str=''
-        while (len(str) != 1):
-            str = (self._socket.recv(1))
-        if not (str == '#'):
+            start = max(0, len(self._buffer) - len(delimiter) + 1)
+            self._rx_fill(chunksize + len(delimiter)) # Receive chunk size of 2^n preferably
+        msg = self._buffer[:end].decode('utf-8')
+        del self._buffer[:end + len(delimiter)]
+        return msg
+
+    def rx_arb(self, chunksize = 4096):
+        """Receive binary data block from scpi server.
+        The block payload is returned as a bytearray, the header and
+        the trailing delimiter are removed.
+        """
+        while len(self._buffer) < 2:
+            self._rx_fill(chunksize)
+        if self._buffer[0:1] != b'#':
             return False
-        str=''
-        while (len(str) != 1):
-            str = (self._socket.recv(1))
-        numOfNumBytes = int(str)
+        numOfNumBytes = int(self._buffer[1:2])
         if not (numOfNumBytes > 0):
             return False
-        str=''
-        while (len(str) != numOfNumBytes):
-            str += (self._socket.recv(1))
-        numOfBytes = int(str)
-        str=''
-        while (len(str) != numOfBytes):
-            str += (self._socket.recv(1))
-        return str
+        while len(self._buffer) < 2 + numOfNumBytes:
+            self._rx_fill(chunksize)
+        numOfBytes = int(self._buffer[2:2 + numOfNumBytes])
+        del self._buffer[:2 + numOfNumBytes]
+
+        # copy the already buffered part, read the rest directly into place
+        data = bytearray(numOfBytes)
+        view = memoryview(data)
+        size = min(numOfBytes, len(self._buffer))
+        view[:size] = self._buffer[:size]
+        del self._buffer[:size]
+        while size < numOfBytes:
+            n = self._socket.recv_into(view[size:])
+            if not n:
+                raise socket.error('SCPI >> connection to {:s}:{:d} closed'.format(self.host, self.port))
+            size += n
+
+        # remove the delimiter terminating the response
+        delimiter = self.delimiter.encode('utf-8')
+        while len(self._buffer) < len(delimiter):
+            self._rx_fill(chunksize)
+        if self._buffer.startswith(delimiter):
+            del self._buffer[:len(delimiter)]
+        return data
 
     def tx_txt(self, msg):
         """Send text string ending and append delimiter."""
-        return self._socket.send((msg + self.delimiter).encode('utf-8'))
+        return self._socket.sendall((msg + self.delimiter).encode('utf-8'))
+
+    def tx_batch(self, msgs):
+        """Send a sequence of text strings with a single socket write."""
+        return self.tx_raw(''.join(msg + self.delimiter for msg in msgs).encode('utf-8'))
+
+    def tx_raw(self, data):
+        """Send already encoded bytes, each command ending with the delimiter."""
+        return self._socket.sendall(data)
+
+    def set_nodelay(self, enable=True):
+        """Send small writes at once instead of coalescing them (TCP_NODELAY)."""
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(enable))
+
+    def txrx_txt(self, msg):
+        """Send text string and return the response."""
+        self.tx_txt(msg)
+        return self.rx_txt()
 
     def close(self):
-        """Close IP connection."""
+        """Close IP connection, receives blocked in other threads return."""
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
         self.__del__()
 
     def __del__(self):
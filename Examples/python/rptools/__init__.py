@@ -0,0 +1,5 @@
+"""Tools built on top of the Red Pitaya SCPI client.
+
+Submodules are not imported here, so command line tools importing
+this package stay fast to start.
+"""
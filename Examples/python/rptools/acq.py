@@ -0,0 +1,90 @@
+"""Acquisition helpers shared by the SCPI tools.
+
+The module deliberately depends only on the standard library,
+so command line tools using it start quickly.
+"""
+
+import array
+import sys
+import time
+
+BUFF_SIZE  = 16384
+DECIMATION = (1, 8, 64, 1024, 8192, 65536)
+FS         = 125000000
+
+# byte order of binary data sent by the SCPI server
+DTYPE = {'RAW': '>i2', 'VOLTS': '>f4'}
+
+
+def configure(rp_s, decimation=1, level=None, delay=None, units='RAW', averaging=None):
+    """Configure acquisition with a single batch of commands."""
+    cmds = ['ACQ:RST',
+            'ACQ:DATA:FORMAT BIN',
+            'ACQ:DATA:UNITS ' + units,
+            'ACQ:DEC ' + str(decimation)]
+    if averaging is not None:
+        cmds.append('ACQ:AVG ' + ('ON' if averaging else 'OFF'))
+    if level is not None:
+        cmds.append('ACQ:TRIG:LEV ' + str(level))
+    if delay is not None:
+        cmds.append('ACQ:TRIG:DLY ' + str(delay))
+    rp_s.tx_batch(cmds)
+
+
+def arm(rp_s, trigger='NOW'):
+    """Start acquisition and set the trigger source."""
+    rp_s.tx_batch(['ACQ:START', 'ACQ:TRIG ' + trigger])
+
+
+def wait_trigger(rp_s, timeout=None, poll=0.0):
+    """Poll trigger status until the trigger is detected.
+    Returns False if timeout (in seconds) expires first.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while 1:
+        if rp_s.txrx_txt('ACQ:TRIG:STAT?') == 'TD':
+            return True
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        if poll:
+            time.sleep(poll)
+
+
+def data_cmds(channel, start=None, size=None):
+    """Return the data queries for the whole buffer or a sample range.
+    The server does not wrap ranged reads around the end of the buffer
+    (it overruns its reply buffer), so such ranges are split into two
+    queries. Replies are joined with rx_data().
+    """
+    if start is None:
+        return ['ACQ:SOUR{:d}:DATA?'.format(channel)]
+    if not 0 < size <= BUFF_SIZE:
+        raise ValueError('data range of {:d} samples does not fit into the buffer'.format(size))
+    start %= BUFF_SIZE
+    first = min(size, BUFF_SIZE - start)
+    cmds = ['ACQ:SOUR{:d}:DATA:STA:N? {:d},{:d}'.format(channel, start, first)]
+    if first < size:
+        cmds.append('ACQ:SOUR{:d}:DATA:STA:N? 0,{:d}'.format(channel, size - first))
+    return cmds
+
+
+def rx_data(rp_s, cmds):
+    """Receive the replies of data queries returned by data_cmds() as one block."""
+    blocks = [rp_s.rx_arb() for cmd in cmds]
+    return blocks[0] if len(blocks) == 1 else b''.join(blocks)
+
+
+def read_data(rp_s, channels, start=None, size=None):
+    """Query data of all channels in a single batch and return binary blocks."""
+    cmds = [data_cmds(ch, start, size) for ch in channels]
+    rp_s.tx_batch([cmd for c in cmds for cmd in c])
+    return [rx_data(rp_s, c) for c in cmds]
+
+
+def to_native(block, units='RAW'):
+    """Convert a binary block to an array in native byte order."""
+    buff = array.array('h' if units == 'RAW' else 'f')
+    buff.frombytes(block)
+    if sys.byteorder == 'little':
+        buff.byteswap()
+    return buff
@@ -0,0 +1,207 @@
+"""Compressed archive of RAW captures.
+
+Captures (frames) of equal shape are grouped into chunks, each chunk is
+filtered and compressed independently. Filters are a sample delta along
+the last axis, which turns slowly varying signals into small numbers,
+and a byte shuffle, which puts the mostly constant high bytes together.
+A chunk index at the end of the file gives direct access to any frame.
+
+File layout:
+    magic, header length (uint32), JSON header
+    compressed chunks
+    index, (offset, size, frames) uint64 per chunk
+    index offset (uint64), magic
+"""
+
+import bz2
+import collections
+import concurrent.futures
+import json
+import lzma
+import os
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b'RPARC001'
+
+
+def _codec(name, level=None):
+    """Return (compress, decompress) functions of a codec."""
+    if name == 'zlib':
+        level = 6 if level is None else level
+        return (lambda b: zlib.compress(b, level)), zlib.decompress
+    if name == 'lzma':
+        preset = 6 if level is None else level
+        return (lambda b: lzma.compress(b, preset=preset)), lzma.decompress
+    if name == 'bz2':
+        level = 9 if level is None else level
+        return (lambda b: bz2.compress(b, level)), bz2.decompress
+    if name == 'zstd':
+        import zstandard
+        c = zstandard.ZstdCompressor(level=3 if level is None else level)
+        d = zstandard.ZstdDecompressor()
+        return c.compress, d.decompress
+    if name == 'lz4':
+        import lz4.frame
+        level = 0 if level is None else level
+        return (lambda b: lz4.frame.compress(b, compression_level=level)), lz4.frame.decompress
+    raise ValueError('unknown codec {!r}'.format(name))
+
+
+def encode(data, filters):
+    """Apply filters to an int16 array, return little endian bytes."""
+    data = np.ascontiguousarray(data, dtype=np.int16)
+    if 'delta' in filters:
+        # differences wrap around in int16, cumsum in decode() wraps back
+        data = np.diff(data, axis=-1, prepend=np.int16(0))
+    # the header declares '<i2', the shuffle splits bytes in that order
+    data = data.astype('<i2', copy=False)
+    if 'shuffle' in filters:
+        return data.view(np.uint8).reshape(-1, 2).T.tobytes()
+    return data.tobytes()
+
+
+def decode(buf, shape, filters):
+    """Invert encode(), returns native int16."""
+    if 'shuffle' in filters:
+        data = np.frombuffer(buf, dtype=np.uint8).reshape(2, -1).T.copy().view('<i2')
+    else:
+        data = np.frombuffer(buf, dtype='<i2')
+    data = data.astype(np.int16).reshape(shape)
+    if 'delta' in filters:
+        np.cumsum(data, axis=-1, dtype=np.int16, out=data)
+    return data
+
+
+class Writer(object):
+    """Append frames to an archive, chunks are compressed in a thread pool."""
+
+    def __init__(self, path, shape, codec='zlib', level=None, filters=('delta', 'shuffle'),
+                 chunk=16, workers=None):
+        """`shape` is the shape of one frame, `chunk` the number of frames per chunk."""
+        self.shape     = tuple(shape)
+        self.chunk     = chunk
+        self.filters   = tuple(filters)
+        self._compress = _codec(codec, level)[0]
+        header = json.dumps({'shape': self.shape, 'dtype': '<i2', 'codec': codec,
+                             'filters': self.filters, 'chunk': chunk}).encode()
+        self._f = open(path, 'wb')
+        self._f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        self.workers  = workers or os.cpu_count() or 1
+        self._pool    = concurrent.futures.ThreadPoolExecutor(self.workers)
+        self._pending = collections.deque()
+        self._buffer  = []
+        self._index   = []
+        self.frames   = 0
+
+    def _work(self, frames):
+        return self._compress(encode(frames, self.filters)), len(frames)
+
+    def _flush(self, wait=False):
+        """Write compressed chunks in order, as far as they are done."""
+        while self._pending and (wait or self._pending[0].done()):
+            data, count = self._pending.popleft().result()
+            self._index.append((self._f.tell(), len(data), count))
+            self._f.write(data)
+
+    def _submit(self):
+        frames = np.array(self._buffer, dtype=np.int16)
+        self._buffer = []
+        self._pending.append(self._pool.submit(self._work, frames))
+        # bound memory held by queued chunks
+        if len(self._pending) > 2 * self.workers:
+            self._flush(wait=True)
+        self._flush()
+
+    def write(self, frames):
+        """Append a frame or a batch of frames shaped (n,) + shape."""
+        frames = np.asarray(frames)
+        if frames.shape == self.shape:
+            frames = frames[None]
+        if frames.shape[1:] != self.shape:
+            raise ValueError('frame shape {} does not match archive shape {}'.format(frames.shape[1:], self.shape))
+        for frame in frames:
+            self._buffer.append(frame)
+            if len(self._buffer) == self.chunk:
+                self._submit()
+        self.frames += len(frames)
+
+    def close(self):
+        """Compress remaining frames and write the index."""
+        if self._buffer:
+            self._submit()
+        self._flush(wait=True)
+        self._pool.shutdown()
+        offset = self._f.tell()
+        self._f.write(np.array(self._index, dtype='<u8').tobytes())
+        self._f.write(struct.pack('<Q', offset) + MAGIC)
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Reader(object):
+    """Random access to frames of an archive."""
+
+    def __init__(self, path):
+        self._f = open(path, 'rb')
+        if self._f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a capture archive'.format(path))
+        size, = struct.unpack('<I', self._f.read(4))
+        header = json.loads(self._f.read(size).decode())
+        self.shape   = tuple(header['shape'])
+        self.chunk   = header['chunk']
+        self.filters = tuple(header['filters'])
+        self._decompress = _codec(header['codec'])[1]
+        self._f.seek(-8 - len(MAGIC), os.SEEK_END)
+        end = self._f.tell()
+        offset, = struct.unpack('<Q', self._f.read(8))
+        if self._f.read() != MAGIC:
+            raise ValueError('{} is truncated'.format(path))
+        self._f.seek(offset)
+        self._index = np.frombuffer(self._f.read(end - offset), dtype='<u8').reshape(-1, 3)
+        self._cached = (None, None)
+        self.frames = int(self._index[:, 2].sum()) if len(self._index) else 0
+
+    def __len__(self):
+        return self.frames
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_chunk(self, k):
+        """Frames of chunk `k` shaped (n,) + shape."""
+        if self._cached[0] == k:
+            return self._cached[1]
+        offset, size, count = (int(v) for v in self._index[k])
+        self._f.seek(offset)
+        frames = decode(self._decompress(self._f.read(size)), (count,) + self.shape, self.filters)
+        self._cached = (k, frames)
+        return frames
+
+    def __getitem__(self, i):
+        """Frame `i`, only its chunk is read and decompressed."""
+        n = self.frames
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('frame index out of range')
+        # all chunks but the last hold `chunk` frames
+        return self.read_chunk(i // self.chunk)[i % self.chunk]
+
+    def __iter__(self):
+        for k in range(len(self._index)):
+            for frame in self.read_chunk(k):
+                yield frame
@@ -0,0 +1,91 @@
+"""Frequency response (Bode) measurement.
+
+The generator output is swept over a list of frequencies, CH1 measures
+the stimulus and CH2 the response of the device under test. Settings for
+the next point are sent together with the data queries of the current
+point, so the board settles while the previous capture is processed.
+"""
+
+import functools
+import time
+
+import numpy as np
+
+from rptools import acq
+
+
+def plan_point(freq, cycles=10, size=acq.BUFF_SIZE):
+    """Return decimation and the number of samples holding an integer number of periods.
+    The smallest decimation providing at least `cycles` periods in `size` samples is used.
+    """
+    for dec in acq.DECIMATION:
+        periods = int(size * dec * freq / acq.FS)
+        if periods >= cycles:
+            break
+    if periods < 1:
+        raise ValueError('frequency {:g} Hz is too low for the acquisition buffer'.format(freq))
+    n = int(round(periods * acq.FS / (dec * freq)))
+    return dec, min(n, size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _kernel(freq, dec, n):
+    """Single bin DFT kernel for the given frequency."""
+    return np.exp(-2j * np.pi * freq * dec / acq.FS * np.arange(n))
+
+
+def response(data, freq, dec):
+    """Return gain and phase (degrees) of channel 2 relative to channel 1.
+    `data` is an array of shape (2, n) or (captures, 2, n).
+    """
+    data = np.asarray(data)
+    bins = data @ _kernel(float(freq), dec, data.shape[-1])
+    h = bins[..., 1] / bins[..., 0]
+    return np.abs(h), np.degrees(np.angle(h))
+
+
+def sweep(rp_s, frequencies, amplitude=0.5, source=1, cycles=10, settle=0.001):
+    """Measure frequency response at the listed frequencies.
+
+    Returns arrays of frequencies, gains and phases (degrees).
+    After each frequency change the acquisition buffer is filled
+    for `settle` seconds plus its own length before triggering.
+    """
+    freqs = np.asarray(frequencies, dtype=float)
+    plans = [plan_point(f, cycles) for f in freqs]
+    gain  = np.empty(len(freqs))
+    phase = np.empty(len(freqs))
+
+    sour = 'SOUR{:d}:'.format(source)
+    acq.configure(rp_s, plans[0][0], delay=-acq.BUFF_SIZE//2, units='RAW')
+    rp_s.tx_batch([sour + 'FUNC SINE',
+                   sour + 'VOLT ' + repr(float(amplitude)),
+                   'OUTPUT{:d}:STATE ON'.format(source)])
+
+    def setup(i):
+        return [sour + 'FREQ:FIX ' + repr(float(freqs[i])),
+                'ACQ:DEC {:d}'.format(plans[i][0]),
+                'ACQ:START']
+
+    rp_s.tx_batch(setup(0))
+    armed = time.monotonic()
+    for i, (dec, n) in enumerate(plans):
+        # the whole buffer has to be written with the new frequency
+        wait = armed + settle + acq.BUFF_SIZE * dec / acq.FS - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        rp_s.tx_txt('ACQ:TRIG NOW')
+        acq.wait_trigger(rp_s)
+
+        # zero post trigger delay, the latest samples end at the trigger
+        cmds = ['ACQ:SOUR{:d}:DATA:LAT:N? {:d}'.format(ch, n) for ch in (1, 2)]
+        if i + 1 < len(plans):
+            cmds += setup(i + 1)
+        rp_s.tx_batch(cmds)
+        blocks = [rp_s.rx_arb() for ch in (1, 2)]
+        armed = time.monotonic()
+
+        data = np.frombuffer(b''.join(blocks), dtype=acq.DTYPE['RAW']).reshape(2, n)
+        gain[i], phase[i] = response(data.astype(np.float64), freqs[i], dec)
+
+    return freqs, gain, phase
@@ -0,0 +1,138 @@
+"""Client side conversion of RAW samples to volts.
+
+Transferring RAW samples halves the binary payload compared to VOLTS
+and leaves the conversion to the client. The server already removes
+the front end DC offset from RAW samples (acq_GetDataRaw()), the
+conversion only applies the scale of acq_GetDataV() in rpbase:
+
+    volts = raw * gain_v / 8192 * full_scale[gain][channel] / (20 / gain_v)
+
+where gain_v is 1 V (LV) or 20 V (HV) and the full scale is the EEPROM
+calibration parameter of the gain (calib_GetFrontEndScale()).
+Parameters are read once per board (over ssh or from an EEPROM dump)
+and cached as JSON files.
+"""
+
+import json
+import os
+import struct
+import subprocess
+
+import numpy as np
+
+from rptools import acq
+
+EEPROM       = '/sys/bus/i2c/devices/0-0050/eeprom'
+EEPROM_OFFS  = 0x0008
+CALIB_MAGIC  = 0xAABBCCDD
+ADC_COUNTS   = 8192
+FULL_SCALE   = 20.0
+CACHE        = os.path.join(os.path.expanduser('~'), '.cache', 'redpitaya')
+
+# rp_calib_params_t
+PARAMS = struct.Struct('<4I2i2I2iI2i')
+
+GAIN = {'LV': 0, 'HV': 1}
+
+# maximal input voltage of a gain, as acq_GetGainV()
+GAIN_V = (1.0, 20.0)
+
+
+def full_scale_to_voltage(cnt):
+    """Same as cmn_CalibFullScaleToVoltage(), rounded to float."""
+    return float(np.float32(float(np.float32(cnt)) * 100.0 / (1 << 32))) if cnt else 1.0
+
+
+class Calibration(object):
+    """Front end calibration parameters of one board."""
+
+    def __init__(self, fe_fs_g_hi, fe_fs_g_lo, fe_lo_offs, fe_hi_offs, be_fs=(0, 0), be_dc_offs=(0, 0),
+                 magic=CALIB_MAGIC):
+        """Fields of rp_calib_params_t, per channel."""
+        self.fe_fs_g_hi = list(fe_fs_g_hi)
+        self.fe_fs_g_lo = list(fe_fs_g_lo)
+        self.fe_lo_offs = list(fe_lo_offs)
+        self.fe_hi_offs = list(fe_hi_offs)
+        self.be_fs      = list(be_fs)
+        self.be_dc_offs = list(be_dc_offs)
+        self.magic      = magic
+
+    @classmethod
+    def parse(cls, buf, offset=EEPROM_OFFS):
+        """Parse rp_calib_params_t from EEPROM contents."""
+        v = PARAMS.unpack_from(buf, offset)
+        fe_lo_offs, fe_hi_offs = v[4:6], v[11:13]
+        # EEPROMs written before high gain offsets were added
+        if v[10] != CALIB_MAGIC:
+            fe_hi_offs = fe_lo_offs
+        return cls(v[0:2], v[2:4], fe_lo_offs, fe_hi_offs, v[6:8], v[8:10], v[10])
+
+    @classmethod
+    def fetch(cls, host, user='root'):
+        """Read the EEPROM of a board over ssh."""
+        cmd = 'dd if={} bs={:d} count=1 2>/dev/null'.format(EEPROM, EEPROM_OFFS + PARAMS.size)
+        buf = subprocess.check_output(['ssh', '{}@{}'.format(user, host), cmd])
+        return cls.parse(buf)
+
+    def to_dict(self):
+        return dict((k, getattr(self, k)) for k in ('fe_fs_g_hi', 'fe_fs_g_lo', 'fe_lo_offs', 'fe_hi_offs',
+                                                      'be_fs', 'be_dc_offs', 'magic'))
+
+    def offset(self, channel, gain):
+        """Offset in ADC counts, `channel` is 1 or 2, `gain` 'LV' or 'HV'.
+        The server subtracts it from RAW and VOLTS data.
+        """
+        gain = GAIN.get(gain, gain)
+        return (self.fe_hi_offs if gain == 1 else self.fe_lo_offs)[channel - 1]
+
+    def scale(self, channel, gain):
+        """Full scale in volts, same as calib_GetFrontEndScale()."""
+        gain = GAIN.get(gain, gain)
+        return full_scale_to_voltage((self.fe_fs_g_hi if gain == 1 else self.fe_fs_g_lo)[channel - 1])
+
+    def coefficient(self, channel, gain):
+        """Return volts per RAW count, as acq_GetDataV()."""
+        gain_v = GAIN_V[GAIN.get(gain, gain)]
+        return gain_v / ADC_COUNTS * self.scale(channel, gain) / (FULL_SCALE / gain_v)
+
+    def to_volts(self, raw, channel, gain, out=None):
+        """Convert RAW samples of any byte order to float32 volts."""
+        raw = np.asarray(raw)
+        if out is None:
+            out = np.empty(raw.shape, dtype=np.float32)
+        return np.multiply(raw, self.coefficient(channel, gain), out=out, casting='unsafe')
+
+
+def load(host, cache=CACHE, fetch=True):
+    """Calibration of a board, from the cache or fetched over ssh and cached."""
+    path = os.path.join(cache, 'calib-{}.json'.format(host))
+    if os.path.exists(path):
+        with open(path) as f:
+            params = json.load(f)
+        # caches of older versions held the full scales in another layout
+        if 'fe_fs_g_hi' in params:
+            return Calibration(**params)
+    if not fetch:
+        raise IOError('no cached calibration for {}'.format(host))
+    calibration = Calibration.fetch(host)
+    if not os.path.isdir(cache):
+        os.makedirs(cache)
+    with open(path, 'w') as f:
+        json.dump(calibration.to_dict(), f)
+    return calibration
+
+
+def read_volts(rp_s, calibration, channels, start=None, size=None):
+    """Read RAW data and gains of channels in one batch, return volts.
+    Acquisition has to be configured with RAW units and BIN format.
+    Returns a float32 array shaped (channels, samples).
+    """
+    data = [acq.data_cmds(ch, start, size) for ch in channels]
+    cmds = ['ACQ:SOUR{:d}:GAIN?'.format(ch) for ch in channels]
+    rp_s.tx_batch(cmds + [cmd for c in data for cmd in c])
+    gains = [rp_s.rx_txt().strip().upper() for ch in channels]
+    blocks = [np.frombuffer(acq.rx_data(rp_s, c), dtype=acq.DTYPE['RAW']) for c in data]
+    out = np.empty((len(channels), len(blocks[0]) if blocks else 0), dtype=np.float32)
+    for i, (ch, gain, block) in enumerate(zip(channels, gains, blocks)):
+        calibration.to_volts(block, ch, gain, out=out[i])
+    return out
@@ -0,0 +1,285 @@
+"""Command line tools for Red Pitaya SCPI access.
+
+Entry points are kept light: only the socket client and argparse are
+imported at startup, plotting libraries are loaded only on request.
+"""
+
+import argparse
+import struct
+import sys
+
+import redpitaya_scpi as scpi
+from rptools import acq
+
+
+def npy_header(shape, descr):
+    """Return a NPY version 1.0 header for a C ordered array."""
+    header = "{{'descr': '{:s}', 'fortran_order': False, 'shape': {!r}, }}".format(descr, tuple(shape))
+    # total header length must be a multiple of 64 bytes
+    pad = 63 - (10 + len(header)) % 64
+    header = header + ' ' * pad + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def _connect(args):
+    rp_s = scpi.scpi(args.host, timeout=args.timeout, port=args.port)
+    if not rp_s.connected:
+        # the client already reported the failed connection
+        sys.exit(1)
+    if args.trace is not None:
+        from rptools import trace
+        trace.record(rp_s, args.trace)
+    return rp_s
+
+
+def _common(parser):
+    parser.add_argument('host', help='Red Pitaya IP address or host name')
+    parser.add_argument('--port', type=int, default=5000, help='SCPI server port')
+    parser.add_argument('--timeout', type=float, default=None, help='socket and trigger timeout in seconds')
+    parser.add_argument('--trace', default=None, help='record the SCPI session into a trace file')
+
+
+def acquire_main(argv=None):
+    """Acquire captures and write them to a NPY file or to stdout."""
+    parser = argparse.ArgumentParser(prog='rp-acquire', description=acquire_main.__doc__)
+    _common(parser)
+    parser.add_argument('-c', '--channel', type=int, nargs='+', default=[1], choices=(1, 2), help='input channels')
+    parser.add_argument('-d', '--decimation', type=int, default=1, choices=acq.DECIMATION)
+    parser.add_argument('-t', '--trigger', default='NOW', help='trigger source (NOW, CH1_PE, EXT_NE, ...)')
+    parser.add_argument('-l', '--level', type=float, default=None, help='trigger level in V')
+    parser.add_argument('--delay', type=int, default=None, help='trigger delay in samples')
+    parser.add_argument('-n', '--count', type=int, default=1, help='number of captures')
+    parser.add_argument('-s', '--start', type=int, default=None, help='first sample relative to the trigger')
+    parser.add_argument('-N', '--size', type=int, default=acq.BUFF_SIZE, help='number of samples per capture')
+    parser.add_argument('--volts', action='store_true', help='convert RAW data to volts with the board calibration')
+    parser.add_argument('--calib-cache', default=None, help='directory with cached calibrations, ~/.cache/redpitaya by default')
+    parser.add_argument('-o', '--output', default='-', help='output .npy file, binary stdout if "-"')
+    parser.add_argument('--plot', action='store_true', help='plot the last capture')
+    args = parser.parse_args(argv)
+
+    channels = args.channel
+    size = min(args.size, acq.BUFF_SIZE)
+    ranged = args.start is not None or size != acq.BUFF_SIZE
+
+    calibration = None
+    descr = acq.DTYPE['RAW']
+    if args.volts:
+        # RAW halves the transfer, samples are converted here (native float32)
+        import subprocess
+        from rptools import calib
+        try:
+            calibration = calib.load(args.host, args.calib_cache or calib.CACHE)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print('rp-acquire: no calibration for {:s}: {!s}'.format(args.host, e), file=sys.stderr)
+            sys.exit(1)
+        descr = '<f4' if sys.byteorder == 'little' else '>f4'
+
+    rp_s = _connect(args)
+    acq.configure(rp_s, args.decimation, level=args.level, delay=args.delay, units='RAW')
+
+    if args.output == '-':
+        out = sys.stdout.buffer
+    else:
+        out = open(args.output, 'wb')
+        out.write(npy_header((args.count, len(channels), size), descr))
+
+    try:
+        for i in range(args.count):
+            acq.arm(rp_s, args.trigger)
+            if not acq.wait_trigger(rp_s, args.timeout):
+                print('rp-acquire: no trigger in {:g}s, {:d} captures written'.format(args.timeout, i), file=sys.stderr)
+                if out is not sys.stdout.buffer:
+                    # keep the file readable, with the captures written so far
+                    header = npy_header((i, len(channels), size), descr)
+                    if len(header) == len(npy_header((args.count, len(channels), size), descr)):
+                        out.seek(0)
+                        out.write(header)
+                sys.exit(1)
+            start, count = None, None
+            if ranged:
+                start = int(rp_s.txrx_txt('ACQ:TPOS?')) + (args.start or 0)
+                count = size
+            if calibration is not None:
+                blocks = calib.read_volts(rp_s, calibration, channels, start, count)
+                out.write(blocks.tobytes())
+                continue
+            blocks = acq.read_data(rp_s, channels, start, count)
+            for block in blocks:
+                if out is sys.stdout.buffer:
+                    # native byte order is more convenient in pipelines
+                    acq.to_native(block).tofile(out)
+                else:
+                    out.write(block)
+        out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        rp_s.close()
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        for ch, block in zip(channels, blocks):
+            plt.plot(block if calibration is not None else acq.to_native(block), label='CH{:d}'.format(ch))
+        plt.ylabel('Voltage' if args.volts else 'RAW')
+        plt.legend()
+        plt.show()
+
+
+def generate_main(argv=None):
+    """Configure the signal generator with a single batch of commands."""
+    parser = argparse.ArgumentParser(prog='rp-generate', description=generate_main.__doc__)
+    _common(parser)
+    parser.add_argument('-c', '--channel', type=int, default=1, choices=(1, 2), help='output channel')
+    parser.add_argument('-w', '--waveform', default=None, help='SINE, SQUARE, TRIANGLE, SAWU, SAWD, PWM, ARBITRARY')
+    parser.add_argument('-f', '--frequency', type=float, default=None, help='frequency in Hz')
+    parser.add_argument('-a', '--amplitude', type=float, default=None, help='amplitude in V')
+    parser.add_argument('--offset', type=float, default=None, help='offset in V')
+    parser.add_argument('--phase', type=float, default=None, help='phase in degrees')
+    parser.add_argument('--dcyc', type=float, default=None, help='duty cycle for PWM')
+    parser.add_argument('--arb', default=None, help='text file with arbitrary waveform samples, "-" for stdin')
+    parser.add_argument('--ncyc', type=int, default=None, help='burst mode: number of cycles per burst')
+    parser.add_argument('--nor', type=int, default=None, help='burst mode: number of repeated bursts')
+    parser.add_argument('--period', type=int, default=None, help='burst mode: burst period in us')
+    parser.add_argument('--trigger', default=None, help='trigger source (INT, EXT_PE, EXT_NE, GATED)')
+    parser.add_argument('--off', action='store_true', help='disable the output')
+    args = parser.parse_args(argv)
+
+    src = 'SOUR{:d}:'.format(args.channel)
+    cmds = []
+    if args.waveform is not None:
+        cmds.append(src + 'FUNC ' + args.waveform.upper())
+    if args.arb is not None:
+        text = sys.stdin.read() if args.arb == '-' else open(args.arb).read()
+        samples = text.replace(',', ' ').split()
+        cmds.append(src + 'TRAC:DATA:DATA ' + ','.join(samples))
+    if args.frequency is not None:
+        cmds.append(src + 'FREQ:FIX ' + repr(args.frequency))
+    # lower the amplitude before changing the offset, AMPL + OFFS <= |1V|
+    if args.amplitude is not None:
+        cmds.append(src + 'VOLT ' + repr(args.amplitude))
+    if args.offset is not None:
+        cmds.append(src + 'VOLT:OFFS ' + repr(args.offset))
+    if args.phase is not None:
+        cmds.append(src + 'PHAS ' + repr(args.phase))
+    if args.dcyc is not None:
+        cmds.append(src + 'DCYC ' + repr(args.dcyc))
+    if args.ncyc is not None or args.nor is not None or args.period is not None:
+        cmds.append(src + 'BURS:STAT BURST')
+    if args.ncyc is not None:
+        cmds.append(src + 'BURS:NCYC ' + str(args.ncyc))
+    if args.nor is not None:
+        cmds.append(src + 'BURS:NOR ' + str(args.nor))
+    if args.period is not None:
+        cmds.append(src + 'BURS:INT:PER ' + str(args.period))
+    if args.trigger is not None:
+        cmds.append(src + 'TRIG:SOUR ' + args.trigger.upper())
+    cmds.append('OUTPUT{:d}:STATE {:s}'.format(args.channel, 'OFF' if args.off else 'ON'))
+
+    rp_s = _connect(args)
+    rp_s.tx_batch(cmds)
+    rp_s.close()
+
+
+def dio_main(argv=None):
+    """Set or query digital pins and LEDs.
+    Arguments like 'LED0=1' set a pin, arguments like 'DIO0_P' print its state.
+    """
+    parser = argparse.ArgumentParser(prog='rp-dio', description=dio_main.__doc__)
+    _common(parser)
+    parser.add_argument('pins', nargs='+', help='PIN=VALUE to set, PIN to query')
+    parser.add_argument('--dir', choices=('IN', 'OUT'), default=None, help='set direction of the listed pins first')
+    args = parser.parse_args(argv)
+
+    cmds = []
+    queries = []
+    for arg in args.pins:
+        pin, _, value = arg.partition('=')
+        pin = pin.upper()
+        if args.dir is not None and pin.startswith('DIO'):
+            cmds.append('DIG:PIN:DIR {:s},{:s}'.format(args.dir, pin))
+        if value:
+            cmds.append('DIG:PIN {:s},{:s}'.format(pin, value))
+        else:
+            cmds.append('DIG:PIN? ' + pin)
+            queries.append(pin)
+
+    rp_s = _connect(args)
+    rp_s.tx_batch(cmds)
+    for pin in queries:
+        print('{:s}={:s}'.format(pin, rp_s.rx_txt()))
+    rp_s.close()
+
+
+def replay_main(argv=None):
+    """Serve the replies of a recorded SCPI session."""
+    parser = argparse.ArgumentParser(prog='rp-replay', description=replay_main.__doc__)
+    parser.add_argument('trace', help='trace file recorded with --trace')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='port to listen on')
+    parser.add_argument('--timing', action='store_true', help='delay replies as in the recording')
+    args = parser.parse_args(argv)
+
+    from rptools import trace
+    server = trace.ReplayServer(args.trace, args.host, args.port, args.timing)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.mismatches:
+            print('{:d} queries did not match the trace'.format(server.mismatches), file=sys.stderr)
+
+
+def _mix(text):
+    """Parse 'query=10,data=1' into a dict of weights."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def soak_main(argv=None):
+    """Load the SCPI server with concurrent clients and report latency."""
+    parser = argparse.ArgumentParser(prog='rp-soak', description=soak_main.__doc__)
+    parser.add_argument('host', nargs='?', default=None, help='Red Pitaya IP address or host name, a local stand-in server if omitted')
+    parser.add_argument('--port', type=int, default=5000, help='SCPI server port')
+    parser.add_argument('--timeout', type=float, default=5.0, help='socket timeout in seconds')
+    parser.add_argument('-n', '--clients', type=int, default=4, help='number of concurrent clients')
+    parser.add_argument('-t', '--duration', type=float, default=10.0, help='run time in seconds')
+    parser.add_argument('-m', '--mix', type=_mix, default=None, help='operation weights, e.g. query=10,write=2,data=1,burst=1')
+    parser.add_argument('--think', type=float, default=0.0, help='mean pause between operations of a client in seconds')
+    parser.add_argument('-i', '--interval', type=float, default=None, help='report progress every interval seconds')
+    parser.add_argument('--per-client', action='store_true', help='also report each client')
+    args = parser.parse_args(argv)
+
+    from rptools import soak
+    server = None
+    if args.host is None:
+        server = soak.StandIn().start()
+        args.host, args.port = '127.0.0.1', server.port
+
+    def progress(s):
+        summary = s.summary()
+        print('{:8.1f}s {:10.1f} op/s {:12.0f} B/s {:d} errors {:d} timeouts'.format(
+            summary['elapsed'], summary['ops_per_s'], summary['bytes_per_s'],
+            summary['errors'], summary['timeouts']), file=sys.stderr)
+
+    run = soak.Soak(args.host, args.port, args.clients, args.mix, args.timeout, args.think)
+    try:
+        run.run(args.duration, args.interval, progress)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    for key, value in run.summary().items():
+        if isinstance(value, dict):
+            print('{:12s} n={:<8d} p50={:.6f}s p90={:.6f}s p99={:.6f}s max={:.6f}s'.format(
+                key, value['count'], value['p50'], value['p90'], value['p99'], value['max']))
+        else:
+            print('{:12s} {:g}'.format(key, value))
+    if args.per_client:
+        for i, row in enumerate(run.client_summary()):
+            print('client {:3d}   n={:<8d} p50={:.6f}s p99={:.6f}s errors={:d} timeouts={:d}'.format(
+                i, row['operations'], row['p50'], row['p99'], row['errors'], row['timeouts']))
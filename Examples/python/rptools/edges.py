@@ -0,0 +1,149 @@
+"""Edge index over long recordings.
+
+Recorded data is scanned once, chunk by chunk, and threshold crossings
+of each channel and level are stored as sorted sample positions.
+Queries for edges in a time window or pulses of a given width are then
+answered with binary searches instead of rescanning the samples.
+"""
+
+import numpy as np
+
+
+def _schmitt(x, lo, hi, state):
+    """Return positions and directions of state changes of a Schmitt trigger.
+    `state` is the trigger state (+1 high, -1 low, 0 unknown) before `x`.
+    """
+    s = np.zeros(len(x), dtype=np.int8)
+    s[x >= hi] = 1
+    s[x < lo] = -1
+    pos = np.flatnonzero(s)
+    val = s[pos]
+    prev = np.empty_like(val)
+    if len(val):
+        prev[0] = state
+        prev[1:] = val[:-1]
+    change = (val != prev) & (prev != 0)
+    last = val[-1] if len(val) else state
+    return pos[change], val[change], last
+
+
+class EdgeIndex(object):
+    """Sorted index of threshold crossings per channel and level."""
+
+    def __init__(self, levels, hysteresis=0.0, fs=1.0):
+        """Crossings of all `levels` are indexed for each channel.
+        A crossing is registered when the signal passes from below
+        level-hysteresis/2 to above level+hysteresis/2 or back.
+        Times in queries are in seconds for sample rate `fs`.
+        """
+        self.levels     = tuple(float(level) for level in levels)
+        self.hysteresis = np.broadcast_to(np.asarray(hysteresis, dtype=float), (len(self.levels),))
+        self.fs         = fs
+        self.length     = 0
+        self._state     = {}
+        self._chunks    = {}
+        self._index     = {}
+
+    def feed(self, data):
+        """Index a chunk of consecutive samples shaped (channels, samples)."""
+        x = np.atleast_2d(data)
+        for ch in range(x.shape[0]):
+            for level, hyst in zip(self.levels, self.hysteresis):
+                key = (ch, level)
+                pos, val, self._state[key] = _schmitt(x[ch], level - hyst / 2, level + hyst / 2,
+                                                      self._state.get(key, 0))
+                self._chunks.setdefault(key, []).append((pos + self.length, val))
+                # edges and pulses derived from the chunks are stale
+                for cached in (key, ('pulses', ch, level, True), ('pulses', ch, level, False)):
+                    self._index.pop(cached, None)
+        self.length += x.shape[1]
+        return self
+
+    def _get(self, channel, level):
+        """Rising and falling edge positions for a channel and level."""
+        key = (channel, float(level))
+        index = self._index.get(key)
+        if index is None:
+            chunks = self._chunks[key]
+            pos = np.concatenate([c[0] for c in chunks]).astype(np.int64)
+            val = np.concatenate([c[1] for c in chunks])
+            # keep the concatenated arrays as a single chunk
+            self._chunks[key] = [(pos, val)]
+            index = {True: pos[val > 0], False: pos[val < 0]}
+            self._index[key] = index
+        return index
+
+    def _range(self, positions, t0, t1):
+        lo = 0 if t0 is None else np.searchsorted(positions, t0 * self.fs, 'left')
+        hi = len(positions) if t1 is None else np.searchsorted(positions, t1 * self.fs, 'right')
+        return positions[lo:hi]
+
+    def edges(self, channel, level, rising=True, t0=None, t1=None):
+        """Sample positions of rising (or falling) edges between times t0 and t1."""
+        return self._range(self._get(channel, level)[rising], t0, t1)
+
+    def count(self, channel, level, rising=True, t0=None, t1=None):
+        """Number of edges between times t0 and t1."""
+        return len(self.edges(channel, level, rising, t0, t1))
+
+    def _pulses(self, channel, level, positive):
+        key = ('pulses', channel, float(level), positive)
+        pulses = self._index.get(key)
+        if pulses is None:
+            index = self._get(channel, level)
+            start, end = index[positive], index[not positive]
+            # each pulse ends at the first opposite edge after its start
+            stop = np.searchsorted(end, start, 'right')
+            valid = stop < len(end)
+            start = start[valid]
+            width = end[stop[valid]] - start
+            order = np.argsort(width, kind='stable')
+            pulses = (start[order], width[order])
+            self._index[key] = pulses
+        return pulses
+
+    def pulses(self, channel, level, positive=True, min_width=None, max_width=None):
+        """Return start positions and widths (samples) of pulses.
+        Width limits are in seconds, results are sorted by start position.
+        """
+        start, width = self._pulses(channel, level, positive)
+        lo = 0 if min_width is None else np.searchsorted(width, min_width * self.fs, 'left')
+        hi = len(width) if max_width is None else np.searchsorted(width, max_width * self.fs, 'right')
+        start, width = start[lo:hi], width[lo:hi]
+        order = np.argsort(start)
+        return start[order], width[order]
+
+    def save(self, path):
+        """Store the index into a compressed NPZ file.
+        The loaded index can be fed with the samples following the saved ones.
+        """
+        arrays = {'levels': np.array(self.levels), 'hysteresis': self.hysteresis,
+                  'fs': np.array(self.fs), 'length': np.array(self.length)}
+        for (ch, level) in list(self._chunks):
+            index = self._get(ch, level)
+            suffix = '_{:d}_{:d}'.format(ch, self.levels.index(level))
+            arrays['rise' + suffix] = index[True]
+            arrays['fall' + suffix] = index[False]
+            # trigger state after the last sample, feed() continues from it
+            arrays['state' + suffix] = np.array(self._state.get((ch, level), 0), dtype=np.int8)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index stored by save()."""
+        data = np.load(path)
+        self = cls(data['levels'], data['hysteresis'], float(data['fs']))
+        self.length = int(data['length'])
+        for name in data.files:
+            if name.startswith('rise_'):
+                ch, i = map(int, name.split('_')[1:])
+                rise, fall = data[name], data['fall' + name[4:]]
+                pos = np.concatenate((rise, fall))
+                val = np.concatenate((np.ones(len(rise), np.int8), -np.ones(len(fall), np.int8)))
+                order = np.argsort(pos, kind='stable')
+                key = (ch, self.levels[i])
+                self._chunks[key] = [(pos[order], val[order])]
+                self._index[key] = {True: rise, False: fall}
+                if 'state' + name[4:] in data.files:
+                    self._state[key] = int(data['state' + name[4:]])
+        return self
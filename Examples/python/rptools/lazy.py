@@ -0,0 +1,132 @@
+"""Lazy capture handles.
+
+A capture handle is returned as soon as the trigger is detected, it
+only records the write pointer positions. Samples are transferred when
+the handle is indexed, using ranged data queries. Fetched ranges are
+cached, requests for nearby ranges are merged into a single query.
+"""
+
+import time
+
+import numpy as np
+
+from rptools import acq
+
+
+class Acquisition(object):
+    """Acquisition producing LazyCapture handles."""
+
+    def __init__(self, rp_s, channels=(1, 2), decimation=1, level=None, delay=None, units='RAW', gap=256):
+        """Requests for missing ranges closer than `gap` samples are merged."""
+        self.rp_s       = rp_s
+        self.channels   = tuple(channels)
+        self.units      = units
+        self.gap        = gap
+        self.generation = 0
+        # time needed to write post trigger samples after the trigger is detected
+        self.post_time  = (acq.BUFF_SIZE//2 + (delay or 0)) * decimation / acq.FS
+        acq.configure(rp_s, decimation, level=level, delay=delay, units=units)
+
+    def arm(self, trigger='NOW'):
+        """Start a new acquisition, this invalidates previous capture handles."""
+        self.generation += 1
+        acq.arm(self.rp_s, trigger)
+
+    def capture(self, timeout=None):
+        """Wait for the trigger and return a capture handle."""
+        if not acq.wait_trigger(self.rp_s, timeout):
+            raise TimeoutError('SCPI >> no trigger in {:g}s'.format(timeout))
+        # TD is set at the trigger, the write pointer moves on until the delay expires
+        if self.post_time > 0.001:
+            time.sleep(self.post_time)
+        self.rp_s.tx_batch(['ACQ:WPOS?', 'ACQ:TPOS?'])
+        wpos = int(self.rp_s.rx_txt())
+        tpos = int(self.rp_s.rx_txt())
+        return LazyCapture(self, wpos, tpos)
+
+
+class LazyCapture(object):
+    """Capture with samples fetched on demand.
+
+    Indexing is `capture[channel, start:stop]`, samples are in the
+    same order as returned by ACQ:SOUR#:DATA? (oldest sample first).
+    """
+
+    def __init__(self, owner, wpos, tpos):
+        self._owner      = owner
+        self._generation = owner.generation
+        self.wpos        = wpos
+        self.tpos        = tpos
+        dtype = np.dtype(acq.DTYPE[owner.units]).newbyteorder('=')
+        self._data  = {ch: np.zeros(acq.BUFF_SIZE, dtype=dtype) for ch in owner.channels}
+        self._valid = {ch: np.zeros(acq.BUFF_SIZE, dtype=bool) for ch in owner.channels}
+
+    def __len__(self):
+        return acq.BUFF_SIZE
+
+    @property
+    def trigger(self):
+        """Index of the trigger sample."""
+        return (self.tpos - self.wpos - 1) % acq.BUFF_SIZE
+
+    @property
+    def stale(self):
+        """True if the board was re-armed after this capture."""
+        return self._owner.generation != self._generation
+
+    def _range(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(acq.BUFF_SIZE)
+            return start, max(start, stop), step
+        index = key + acq.BUFF_SIZE if key < 0 else key
+        if not 0 <= index < acq.BUFF_SIZE:
+            raise IndexError('sample index out of range')
+        return index, index + 1, None
+
+    def _merge(self, ranges):
+        """Sort ranges and merge those closer than gap samples."""
+        merged = []
+        for a, b in sorted(ranges):
+            if merged and a - merged[-1][1] < self._owner.gap:
+                merged[-1][1] = max(merged[-1][1], b)
+            else:
+                merged.append([a, b])
+        return merged
+
+    def _missing(self, channel, start, stop):
+        """Ranges within [start, stop) not fetched yet."""
+        valid = self._valid[channel][start:stop]
+        edges = np.flatnonzero(np.diff(np.concatenate(([True], valid, [True])).astype(np.int8)))
+        return (edges.reshape(-1, 2) + start).tolist()
+
+    def fetch(self, requests):
+        """Fetch several (channel, slice) requests with a single batch of queries."""
+        ranges = {}
+        for channel, key in requests:
+            start, stop, step = self._range(key)
+            ranges.setdefault(channel, []).append((start, stop))
+        queries = []
+        for channel in ranges:
+            missing = []
+            for a, b in self._merge(ranges[channel]):
+                missing += self._missing(channel, a, b)
+            queries += [(channel, a, b) for a, b in self._merge(missing)]
+        if not queries:
+            return
+        if self.stale:
+            raise RuntimeError('SCPI >> capture data was overwritten by a new acquisition')
+        rp_s = self._owner.rp_s
+        data = [acq.data_cmds(ch, self.wpos + 1 + a, b - a) for ch, a, b in queries]
+        rp_s.tx_batch([cmd for c in data for cmd in c])
+        for (ch, a, b), c in zip(queries, data):
+            block = np.frombuffer(acq.rx_data(rp_s, c), dtype=acq.DTYPE[self._owner.units])
+            self._data[ch][a:b] = block
+            self._valid[ch][a:b] = True
+
+    def __getitem__(self, key):
+        channel, key = key
+        self.fetch([(channel, key)])
+        start, stop, step = self._range(key)
+        if step is None:
+            return self._data[channel][start]
+        return self._data[channel][start:stop:step].copy()
@@ -0,0 +1,123 @@
+"""Lock-in (IQ) demodulation of acquired data.
+
+Blocks of consecutive samples are mixed with cached NCO tables and
+filtered by a decimating FIR low pass filter. The NCO phase and the
+filter history are kept between blocks, so a stream of captures is
+demodulated as if it was a single long signal.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lowpass_taps(decimation, taps_per_phase=8):
+    """Blackman windowed sinc low pass filter for the given decimation."""
+    n = decimation * taps_per_phase
+    t = np.arange(n) - (n - 1) / 2
+    h = np.sinc(t / decimation) * np.blackman(n)
+    return h / h.sum()
+
+
+def estimate_frequency(x, fs):
+    """Estimate the dominant frequency of a signal from its windowed spectrum."""
+    x = np.asarray(x, dtype=float)
+    spectrum = np.abs(np.fft.rfft((x - x.mean()) * np.hanning(len(x))))
+    k = int(np.argmax(spectrum[1:-1])) + 1
+    # parabolic interpolation of the log magnitude around the peak
+    a, b, c = np.log(spectrum[k-1:k+2] + 1e-300)
+    delta = 0.5 * (a - c) / (a - 2 * b + c)
+    return (k + delta) * fs / len(x)
+
+
+def polar(z):
+    """Return magnitude and phase (radians) of demodulated data."""
+    return np.abs(z), np.angle(z)
+
+
+class Demodulator(object):
+    """Streaming IQ demodulator for one or more harmonics of a reference frequency."""
+
+    def __init__(self, fs, freq, harmonics=(1,), decimation=64, taps=None, scale=1.0):
+        """Sample rate `fs` and reference frequency `freq` are in Hz.
+        The low pass cut-off is about fs/(2*decimation), it has to be
+        well below the reference frequency to reject the 2f products.
+        `scale` converts input samples (e.g. RAW counts) to volts.
+        """
+        self.fs         = fs
+        self.freq       = freq
+        self.harmonics  = np.atleast_1d(np.asarray(harmonics, dtype=float))
+        self.decimation = decimation
+        self.taps       = lowpass_taps(decimation) if taps is None else np.asarray(taps, dtype=float)
+        self.scale      = scale
+        # the factor 2 restores the amplitude of a real input signal
+        self._kernel    = 2 * scale * self.taps[::-1]
+        self._step      = 2 * np.pi * freq * self.harmonics / fs
+        self._table     = (0, None)
+        self._ref       = None
+        self.reset()
+
+    def reset(self):
+        """Clear NCO phase and filter history."""
+        self._phase   = np.zeros(len(self.harmonics))
+        self._history = np.zeros((len(self.harmonics), 0), dtype=complex)
+        self._offset  = 0
+        if self._ref is not None:
+            self._ref.reset()
+
+    def _nco(self, n):
+        """NCO table for a block of `n` samples starting at zero phase.
+        Only the table for the last block length is kept, streams of
+        equally sized blocks reuse it and varying sizes do not pile up.
+        """
+        size, table = self._table
+        if size != n:
+            table = np.exp(-1j * np.outer(self._step, np.arange(n)))
+            self._table = (n, table)
+        return table
+
+    def process(self, block, reference=None):
+        """Demodulate a block of samples.
+
+        Returns a complex array of shape (harmonics, outputs), the
+        real part is the I and the imaginary part the Q component.
+        If a `reference` signal block (e.g. CH2) is given, phases are
+        relative to the phase of its fundamental instead of the NCO,
+        outputs where the reference is silent keep the NCO phase.
+        """
+        x = np.asarray(block, dtype=float)
+        n = len(x)
+        rotation = np.exp(-1j * self._phase)
+        mixed = self._nco(n) * rotation[:, None] * x
+        self._phase = (self._phase + self._step * n) % (2 * np.pi)
+
+        data = np.concatenate((self._history, mixed), axis=1)
+        size = len(self._kernel)
+        starts = np.arange(self._offset, data.shape[1] - size + 1, self.decimation)
+        if len(starts):
+            z = sliding_window_view(data, size, axis=1)[:, starts] @ self._kernel
+            start = starts[-1] + self.decimation
+        else:
+            z = np.zeros((len(self.harmonics), 0), dtype=complex)
+            start = self._offset
+        keep = min(start, data.shape[1])
+        self._history = data[:, keep:]
+        self._offset  = start - keep
+
+        if reference is not None:
+            if self._ref is None:
+                self._ref = Demodulator(self.fs, self.freq, (1,), self.decimation, self.taps)
+            r = self._ref.process(reference)[0]
+            # a silent reference has no phase, keep the NCO phase there
+            mag = np.abs(r)
+            r = np.where(mag > 0, r / np.where(mag > 0, mag, 1), 1)
+            z = z * np.conj(r) ** self.harmonics[:, None]
+        return z
+
+    def stream(self, blocks, references=None):
+        """Demodulate an iterable of consecutive blocks, yield results per block."""
+        if references is None:
+            for block in blocks:
+                yield self.process(block)
+        else:
+            for block, reference in zip(blocks, references):
+                yield self.process(block, reference)
@@ -0,0 +1,139 @@
+"""Mask tests of captures.
+
+A mask consists of an upper and a lower limit line and keep-out
+regions, all given as vertices (time relative to the trigger in
+seconds, value) so the same mask applies at any decimation and trigger
+position. For a capture geometry the mask is compiled into per-sample
+bound arrays once and cached, batches of captures are then tested with
+a few array comparisons.
+
+Values are in the units of the captures (volts or RAW counts).
+"""
+
+import collections
+
+import numpy as np
+
+from rptools import acq
+
+Compiled = collections.namedtuple('Compiled', ['upper', 'lower', 'region_lo', 'region_hi'])
+
+Result = collections.namedtuple('Result', ['passed', 'first', 'count'])
+Result.__doc__ = """Mask test results per capture.
+passed -- True if no sample violates the mask
+first  -- index of the first violating sample, -1 if passed
+count  -- number of violating samples
+"""
+
+
+def _result(bad):
+    count = bad.sum(axis=1)
+    passed = count == 0
+    return Result(passed, np.where(passed, -1, bad.argmax(axis=1)), count)
+
+
+def _times(n, decimation, trigger):
+    """Sample times relative to the trigger sample."""
+    return (np.arange(n) - trigger) * (decimation / float(acq.FS))
+
+
+def _region(vertices, t):
+    """Keep-out interval of a polygon at times `t`.
+    The polygon has to be convex in the value direction (any vertical
+    line crosses it at most once), samples outside get an empty interval.
+    """
+    v = np.asarray(vertices, dtype=float)
+    a, b = v, np.roll(v, -1, axis=0)
+    t0, t1 = np.minimum(a[:, 0], b[:, 0])[:, None], np.maximum(a[:, 0], b[:, 0])[:, None]
+    cover = (t >= t0) & (t <= t1) & (t1 > t0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = a[:, 1:2] + (t - a[:, 0:1]) * ((b[:, 1] - a[:, 1]) / (b[:, 0] - a[:, 0]))[:, None]
+    lo = np.where(cover, y, np.inf).min(axis=0)
+    hi = np.where(cover, y, -np.inf).max(axis=0)
+    return lo, hi
+
+
+class Mask(object):
+    """Limit lines and keep-out regions."""
+
+    def __init__(self, upper=None, lower=None, regions=()):
+        """`upper` and `lower` are sequences of (time, value) vertices,
+        interpolated linearly and unbounded outside their time range.
+        `regions` is a sequence of polygons given by their vertices.
+        """
+        self.upper   = None if upper is None else np.asarray(upper, dtype=float)
+        self.lower   = None if lower is None else np.asarray(lower, dtype=float)
+        self.regions = [np.asarray(r, dtype=float) for r in regions]
+        self._cache  = {}
+
+    @classmethod
+    def from_samples(cls, upper=None, lower=None, decimation=1, trigger=0):
+        """Mask from per-sample bounds recorded at the given geometry."""
+        def line(bound):
+            if bound is None:
+                return None
+            bound = np.asarray(bound, dtype=float)
+            return np.column_stack((_times(len(bound), decimation, trigger), bound))
+        return cls(line(upper), line(lower))
+
+    def compile(self, n, decimation=1, trigger=0):
+        """Per-sample bounds for captures of `n` samples with the trigger at
+        sample `trigger`, cached per geometry.
+        """
+        key = (n, decimation, trigger)
+        compiled = self._cache.get(key)
+        if compiled is None:
+            t = _times(n, decimation, trigger)
+            upper = np.full(n, np.inf)
+            lower = np.full(n, -np.inf)
+            if self.upper is not None:
+                upper = np.interp(t, self.upper[:, 0], self.upper[:, 1], left=np.inf, right=np.inf)
+            if self.lower is not None:
+                lower = np.interp(t, self.lower[:, 0], self.lower[:, 1], left=-np.inf, right=-np.inf)
+            regions = [_region(r, t) for r in self.regions]
+            region_lo = np.array([r[0] for r in regions]).reshape(len(regions), n)
+            region_hi = np.array([r[1] for r in regions]).reshape(len(regions), n)
+            compiled = Compiled(upper, lower, region_lo, region_hi)
+            self._cache[key] = compiled
+        return compiled
+
+    def violations(self, captures, decimation=1, trigger=0):
+        """Bool array of violating samples, shaped like `captures`."""
+        captures = np.atleast_2d(captures)
+        c = self.compile(captures.shape[1], decimation, trigger)
+        bad = (captures > c.upper) | (captures < c.lower)
+        for lo, hi in zip(c.region_lo, c.region_hi):
+            bad |= (captures >= lo) & (captures <= hi)
+        return bad
+
+    def test(self, captures, decimation=1, trigger=0):
+        """Test a batch of captures shaped (n, samples), returns a Result."""
+        return _result(self.violations(captures, decimation, trigger))
+
+
+class Screen(object):
+    """Mask test with accumulated statistics over many batches."""
+
+    def __init__(self, mask):
+        self.mask   = mask
+        self.tested = 0
+        self.failed = 0
+        self.hits   = {}
+
+    def test(self, captures, decimation=1, trigger=0):
+        """Test a batch and update statistics, returns a Result."""
+        bad = self.mask.violations(captures, decimation, trigger)
+        result = _result(bad)
+        key = (bad.shape[1], decimation, trigger)
+        hits = self.hits.get(key)
+        if hits is None:
+            hits = self.hits[key] = np.zeros(bad.shape[1], dtype=np.int64)
+        hits += bad.sum(axis=0)
+        self.tested += len(bad)
+        self.failed += int(np.count_nonzero(~result.passed))
+        return result
+
+    @property
+    def pass_rate(self):
+        """Fraction of passed captures."""
+        return 1.0 - self.failed / float(self.tested) if self.tested else 1.0
@@ -0,0 +1,184 @@
+"""Oscilloscope measurements over batches of captures.
+
+All measurements are computed at once over the last axis of an array,
+typically shaped (captures, channels, samples). Results are arrays of
+the remaining shape. Measurements that are undefined for a capture
+(e.g. frequency of a DC signal) are NaN.
+"""
+
+import numpy as np
+
+MEASUREMENTS = ('vpp', 'min', 'max', 'mean', 'rms', 'top', 'base', 'amplitude',
+                'frequency', 'period', 'duty', 'rise', 'fall', 'overshoot', 'undershoot')
+
+
+def _crossings(x, level, rising=True):
+    """Boolean mask of level crossings between sample i and i+1."""
+    if rising:
+        return (x[..., :-1] < level) & (x[..., 1:] >= level)
+    else:
+        return (x[..., :-1] > level) & (x[..., 1:] <= level)
+
+
+def _first(mask):
+    """Index of the first true element along the last axis, -1 if none."""
+    idx = np.argmax(mask, axis=-1)
+    return np.where(mask.any(axis=-1), idx, -1)
+
+
+def _last(mask):
+    """Index of the last true element along the last axis, -1 if none."""
+    n = mask.shape[-1]
+    idx = n - 1 - np.argmax(mask[..., ::-1], axis=-1)
+    return np.where(mask.any(axis=-1), idx, -1)
+
+
+def _interpolate(x, idx, level):
+    """Fractional position of a crossing between samples idx and idx+1."""
+    safe = np.maximum(idx, 0)[..., None]
+    a = np.take_along_axis(x, safe, axis=-1)[..., 0]
+    b = np.take_along_axis(x, safe + 1, axis=-1)[..., 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pos = safe[..., 0] + (level - a) / (b - a)
+    return np.where(idx >= 0, pos, np.nan)
+
+
+def _transition(x, lo, hi, mid, rising):
+    """Duration in samples of the first rising or falling transition."""
+    start_level, end_level = (lo, hi) if rising else (hi, lo)
+    index = np.arange(x.shape[-1] - 1)
+    # the first edge passing the start level, ignoring a partial edge at the beginning
+    starts = _crossings(x, start_level[..., None], rising)
+    first = _first(starts)[..., None]
+    cross = _first(_crossings(x, mid[..., None], rising) & (index >= first) & (first >= 0))[..., None]
+    t_start = _last (starts & (index <= cross))
+    t_end   = _first(_crossings(x, end_level[..., None],   rising) & (index >= cross))
+    duration = _interpolate(x, t_end, end_level) - _interpolate(x, t_start, start_level)
+    return np.where((t_start >= 0) & (t_end >= 0), duration, np.nan)
+
+
+def _check(which):
+    """Return `which` as a tuple, raise ValueError for unknown measurements."""
+    which = MEASUREMENTS if which is None else tuple(which)
+    unknown = [key for key in which if key not in MEASUREMENTS]
+    if unknown:
+        raise ValueError('unknown measurements {}, choose from {}'.format(unknown, MEASUREMENTS))
+    return which
+
+
+def measure(data, fs=1.0, which=None):
+    """Compute scope measurements over the last axis of `data`.
+
+    `fs` is the sample rate, times and frequencies are returned in
+    seconds and Hz. `which` selects a subset of MEASUREMENTS,
+    by default all are computed. Returns a dictionary of arrays.
+    """
+    x = np.asarray(data, dtype=float)
+    which = _check(which)
+    n = x.shape[-1]
+    res = {}
+
+    vmin = x.min(axis=-1)
+    vmax = x.max(axis=-1)
+    mean = x.mean(axis=-1)
+    res['min']  = vmin
+    res['max']  = vmax
+    res['vpp']  = vmax - vmin
+    res['mean'] = mean
+    if 'rms' in which:
+        res['rms'] = np.sqrt(np.einsum('...i,...i->...', x, x) / n)
+
+    # top and base are the mean values of samples above and below the middle level
+    mid = (vmax + vmin) / 2
+    above = x > mid[..., None]
+    count = above.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        top  = np.where(above, x, 0).sum(axis=-1) / count
+        base = np.where(above, 0, x).sum(axis=-1) / (n - count)
+    amplitude = top - base
+    res['top']       = top
+    res['base']      = base
+    res['amplitude'] = amplitude
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res['overshoot']  = 100 * (vmax - top) / amplitude
+        res['undershoot'] = 100 * (base - vmin) / amplitude
+
+    level = (top + base) / 2
+    if set(which) & {'frequency', 'period', 'duty'}:
+        rising = _crossings(x, level[..., None], True)
+        first  = _first(rising)
+        last   = _last(rising)
+        cycles = rising.sum(axis=-1) - 1
+        t0 = _interpolate(x, first, level)
+        t1 = _interpolate(x, last, level)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            period = np.where(cycles > 0, (t1 - t0) / cycles, np.nan)
+        res['period']    = period / fs
+        res['frequency'] = fs / period
+        # duty cycle over the whole periods between the first and the last rising edge
+        index = np.arange(n)
+        window = (index > first[..., None]) & (index <= last[..., None])
+        high = (above & window).sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            res['duty'] = np.where(cycles > 0, 100 * high / window.sum(axis=-1), np.nan)
+
+    lo = base + 0.1 * amplitude
+    hi = base + 0.9 * amplitude
+    if 'rise' in which:
+        res['rise'] = _transition(x, lo, hi, level, True) / fs
+    if 'fall' in which:
+        res['fall'] = _transition(x, lo, hi, level, False) / fs
+
+    return {key: res[key] for key in which}
+
+
+class Statistics(object):
+    """Running statistics of measurements across calls of measure()."""
+
+    def __init__(self, which=None):
+        """`which` selects the measurements to accumulate, by default all
+        results passed to update() are.
+        """
+        self.which = None if which is None else _check(which)
+        self.count = {}
+        self.mean  = {}
+        self._m2   = {}
+        self.min   = {}
+        self.max   = {}
+
+    def update(self, results, axis=0):
+        """Merge results of a measure() call, reducing the captures `axis`."""
+        for key, value in results.items():
+            if self.which is not None and key not in self.which:
+                continue
+            value = np.asarray(value, dtype=float)
+            valid = ~np.isnan(value)
+            count = valid.sum(axis=axis)
+            total = np.where(valid, value, 0).sum(axis=axis)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = total / count
+                m2 = np.where(valid, (value - np.expand_dims(mean, axis)) ** 2, 0).sum(axis=axis)
+            vmin = np.where(valid, value, np.inf).min(axis=axis)
+            vmax = np.where(valid, value, -np.inf).max(axis=axis)
+            if key not in self.count:
+                self.count[key] = count
+                self.mean[key]  = np.where(count > 0, mean, 0)
+                self._m2[key]   = m2
+                self.min[key]   = vmin
+                self.max[key]   = vmax
+                continue
+            # parallel variance update (Chan et al.)
+            n_a = self.count[key]
+            n = n_a + count
+            with np.errstate(invalid='ignore', divide='ignore'):
+                delta = np.where(count > 0, mean - self.mean[key], 0)
+                self.mean[key] = np.where(n > 0, self.mean[key] + delta * count / n, 0)
+                self._m2[key]  = self._m2[key] + m2 + np.where(n > 0, delta ** 2 * n_a * count / n, 0)
+            self.count[key] = n
+            self.min[key] = np.minimum(self.min[key], vmin)
+            self.max[key] = np.maximum(self.max[key], vmax)
+
+    def std(self, key):
+        """Sample standard deviation of a measurement."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self._m2[key] / (self.count[key] - 1))
@@ -0,0 +1,143 @@
+"""Persistence and eye diagram accumulation.
+
+Captures are folded into a 2-D histogram of time against voltage, one
+bincount() call per batch of captures. Older captures can be faded out
+with a decay factor per capture, emulating an analog persistence
+display. Eye diagrams fold captures at the symbol period, which can be
+recovered from the threshold crossings of the signal.
+"""
+
+import numpy as np
+
+
+def crossings(x, level):
+    """Interpolated positions (samples) where `x` crosses `level`."""
+    x = np.asarray(x, dtype=float) - level
+    i = np.flatnonzero((x[:-1] < 0) != (x[1:] < 0))
+    return i + x[i] / (x[i] - x[i + 1])
+
+
+def recover_clock(x, level=None, period=None):
+    """Estimate symbol period and phase (samples) of a NRZ signal.
+    The initial estimate (`period` or the typical shortest interval
+    between crossings) is refined by least squares fits of crossing
+    positions to multiples of the period over growing spans.
+    Returns (period, phase), phase is the position of a crossing.
+    """
+    if level is None:
+        level = (np.max(x) + np.min(x)) / 2.0
+    c = crossings(x, level)
+    if len(c) < 3:
+        raise ValueError('not enough crossings to recover the clock')
+    d = np.diff(c)
+    if period is None:
+        period = np.median(d[d <= 1.5 * np.percentile(d, 25)])
+    # noise close to the level causes extra crossings
+    c = c[np.concatenate(([True], d > 0.3 * period))]
+    # kept when all crossings are within half a period of the first one
+    phase = c[0]
+    span = 16
+    while True:
+        sel = c[c <= c[0] + span * period]
+        k = np.round((sel - c[0]) / period)
+        if k[-1] > 0:
+            period, phase = np.polyfit(k, sel, 1)
+        if len(sel) == len(c):
+            return period, phase % period
+        span *= 4
+
+
+class Persistence(object):
+    """2-D histogram of captures, `height` voltage bins by `width` time bins."""
+
+    def __init__(self, width, height, vrange, decay=None):
+        """`vrange` is the (low, high) voltage range, `decay` the weight
+        factor applied to the histogram for every added capture.
+        """
+        self.width  = width
+        self.height = height
+        self.vrange = (float(vrange[0]), float(vrange[1]))
+        self.decay  = decay
+        self.hist   = np.zeros(height * width, dtype=float)
+        self.count  = 0
+
+    def _columns(self, n, samples):
+        """Time bin of each sample, shaped (n, samples) or (samples,)."""
+        return np.arange(samples) * self.width // samples
+
+    def _rows(self, traces):
+        lo, hi = self.vrange
+        rows = np.floor((traces - lo) * (self.height / (hi - lo))).astype(np.intp)
+        # out of range samples are dropped
+        rows[(rows < 0) | (rows >= self.height)] = -1
+        return rows
+
+    def add(self, traces, **kwargs):
+        """Add captures shaped (n, samples) or a single capture."""
+        traces = np.atleast_2d(traces)
+        n, samples = traces.shape
+        rows = self._rows(traces)
+        index = rows * self.width + self._columns(n, samples, **kwargs)
+        valid = rows >= 0
+        weights = None
+        if self.decay is not None:
+            self.hist *= self.decay ** n
+            weights = np.broadcast_to((self.decay ** np.arange(n - 1, -1, -1))[:, None], index.shape)[valid]
+        self.hist += np.bincount(index[valid], weights, minlength=self.hist.size)
+        self.count += n
+        return self
+
+    def clear(self):
+        self.hist[:] = 0
+        self.count = 0
+
+    def image(self, log=False, dtype=np.float32):
+        """Density as an image, highest voltage in the first row.
+        Values are normalized to [0, 1], or to [0, 255] for uint8.
+        """
+        img = self.hist.reshape(self.height, self.width)[::-1]
+        if log:
+            img = np.log1p(img)
+        peak = img.max()
+        img = img / peak if peak > 0 else np.zeros_like(img)
+        if np.dtype(dtype) == np.uint8:
+            return (img * 255 + 0.5).astype(np.uint8)
+        return img.astype(dtype)
+
+    def extent(self, fs=1.0, samples=None):
+        """(left, right, bottom, top) for matplotlib imshow()."""
+        return (0.0, (samples or self.width) / fs, self.vrange[0], self.vrange[1])
+
+
+class Eye(Persistence):
+    """Eye diagram, captures folded at the symbol period.
+
+    `uis` unit intervals are shown, with the eye opening centered at
+    one unit interval. If the period is not given, it is recovered
+    from each capture.
+    """
+
+    def __init__(self, width, height, vrange, period=None, uis=2, level=None, decay=None):
+        Persistence.__init__(self, width, height, vrange, decay)
+        self.period = period
+        self.uis    = uis
+        self.level  = level
+
+    def _columns(self, n, samples, phase=None, data=None):
+        if phase is None or self.period is None:
+            clock = [recover_clock(x, self.level, self.period) for x in data]
+            period = np.array([c[0] for c in clock])[:, None]
+            phase = np.array([c[1] for c in clock])[:, None]
+        else:
+            period = self.period
+            phase = np.broadcast_to(np.asarray(phase, dtype=float), (n,))[:, None]
+        # crossings at 0.5 and 1.5 unit intervals
+        t = (np.arange(samples) - phase + period / 2.0) % (self.uis * period)
+        return np.minimum((t * (self.width / (self.uis * period))).astype(np.intp), self.width - 1)
+
+    def add(self, traces, phase=None):
+        """Add captures, `phase` is the crossing position (samples) of each
+        capture, it is recovered together with the period when not given.
+        """
+        traces = np.atleast_2d(traces)
+        return Persistence.add(self, traces, phase=phase, data=traces)
@@ -0,0 +1,90 @@
+"""Parallel post-processing of captures in worker processes.
+
+Captures are copied into slots of a shared memory block and processed
+by a process pool, only slot indices and results are pickled. When all
+slots are busy, submit() blocks until a worker releases one, so a slow
+analysis slows down acquisition instead of exhausting memory.
+"""
+
+import collections
+import concurrent.futures
+import os
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# shared memory blocks attached by a worker process
+_attached = {}
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        # workers share the resource tracker of the owner, which unlinks the block
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def _work(func, name, shape, dtype, slot):
+    """Run `func` on a slot of a shared memory block inside a worker."""
+    data = np.ndarray(shape, dtype=dtype, buffer=_attach(name).buf)[slot]
+    return func(data)
+
+
+class Pipeline(object):
+    """Process pool fed through shared memory slots."""
+
+    def __init__(self, func, shape, dtype=np.int16, slots=None, workers=None):
+        """`func` is a picklable function called with each capture,
+        captures must have the given shape and dtype.
+        """
+        self.func    = func
+        self.workers = workers or os.cpu_count() or 1
+        self._pool   = concurrent.futures.ProcessPoolExecutor(self.workers)
+        slots = slots or 2 * self.workers
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        size  = max(1, slots * int(np.prod(shape)) * dtype.itemsize)
+        self._shm   = shared_memory.SharedMemory(create=True, size=size)
+        self._slots = np.ndarray((slots,) + shape, dtype=dtype, buffer=self._shm.buf)
+        self._free  = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._pending = collections.deque()
+
+    def submit(self, capture, timeout=None):
+        """Copy a capture into a free slot and queue it for processing.
+        Blocks while all slots are in use, returns a future of the result.
+        """
+        slot = self._free.get(timeout=timeout)
+        self._slots[slot] = capture
+        future = self._pool.submit(_work, self.func, self._shm.name, self._slots.shape,
+                                   self._slots.dtype.str, slot)
+        future.add_done_callback(lambda f, slot=slot: self._free.put(slot))
+        self._pending.append(future)
+        return future
+
+    def ready(self):
+        """Yield results of already finished captures in submission order."""
+        while self._pending and self._pending[0].done():
+            yield self._pending.popleft().result()
+
+    def results(self):
+        """Yield results of all submitted captures in submission order."""
+        while self._pending:
+            yield self._pending.popleft().result()
+
+    def close(self):
+        """Wait for pending work, stop the workers and free shared memory."""
+        self._pool.shutdown(wait=True)
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,71 @@
+"""Acquisition planner.
+
+Chooses decimation, averaging and trigger delay for a requested time
+window, bandwidth and number of points, and the smallest range of
+samples that has to be read from the buffer.
+"""
+
+import collections
+import math
+
+import numpy as np
+
+from rptools import acq
+
+Plan = collections.namedtuple('Plan', ['decimation', 'averaging', 'delay', 'start', 'size', 'step', 'sample_rate'])
+Plan.__doc__ = """Acquisition plan.
+decimation  -- ACQ:DEC value
+averaging   -- ACQ:AVG value
+delay       -- ACQ:TRIG:DLY value in samples
+start       -- first sample to read relative to the trigger (ACQ:TPOS?)
+size        -- number of samples to read
+step        -- stride applied to the read samples to get about the requested points
+sample_rate -- expected ACQ:SRAT? in Hz
+"""
+
+
+def plan(span, bandwidth=None, points=None, pre=0.0):
+    """Plan acquisition of `span` seconds, `pre` seconds of it before the trigger.
+    `bandwidth` (Hz) is the minimal signal bandwidth to be kept and
+    `points` the minimal number of samples within the span.
+    The largest decimation satisfying all requirements is chosen.
+    """
+    if not 0 <= pre <= span:
+        raise ValueError('pre trigger time must be within the span')
+    for dec in reversed(acq.DECIMATION):
+        rate = acq.FS / dec
+        size = int(math.ceil(span * rate)) + 1
+        if size > acq.BUFF_SIZE:
+            continue
+        if bandwidth is not None and rate < 2 * bandwidth:
+            continue
+        if points is not None and size < points:
+            continue
+        break
+    else:
+        raise ValueError('no decimation fits {:g}s into the buffer with the requested resolution'.format(span))
+
+    pre_n = int(math.ceil(pre * rate))
+    step = max(1, size // points) if points else 1
+    # post trigger delay just long enough to write the window
+    delay = (size - pre_n) - acq.BUFF_SIZE//2
+    return Plan(dec, dec > 1, delay, -pre_n, size, step, rate)
+
+
+def apply(rp_s, p):
+    """Configure acquisition according to a plan, return the ACQ:SRAT? reply."""
+    rp_s.tx_batch(['ACQ:DEC {:d}'.format(p.decimation),
+                   'ACQ:AVG ' + ('ON' if p.averaging else 'OFF'),
+                   'ACQ:TRIG:DLY {:d}'.format(p.delay),
+                   'ACQ:SRAT?'])
+    return rp_s.rx_txt()
+
+
+def read(rp_s, p, channels=(1,), units='RAW'):
+    """Read the planned window of a triggered acquisition.
+    Returns an array shaped (channels, samples) after applying the step.
+    """
+    tpos = int(rp_s.txrx_txt('ACQ:TPOS?'))
+    blocks = acq.read_data(rp_s, channels, tpos + p.start, p.size)
+    data = np.frombuffer(b''.join(blocks), dtype=acq.DTYPE[units]).reshape(len(channels), p.size)
+    return data[:, ::p.step]
@@ -0,0 +1,136 @@
+"""Named instrument profiles.
+
+A profile is the reply of every settable generator and acquisition
+query, read with one pipelined batch. Restoring a profile compares it
+with the current state and sends only the changed settings, in one
+batch ordered so that no intermediate state is rejected by the server.
+"""
+
+import collections
+import json
+import os
+
+# settable state in the order it is restored, '#' is the channel number
+GENERATOR = ('SOUR#:FUNC',
+             'SOUR#:FREQ:FIX',
+             'SOUR#:VOLT',
+             'SOUR#:VOLT:OFFS',
+             'SOUR#:PHAS',
+             'SOUR#:DCYC',
+             'SOUR#:BURS:STAT',
+             'SOUR#:BURS:NCYC',
+             'SOUR#:BURS:NOR',
+             'SOUR#:BURS:INT:PER',
+             'SOUR#:TRIG:SOUR')
+ACQUISITION = ('ACQ:DEC',
+               'ACQ:AVG',
+               'ACQ:SOUR1:GAIN',
+               'ACQ:SOUR2:GAIN',
+               'ACQ:TRIG:LEV',
+               'ACQ:TRIG:HYST',
+               'ACQ:TRIG:DLY',
+               'ACQ:DATA:UNITS')
+OUTPUT = 'OUTPUT#:STATE'
+
+
+def settings(channels=(1, 2)):
+    """Settings covered by a profile, in restore order."""
+    cmds = [OUTPUT.replace('#', str(ch)) for ch in channels]
+    for ch in channels:
+        cmds += [cmd.replace('#', str(ch)) for cmd in GENERATOR]
+    return cmds + list(ACQUISITION)
+
+
+def snapshot(rp_s, cmds=None):
+    """Query settings with a single batch, returns an ordered dict of replies."""
+    cmds = settings() if cmds is None else list(cmds)
+    rp_s.tx_batch([cmd + '?' for cmd in cmds])
+    return collections.OrderedDict((cmd, rp_s.rx_txt()) for cmd in cmds)
+
+
+def _same(a, b):
+    try:
+        return abs(float(a) - float(b)) <= 1e-6 * max(abs(float(a)), abs(float(b)), 1e-9)
+    except ValueError:
+        return a.strip().upper() == b.strip().upper()
+
+
+def diff(current, target):
+    """Settings of `target` that differ from `current`, in restore order."""
+    return collections.OrderedDict((cmd, value) for cmd, value in target.items()
+                                   if cmd not in current or not _same(current[cmd], value))
+
+
+def _on(value):
+    return value.strip().upper() in ('1', 'ON')
+
+
+def order(changes, current):
+    """Order changed settings so that each intermediate state is valid.
+
+    Outputs are switched off before and on after the other settings.
+    Amplitude plus offset must stay within the output range, so the
+    offset is written first when its magnitude decreases.
+    """
+    rank = dict((cmd, i) for i, cmd in enumerate(settings()))
+    first, middle, last = [], [], []
+    for cmd, value in sorted(changes.items(), key=lambda c: rank.get(c[0], len(rank))):
+        if cmd.startswith('OUTPUT'):
+            (last if _on(value) else first).append((cmd, value))
+        else:
+            middle.append((cmd, value))
+    for i, (cmd, value) in enumerate(middle):
+        if cmd.endswith(':VOLT') and i + 1 < len(middle) and middle[i + 1][0] == cmd + ':OFFS':
+            offs = middle[i + 1]
+            if offs[0] in current and abs(float(offs[1])) < abs(float(current[offs[0]])):
+                middle[i], middle[i + 1] = offs, (cmd, value)
+    return first + middle + last
+
+
+def restore(rp_s, profile, current=None):
+    """Apply a profile with one batch of the changed settings.
+    `current` is the cached state, it is queried when not given.
+    Returns the new state, which can be passed as `current` next time.
+    """
+    if current is None:
+        current = snapshot(rp_s, profile.keys())
+    cmds = ['{} {}'.format(cmd, value) for cmd, value in order(diff(current, profile), current)]
+    if cmds:
+        rp_s.tx_batch(cmds)
+    state = collections.OrderedDict(current)
+    state.update(profile)
+    return state
+
+
+class Store(object):
+    """Named profiles kept in a JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._profiles = collections.OrderedDict()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._profiles = json.load(f, object_pairs_hook=collections.OrderedDict)
+
+    def names(self):
+        return list(self._profiles)
+
+    def __contains__(self, name):
+        return name in self._profiles
+
+    def __getitem__(self, name):
+        return self._profiles[name]
+
+    def __setitem__(self, name, profile):
+        self._profiles[name] = collections.OrderedDict(profile)
+        self._write()
+
+    def __delitem__(self, name):
+        del self._profiles[name]
+        self._write()
+
+    def _write(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._profiles, f, indent=2)
+        os.replace(tmp, self.path)
@@ -0,0 +1,178 @@
+"""Multi-resolution min/max/mean pyramid of long recordings.
+
+Level 0 summarizes blocks of `base` samples, each further level
+summarizes `factor` entries of the level below. Levels are stored as
+NPY files shaped (entries, channels, 3) with min, max and mean columns
+in a `<recording>.pyramid` directory and are memory-mapped by the
+viewer, so drawing any time window reads about as many entries as
+there are pixels, whatever the length of the recording.
+
+Recordings are arrays shaped (channels, samples) or (samples,).
+"""
+
+import collections
+import json
+import os
+
+import numpy as np
+
+HEADER_SIZE = 128
+
+View = collections.namedtuple('View', ['start', 'step', 'min', 'max', 'mean'])
+View.__doc__ = """Summary of a time window.
+start -- index of the first sample covered
+step  -- samples per entry
+min, max, mean -- arrays shaped (channels, entries)
+"""
+
+
+def _header(shape):
+    """NPY 1.0 header of a float32 array, padded to HEADER_SIZE bytes."""
+    header = "{{'descr': '<f4', 'fortran_order': False, 'shape': {!r}, }}".format(tuple(shape))
+    header = header.ljust(HEADER_SIZE - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + np.uint16(len(header)).tobytes() + header.encode('latin1')
+
+
+def _reduce(rows, counts, size):
+    """Combine groups of `size` consecutive rows (k, channels, 3)."""
+    k = len(rows) // size * size
+    rows, counts = rows[:k].reshape(-1, size, *rows.shape[1:]), counts[:k].reshape(-1, size)
+    total = counts.sum(axis=1)
+    out = np.empty((len(rows),) + rows.shape[2:], dtype=np.float32)
+    out[..., 0] = rows[..., 0].min(axis=1)
+    out[..., 1] = rows[..., 1].max(axis=1)
+    out[..., 2] = (rows[..., 2] * counts[..., None]).sum(axis=1) / total[:, None]
+    return out, total
+
+
+class Builder(object):
+    """Incremental pyramid builder, fed while recording or in a post pass."""
+
+    def __init__(self, path, channels, fs=1.0, factor=4, base=256):
+        """`path` is the recording, the pyramid is written next to it."""
+        self.dir      = path + '.pyramid'
+        self.channels = channels
+        self.fs       = fs
+        self.factor   = factor
+        self.base     = base
+        self.length   = 0
+        if not os.path.isdir(self.dir):
+            os.makedirs(self.dir)
+        self._files  = []
+        self._rows   = []
+        self._carry  = []
+        self._raw    = np.empty((channels, 0), dtype=np.float32)
+
+    def _level(self, level):
+        while len(self._files) <= level:
+            f = open(os.path.join(self.dir, 'level{:02d}.npy'.format(len(self._files))), 'wb')
+            f.write(_header((0, self.channels, 3)))
+            self._files.append(f)
+            self._rows.append(0)
+            self._carry.append((np.empty((0, self.channels, 3), np.float32), np.empty(0)))
+
+    def _append(self, level, rows, counts):
+        """Write rows to a level and combine complete groups into the next one."""
+        self._level(level)
+        self._files[level].write(rows.tobytes())
+        self._rows[level] += len(rows)
+        carry, carry_n = self._carry[level]
+        rows, counts = np.concatenate((carry, rows)), np.concatenate((carry_n, counts))
+        done = len(rows) // self.factor * self.factor
+        self._carry[level] = (rows[done:], counts[done:])
+        if done:
+            self._append(level + 1, *_reduce(rows[:done], counts[:done], self.factor))
+
+    def feed(self, data):
+        """Add consecutive samples shaped (channels, n)."""
+        data = np.atleast_2d(data)
+        self.length += data.shape[1]
+        raw = np.concatenate((self._raw, data.astype(np.float32)), axis=1)
+        k = raw.shape[1] // self.base
+        if k:
+            blocks = raw[:, :k * self.base].reshape(self.channels, k, self.base)
+            rows = np.stack((blocks.min(axis=2), blocks.max(axis=2), blocks.mean(axis=2)), axis=-1)
+            self._append(0, np.ascontiguousarray(rows.transpose(1, 0, 2)), np.full(k, float(self.base)))
+        self._raw = raw[:, k * self.base:]
+        return self
+
+    def close(self):
+        """Summarize remaining samples and finalize the level files."""
+        rows = np.empty((0, self.channels, 3), np.float32)
+        counts = np.empty(0)
+        if self._raw.shape[1]:
+            rows = np.stack((self._raw.min(axis=1), self._raw.max(axis=1), self._raw.mean(axis=1)), axis=-1)[None]
+            counts = np.array([float(self._raw.shape[1])])
+        if len(rows):
+            self._append(0, rows.astype(np.float32), counts)
+        # combine partial groups until a level has a single entry
+        level = 0
+        while level < len(self._files) and (level + 1 < len(self._files) or self._rows[level] > 1):
+            carry, carry_n = self._carry[level]
+            if len(carry):
+                self._carry[level] = (carry[:0], carry_n[:0])
+                self._append(level + 1, *_reduce(carry, carry_n, len(carry)))
+            level += 1
+        for f, n in zip(self._files, self._rows):
+            f.seek(0)
+            f.write(_header((n, self.channels, 3)))
+            f.close()
+        with open(os.path.join(self.dir, 'meta.json'), 'w') as f:
+            json.dump({'channels': self.channels, 'fs': self.fs, 'factor': self.factor,
+                       'base': self.base, 'length': self.length, 'levels': len(self._files)}, f)
+
+
+def build(path, data=None, fs=1.0, factor=4, base=256, chunk=1 << 22):
+    """Build the pyramid of a recording in a post pass.
+    `data` defaults to the memory-mapped NPY file at `path`.
+    """
+    if data is None:
+        data = np.load(path, mmap_mode='r')
+    data = data if data.ndim == 2 else data[None]
+    builder = Builder(path, data.shape[0], fs, factor, base)
+    for i in range(0, data.shape[1], chunk):
+        builder.feed(data[:, i:i + chunk])
+    builder.close()
+    return Pyramid(path, data)
+
+
+class Pyramid(object):
+    """Viewer returning the coarsest summary that resolves a window."""
+
+    def __init__(self, path, data=None):
+        """`data` is the recording, used when zoomed in to single samples,
+        it defaults to the memory-mapped NPY file at `path` if it exists.
+        """
+        directory = path + '.pyramid'
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.fs     = meta['fs']
+        self.factor = meta['factor']
+        self.base   = meta['base']
+        self.length = meta['length']
+        self.levels = [np.load(os.path.join(directory, 'level{:02d}.npy'.format(i)), mmap_mode='r')
+                       for i in range(meta['levels'])]
+        if data is None and os.path.exists(path) and path.endswith('.npy'):
+            data = np.load(path, mmap_mode='r')
+        self.data = None if data is None else (data if data.ndim == 2 else data[None])
+
+    def step(self, level):
+        """Samples per entry of a level."""
+        return self.base * self.factor ** level
+
+    def view(self, t0, t1, width):
+        """Summary of the window [t0, t1) seconds with at least `width` entries."""
+        i0 = max(0, int(t0 * self.fs))
+        i1 = min(self.length, int(np.ceil(t1 * self.fs)))
+        span = max(1, i1 - i0)
+        level = -1
+        while level + 1 < len(self.levels) and span // self.step(level + 1) >= width:
+            level += 1
+        if level < 0 and self.data is not None:
+            x = np.asarray(self.data[:, i0:i1])
+            return View(i0, 1, x, x, x)
+        level = max(level, 0)
+        step = self.step(level)
+        e0, e1 = i0 // step, -(-i1 // step)
+        rows = np.asarray(self.levels[level][e0:e1])
+        return View(e0 * step, step, rows[..., 0].T, rows[..., 1].T, rows[..., 2].T)
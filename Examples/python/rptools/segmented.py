@@ -0,0 +1,44 @@
+"""Segmented acquisition of short windows around the trigger.
+
+Instead of transferring the whole buffer, only `pre` samples before and
+`post` samples after the trigger are read with ranged data queries.
+The post trigger delay is shortened to the window and the acquisition
+is re-armed in the same batch as the data queries.
+"""
+
+import time
+
+import numpy as np
+
+from rptools import acq
+
+
+def acquire(rp_s, count, pre, post, channels=(1,), trigger='CH1_PE', level=None,
+            decimation=1, timeout=None):
+    """Acquire `count` segments of RAW samples around the trigger.
+    Returns an int16 array shaped (count, channels, pre+post).
+    """
+    size = pre + post
+    if size > acq.BUFF_SIZE or pre < 0 or post < 0:
+        raise ValueError('segment must fit into the {:d} sample buffer'.format(acq.BUFF_SIZE))
+    out = np.empty((count, len(channels), size), dtype=np.int16)
+    # time needed to write post trigger samples after the trigger is detected
+    post_time = post * decimation / acq.FS
+
+    acq.configure(rp_s, decimation, level=level, delay=post - acq.BUFF_SIZE//2, units='RAW')
+    acq.arm(rp_s, trigger)
+    for k in range(count):
+        if not acq.wait_trigger(rp_s, timeout):
+            raise TimeoutError('SCPI >> no trigger in {:g}s'.format(timeout))
+        if post_time > 0.001:
+            time.sleep(post_time)
+        tpos = int(rp_s.txrx_txt('ACQ:TPOS?'))
+        data = [acq.data_cmds(ch, tpos - pre, size) for ch in channels]
+        cmds = [cmd for c in data for cmd in c]
+        # commands are executed in order, re-arming after the data queries is safe
+        if k + 1 < count:
+            cmds += ['ACQ:START', 'ACQ:TRIG ' + trigger]
+        rp_s.tx_batch(cmds)
+        for i, c in enumerate(data):
+            out[k, i] = np.frombuffer(acq.rx_data(rp_s, c), dtype=acq.DTYPE['RAW'])
+    return out
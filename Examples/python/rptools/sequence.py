@@ -0,0 +1,229 @@
+"""Generator stimulus sequences.
+
+A sequence is a list of steps at fixed times after its start, each
+step changes generator settings and may trigger bursts. Sequences are
+validated against the generator limits of api1 (gen.h) and compiled
+once into a batch per step, holding only the settings that change with
+the step. Batches are encoded when compiling, running a sequence sends
+each with a single write at its deadline without waiting for replies
+and reports the actual timing.
+
+Note that with the INT trigger source the generator restarts a burst
+whenever a burst parameter is written, so burst steps usually write
+their parameters with an external source and fire with trigger().
+"""
+
+import collections
+import time
+
+import numpy as np
+
+import redpitaya_scpi as scpi
+from rptools import profiles
+
+FUNCTIONS = ('SINE', 'SQUARE', 'TRIANGLE', 'SAWU', 'SAWD', 'PWM', 'DC', 'ARBITRARY')
+SOURCES   = ('INT', 'EXT_PE', 'EXT_NE', 'GATED')
+
+BURST_COUNT_MAX       = 50000
+BURST_REPETITIONS_MAX = 50000
+BURST_PERIOD_MAX      = 500000000  # us
+AMPLITUDE_MAX         = 1.0        # V, amplitude and offset together
+
+Step = collections.namedtuple('Step', ['time', 'cmds', 'payload'])
+Step.__doc__ = """Compiled step.
+time    -- seconds after the start of the sequence
+cmds    -- commands of the step
+payload -- the commands encoded for a single write
+"""
+
+Report = collections.namedtuple('Report', ['scheduled', 'sent', 'error', 'jitter', 'worst'])
+Report.__doc__ = """Timing of a sequence run, all in seconds.
+scheduled -- step times
+sent      -- times the steps were sent, relative to the start
+error     -- sent - scheduled
+jitter    -- standard deviation of the error
+worst     -- largest error
+"""
+
+
+def _float(lo, hi):
+    def check(value):
+        if not lo <= float(value) <= hi:
+            raise ValueError('{!r} is outside [{:g}, {:g}]'.format(value, lo, hi))
+        return repr(float(value))
+    return check
+
+
+def _count(hi):
+    def check(value):
+        if value != -1 and not 1 <= value <= hi or int(value) != value:
+            raise ValueError('{!r} is not -1 (infinite) or an integer within [1, {:d}]'.format(value, hi))
+        return '{:d}'.format(int(value))
+    return check
+
+
+def _choice(values):
+    def check(value):
+        if str(value).upper() not in values:
+            raise ValueError('{!r} is not one of {}'.format(value, ', '.join(values)))
+        return str(value).upper()
+    return check
+
+
+def _period(value):
+    """Burst period in seconds, written in microseconds."""
+    us = int(round(value * 1e6))
+    if not 1 <= us <= BURST_PERIOD_MAX:
+        raise ValueError('burst period {!r}s is outside [1us, {:g}s]'.format(value, BURST_PERIOD_MAX / 1e6))
+    return '{:d}'.format(us)
+
+
+def _state(value):
+    return 'ON' if value else 'OFF'
+
+
+def _check_amplitude(state, channel):
+    """Raise ValueError if amplitude and offset of a channel exceed the output range."""
+    volt = float(state.get('SOUR{:d}:VOLT'.format(channel), 0))
+    offset = float(state.get('SOUR{:d}:VOLT:OFFS'.format(channel), 0))
+    if volt + abs(offset) > AMPLITUDE_MAX + 1e-9:
+        raise ValueError('amplitude {:g}V with offset {:g}V of channel {:d} exceeds {:g}V'.format(
+                         volt, offset, channel, AMPLITUDE_MAX))
+
+
+# keyword argument: (command, encoder)
+PARAMS = collections.OrderedDict([
+    ('output',      ('OUTPUT#:STATE',      _state)),
+    ('func',        ('SOUR#:FUNC',         _choice(FUNCTIONS))),
+    ('freq',        ('SOUR#:FREQ:FIX',     _float(0, 62.5e6))),
+    ('volt',        ('SOUR#:VOLT',         _float(0, 1.0))),
+    ('offset',      ('SOUR#:VOLT:OFFS',    _float(-2.0, 2.0))),
+    ('phase',       ('SOUR#:PHAS',         _float(-360, 360))),
+    ('duty',        ('SOUR#:DCYC',         _float(0, 100))),
+    ('burst',       ('SOUR#:BURS:STAT',    lambda value: 'BURST' if value else 'CONTINUOUS')),
+    ('cycles',      ('SOUR#:BURS:NCYC',    _count(BURST_COUNT_MAX))),
+    ('repetitions', ('SOUR#:BURS:NOR',     _count(BURST_REPETITIONS_MAX))),
+    ('period',      ('SOUR#:BURS:INT:PER', _period)),
+    ('source',      ('SOUR#:TRIG:SOUR',    _choice(SOURCES))),
+])
+
+
+class Sequence(object):
+    """Stimulus program built step by step, for example:
+
+        seq = Sequence()
+        seq.set(1, func='SINE', freq=1e3, volt=0.5, source='EXT_PE', output=True)
+        seq.burst(1, cycles=10, repetitions=3, period=5e-3).trigger(1)
+        seq.wait(0.1)
+        seq.set(1, freq=2e3, source='EXT_PE').trigger(1)
+        report = seq.run(rp_s)
+    """
+
+    def __init__(self):
+        self._steps = [(0.0, collections.OrderedDict(), [])]
+
+    @property
+    def duration(self):
+        return self._steps[-1][0]
+
+    def set(self, channel, **params):
+        """Change settings of a channel (1 or 2) in the current step,
+        keywords are the keys of PARAMS. Values are validated here.
+        """
+        if channel not in (1, 2):
+            raise ValueError('channel {!r} is not 1 or 2'.format(channel))
+        changes = collections.OrderedDict()
+        for name, value in params.items():
+            if name not in PARAMS:
+                raise TypeError('unknown generator setting {!r}'.format(name))
+            cmd, encode = PARAMS[name]
+            try:
+                changes[cmd.replace('#', str(channel))] = encode(value)
+            except ValueError as e:
+                raise ValueError('{} of channel {:d}: {}'.format(name, channel, e))
+        # amplitude and offset are checked together with earlier steps here,
+        # and with the generator state before the start by compile()
+        state = {}
+        for t, settings, triggers in self._steps:
+            state.update(settings)
+        state.update(changes)
+        _check_amplitude(state, channel)
+        self._steps[-1][1].update(changes)
+        return self
+
+    def burst(self, channel, cycles, repetitions=1, period=None, **params):
+        """Switch a channel to burst mode, `period` is in seconds."""
+        params.update(burst=True, cycles=cycles, repetitions=repetitions)
+        if period is not None:
+            params['period'] = period
+        return self.set(channel, **params)
+
+    def trigger(self, channel):
+        """Start a burst at the end of the current step."""
+        self.set(channel)
+        self._steps[-1][2].append(channel)
+        return self
+
+    def wait(self, delay):
+        """Start the next step `delay` seconds after the current one."""
+        return self.at(self.duration + delay)
+
+    def at(self, t):
+        """Start the next step `t` seconds after the start of the sequence."""
+        if t < self.duration:
+            raise ValueError('step at {:g}s is before the previous step at {:g}s'.format(t, self.duration))
+        self._steps.append((float(t), collections.OrderedDict(), []))
+        return self
+
+    def compile(self, current=None):
+        """Compile to a list of Steps, dropping settings which do not change.
+        `current` is the generator state before the start, as returned by
+        profiles.snapshot(), all settings are written when not given.
+        """
+        state = dict(current or {})
+        steps = []
+        for t, settings, triggers in self._steps:
+            changes = profiles.diff(state, settings)
+            cmds = ['{} {}'.format(cmd, value) for cmd, value in profiles.order(changes, state)]
+            state.update(changes)
+            for ch in (1, 2):
+                try:
+                    _check_amplitude(state, ch)
+                except ValueError as e:
+                    raise ValueError('step at {:g}s: {}'.format(t, e))
+            for ch in triggers:
+                cmds.append('SOUR{:d}:TRIG:IMM'.format(ch))
+                # triggering switches the channel to internally triggered bursts
+                state['SOUR{:d}:BURS:STAT'.format(ch)] = 'BURST'
+                state['SOUR{:d}:TRIG:SOUR'.format(ch)] = 'INT'
+            payload = ''.join(cmd + scpi.scpi.delimiter for cmd in cmds).encode('utf-8')
+            steps.append(Step(t, cmds, payload))
+        return [s for s in steps if s.cmds]
+
+    def run(self, rp_s, current=None, spin=2e-3, sync=True):
+        """Run the sequence, returns a Report.
+        Steps are sent at their deadlines on the monotonic clock, the
+        last `spin` seconds before a deadline are busy-waited. With
+        `sync` the call returns after the server executed all steps.
+        """
+        steps = self.compile(current)
+        # each step is a single write, send it without delay
+        rp_s.set_nodelay()
+        sent = np.empty(len(steps))
+        start = time.perf_counter()
+        for i, step in enumerate(steps):
+            deadline = start + step.time
+            remaining = deadline - time.perf_counter()
+            if remaining > spin:
+                time.sleep(remaining - spin)
+            while time.perf_counter() < deadline:
+                pass
+            sent[i] = time.perf_counter() - start
+            rp_s.tx_raw(step.payload)
+        if sync:
+            rp_s.txrx_txt('*OPC?')
+        scheduled = np.array([step.time for step in steps])
+        error = sent - scheduled
+        return Report(scheduled, sent, error,
+                      float(error.std()) if len(error) else 0.0,
+                      float(np.abs(error).max()) if len(error) else 0.0)
@@ -0,0 +1,143 @@
+"""SCPI connection shared between threads.
+
+A single I/O thread owns the connection. Other threads submit commands
+and get futures of the replies. Commands submitted together are sent
+back to back, everything queued while the I/O thread was busy is sent
+with one socket write, and replies are matched to requests strictly in
+order, so threads can pipeline requests without corrupting each other.
+"""
+
+import collections
+import concurrent.futures
+import queue
+import threading
+
+TXT, ARB = 'txt', 'arb'
+
+
+def _first(future, inner):
+    """Complete `future` with the first reply of `inner`."""
+    error = inner.exception()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(inner.result()[0])
+
+
+class Connection(object):
+    """Thread-safe front end of a scpi object."""
+
+    def __init__(self, rp_s):
+        """The connection takes ownership of the connected scpi object."""
+        self._rp_s   = rp_s
+        # writes are already coalesced here, do not delay them further
+        rp_s.set_nodelay()
+        self._queue  = queue.Queue()
+        # orders submissions against the end of the queue marked by close()
+        self._lock   = threading.Lock()
+        self._closed = False
+        self._abort  = False
+        self._thread = threading.Thread(target=self._run, name='scpi-io')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def batch(self, items):
+        """Submit (command, kind) pairs as one unit, kind is None for
+        commands without reply, TXT or ARB. Returns a future of the list
+        of replies.
+        """
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('SCPI >> connection is closed')
+            self._queue.put((future, list(items)))
+        return future
+
+    def write(self, *cmds):
+        """Send commands, the future completes once they are sent."""
+        return self.batch((cmd, None) for cmd in cmds)
+
+    def query(self, cmd):
+        """Future of a text reply."""
+        return self._single(cmd, TXT)
+
+    def query_arb(self, cmd):
+        """Future of a binary block reply."""
+        return self._single(cmd, ARB)
+
+    def _single(self, cmd, kind):
+        future = concurrent.futures.Future()
+        self.batch([(cmd, kind)]).add_done_callback(lambda inner: _first(future, inner))
+        return future
+
+    def txrx_txt(self, cmd, timeout=None):
+        """Blocking text query."""
+        return self.query(cmd).result(timeout)
+
+    def close(self, timeout=None):
+        """Complete queued requests, stop the I/O thread and close the socket.
+        Requests still waiting for replies after `timeout` seconds fail
+        with TimeoutError.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # closing the socket ends the receive the I/O thread waits in
+            self._abort = True
+        self._rp_s.close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _run(self):
+        pending = collections.deque()
+        closing = False
+        error = None
+        while not (closing and not pending):
+            # wait for requests only when no reply is outstanding
+            requests = []
+            try:
+                requests.append(self._queue.get(block=not pending))
+                while True:
+                    requests.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if None in requests:
+                closing = True
+                requests = [r for r in requests if r is not None]
+            cmds = []
+            for future, items in requests:
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+                cmds += [cmd for cmd, kind in items]
+                kinds = collections.deque(kind for cmd, kind in items if kind is not None)
+                pending.append((future, kinds, []))
+            try:
+                if cmds:
+                    self._rp_s.tx_batch(cmds)
+                # requests without replies are done once sent
+                while pending and not pending[0][1]:
+                    future, kinds, replies = pending.popleft()
+                    future.set_result(replies)
+                if pending:
+                    future, kinds, replies = pending[0]
+                    kind = kinds.popleft()
+                    replies.append(self._rp_s.rx_txt() if kind == TXT else self._rp_s.rx_arb())
+                    if not kinds:
+                        pending.popleft()
+                        future.set_result(replies)
+            except Exception as e:
+                error = e
+                if self._abort:
+                    error = TimeoutError('SCPI >> no reply before the connection was closed')
+                while pending:
+                    pending.popleft()[0].set_exception(error)
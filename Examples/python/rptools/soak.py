@@ -0,0 +1,244 @@
+"""Concurrent client load and soak tests of the SCPI server.
+
+Every client runs in its own thread over its own connection (a forked
+server process each) and repeatedly picks an operation from a weighted
+mix. An operation is one pipelined batch of commands, its latency is
+the time from sending the batch to receiving the last reply. Latencies
+are counted in fixed logarithmic bins, so memory does not grow with the
+run time. Socket timeouts and other failures are counted and the client
+reconnects.
+
+The same load can be run against a local StandIn server to check the
+harness itself or the client side limits.
+"""
+
+import collections
+import math
+import random
+import socket
+import threading
+import time
+
+import redpitaya_scpi as scpi
+from rptools import acq
+from rptools import trace
+from rptools.shared import TXT, ARB
+
+# name: commands, each query is answered by a text (TXT) or binary (ARB) reply
+OPERATIONS = collections.OrderedDict([
+    ('query', [('ACQ:TRIG:STAT?', TXT)]),
+    ('write', [('ACQ:TRIG:LEV 0.0', None), ('*OPC?', TXT)]),
+    ('data',  [(acq.data_cmds(1)[0], ARB)]),
+    ('burst', [('ACQ:TRIG:STAT?', TXT)] * 64),
+])
+
+MIX = {'query': 10, 'write': 2, 'data': 1, 'burst': 1}
+
+SETUP = ['ACQ:DATA:FORMAT BIN', 'ACQ:DATA:UNITS RAW']
+
+
+class Histogram(object):
+    """Latency counts in logarithmic bins from LOW to HIGH seconds,
+    values outside are counted in the first and the last bin.
+    """
+
+    LOW    = 1e-6
+    HIGH   = 1e3
+    DECADE = 50  # bins per decade, about 5 % resolution
+
+    def __init__(self):
+        self.bins   = int(round(math.log10(self.HIGH / self.LOW) * self.DECADE))
+        self.counts = [0] * self.bins
+        self.count  = 0
+        self.max    = float('nan')
+
+    def add(self, value):
+        i = int(math.log10(max(value, self.LOW) / self.LOW) * self.DECADE)
+        self.counts[min(i, self.bins - 1)] += 1
+        self.count += 1
+        if not value <= self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add the counts of another histogram."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        if other.count and not other.max <= self.max:
+            self.max = other.max
+        return self
+
+    def percentile(self, q):
+        """Percentile `q` (0 to 100), the geometric center of its bin."""
+        if not self.count:
+            return float('nan')
+        rank = min(self.count - 1, int(self.count * q / 100.0))
+        total = 0
+        for i, n in enumerate(self.counts):
+            total += n
+            if total > rank:
+                break
+        return min(self.LOW * 10 ** ((i + 0.5) / self.DECADE), self.max)
+
+
+class Client(threading.Thread):
+    """Load generating client, results are kept per operation."""
+
+    def __init__(self, host, port, mix, timeout, think, stop, seed):
+        threading.Thread.__init__(self)
+        self.daemon    = True
+        self.host      = host
+        self.port      = port
+        self.timeout   = timeout
+        self.think     = think
+        self.stop      = stop
+        self.random    = random.Random(seed)
+        self.names     = list(mix)
+        self.weights   = [mix[name] for name in self.names]
+        self.latency   = dict((name, Histogram()) for name in self.names)
+        self.bytes     = 0
+        self.errors    = 0
+        self.timeouts  = 0
+        self.reconnects = 0
+
+    def _connect(self):
+        rp_s = scpi.scpi(self.host, timeout=self.timeout, port=self.port)
+        if rp_s.error is not None:
+            raise rp_s.error
+        rp_s.set_nodelay()
+        rp_s.tx_batch(SETUP)
+        return rp_s
+
+    def _operation(self, rp_s, name):
+        items = OPERATIONS[name]
+        start = time.perf_counter()
+        rp_s.tx_batch([cmd for cmd, kind in items])
+        for cmd, kind in items:
+            if kind == TXT:
+                self.bytes += len(rp_s.rx_txt()) + 2
+            elif kind == ARB:
+                self.bytes += len(rp_s.rx_arb())
+        self.latency[name].add(time.perf_counter() - start)
+
+    def run(self):
+        rp_s = None
+        while not self.stop.is_set():
+            try:
+                if rp_s is None:
+                    rp_s = self._connect()
+                self._operation(rp_s, self.random.choices(self.names, self.weights)[0])
+            except Exception as e:
+                if isinstance(e, socket.timeout):
+                    self.timeouts += 1
+                else:
+                    self.errors += 1
+                # the stream position is unknown after a failure
+                if rp_s is not None:
+                    rp_s.close()
+                    rp_s = None
+                    self.reconnects += 1
+                else:
+                    self.stop.wait(0.1)
+            if self.think:
+                self.stop.wait(self.random.expovariate(1.0 / self.think))
+        if rp_s is not None:
+            rp_s.close()
+
+
+class Soak(object):
+    """N concurrent clients running a mix of operations."""
+
+    def __init__(self, host, port=5000, clients=4, mix=None, timeout=5.0, think=0.0, seed=0):
+        """`mix` maps OPERATIONS names to weights, `think` is the mean
+        pause between operations of a client in seconds.
+        """
+        mix = MIX if mix is None else mix
+        for name in mix:
+            if name not in OPERATIONS:
+                raise ValueError('unknown operation {!r}'.format(name))
+        self._stop = threading.Event()
+        self.clients = [Client(host, port, mix, timeout, think, self._stop, seed + i) for i in range(clients)]
+        self.elapsed = 0.0
+
+    def run(self, duration, interval=None, report=None):
+        """Run for `duration` seconds, `report(soak)` is called every
+        `interval` seconds during the run.
+        """
+        start = time.perf_counter()
+        for client in self.clients:
+            client.start()
+        end = start + duration
+        while True:
+            now = time.perf_counter()
+            self.elapsed = now - start
+            if now >= end:
+                break
+            time.sleep(min(interval or duration, end - now))
+            if report is not None and time.perf_counter() < end:
+                self.elapsed = time.perf_counter() - start
+                report(self)
+        self._stop.set()
+        for client in self.clients:
+            client.join()
+        self.elapsed = time.perf_counter() - start
+        return self
+
+    def summary(self):
+        """Aggregate results as an ordered dict."""
+        latency = collections.defaultdict(Histogram)
+        for client in self.clients:
+            for name, hist in list(client.latency.items()):
+                latency[name].merge(hist)
+        out = collections.OrderedDict()
+        out['elapsed']    = self.elapsed
+        out['operations'] = sum(h.count for h in latency.values())
+        out['ops_per_s']  = out['operations'] / self.elapsed if self.elapsed else 0.0
+        out['bytes_per_s'] = sum(c.bytes for c in self.clients) / self.elapsed if self.elapsed else 0.0
+        out['errors']     = sum(c.errors for c in self.clients)
+        out['timeouts']   = sum(c.timeouts for c in self.clients)
+        attempts = out['operations'] + out['errors'] + out['timeouts']
+        out['failure_rate'] = (out['errors'] + out['timeouts']) / float(attempts) if attempts else 0.0
+        for name, hist in sorted(latency.items()):
+            out[name] = collections.OrderedDict([
+                ('count', hist.count),
+                ('p50', hist.percentile(50)),
+                ('p90', hist.percentile(90)),
+                ('p99', hist.percentile(99)),
+                ('max', hist.max)])
+        return out
+
+    def client_summary(self):
+        """Operation count and latency percentiles of each client."""
+        rows = []
+        for client in self.clients:
+            hist = Histogram()
+            for h in list(client.latency.values()):
+                hist.merge(h)
+            rows.append(collections.OrderedDict([
+                ('operations', hist.count),
+                ('p50', hist.percentile(50)),
+                ('p99', hist.percentile(99)),
+                ('errors', client.errors),
+                ('timeouts', client.timeouts)]))
+        return rows
+
+
+class StandIn(trace.Server):
+    """Local server answering every query, data queries with a full buffer
+    of RAW samples, the trigger status with 'TD' and other queries with '1'.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, size=acq.BUFF_SIZE):
+        """`delay` is added before each write of replies."""
+        payload = bytes(2 * size)
+        length = str(len(payload)).encode()
+        self.block = b'#' + str(len(length)).encode() + length + payload + b'\r\n'
+        self.delay = delay
+        trace.Server.__init__(self, host, port)
+
+    def reply(self, session, query):
+        header = query.split(b' ', 1)[0]
+        if header == b'ACQ:TRIG:STAT?':
+            return b'TD\r\n', self.delay
+        if b':DATA' in header:
+            return self.block, self.delay
+        return b'1\r\n', self.delay
@@ -0,0 +1,214 @@
+"""Recording and replay of SCPI sessions.
+
+A recorded trace holds every chunk of data sent to and received from
+the server with its time stamp. The replay server answers each query
+of a client with the reply recorded for it, either as fast as possible
+or after the delay observed in the recording, so client side changes
+can be benchmarked against real traffic without a board.
+
+Trace file: MAGIC followed by records of
+    direction (uint8, 0 sent, 1 received), time (float64), length (uint32), data
+"""
+
+import abc
+import socketserver
+import struct
+import threading
+import time
+
+MAGIC  = b'RPSCPI01'
+RECORD = struct.Struct('<BdI')
+TX, RX = 0, 1
+
+
+class TraceSocket(object):
+    """Socket wrapper writing all sent and received data to a trace file."""
+
+    def __init__(self, sock, path):
+        self._socket = sock
+        self._trace  = open(path, 'wb')
+        self._trace.write(MAGIC)
+        self._start  = time.monotonic()
+
+    def _record(self, direction, data):
+        self._trace.write(RECORD.pack(direction, time.monotonic() - self._start, len(data)))
+        self._trace.write(data)
+
+    def sendall(self, data):
+        self._record(TX, data)
+        return self._socket.sendall(data)
+
+    def recv(self, size):
+        data = self._socket.recv(size)
+        self._record(RX, data)
+        return data
+
+    def recv_into(self, buf, size=0):
+        n = self._socket.recv_into(buf, size)
+        self._record(RX, bytes(memoryview(buf)[:n]))
+        return n
+
+    def close(self):
+        self._trace.close()
+        self._socket.close()
+
+    def __getattr__(self, name):
+        return getattr(self._socket, name)
+
+
+def record(rp_s, path):
+    """Record all further traffic of a connected scpi object into `path`."""
+    rp_s._socket = TraceSocket(rp_s._socket, path)
+    return rp_s
+
+
+def load(path):
+    """Return the list of (direction, time, data) records of a trace."""
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if not buf.startswith(MAGIC):
+        raise ValueError('{} is not a SCPI trace'.format(path))
+    events = []
+    pos = len(MAGIC)
+    while pos + RECORD.size <= len(buf):
+        direction, t, size = RECORD.unpack_from(buf, pos)
+        pos += RECORD.size
+        events.append((direction, t, buf[pos:pos + size]))
+        pos += size
+    return events
+
+
+def _commands(buf):
+    """Split complete commands off a buffer, return (commands, rest)."""
+    parts = buf.split(b'\r\n')
+    return parts[:-1], parts[-1]
+
+
+def _reply_end(buf):
+    """Length of the first complete reply in `buf`, or None."""
+    if buf[:1] == b'#' and len(buf) > 2:
+        n = int(buf[1:2])
+        if len(buf) < 2 + n:
+            return None
+        end = 2 + n + int(buf[2:2 + n]) + 2
+        return end if len(buf) >= end else None
+    end = buf.find(b'\r\n')
+    return None if end < 0 else end + 2
+
+
+def is_query(cmd):
+    return cmd.split(b' ', 1)[0].endswith(b'?')
+
+
+def replies(events):
+    """Pair recorded queries with their replies.
+    Returns a list of (query, reply, delay), the delay is the time between
+    sending the query and receiving the end of its reply.
+    """
+    queries, tx = [], b''
+    answers, rx = [], bytearray()
+    for direction, t, data in events:
+        if direction == TX:
+            cmds, tx = _commands(tx + data)
+            queries += [(cmd, t) for cmd in cmds if is_query(cmd)]
+        else:
+            rx += data
+            while True:
+                end = _reply_end(rx)
+                if end is None:
+                    break
+                answers.append((bytes(rx[:end]), t))
+                del rx[:end]
+    return [(q, a, max(0.0, ta - tq)) for (q, tq), (a, ta) in zip(queries, answers)]
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server = self.server
+        session = server.session()
+        buf = b''
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                return
+            cmds, buf = _commands(buf + data)
+            received = time.monotonic()
+            out = []
+            for cmd in cmds:
+                if not is_query(cmd):
+                    continue
+                reply, delay = server.reply(session, cmd)
+                if delay:
+                    # flush replies already due, then wait for this one
+                    if out:
+                        self.request.sendall(b''.join(out))
+                        out = []
+                    wait = received + delay - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                out.append(reply)
+            if out:
+                self.request.sendall(b''.join(out))
+
+
+class Server(socketserver.ThreadingTCPServer, metaclass=abc.ABCMeta):
+    """Local TCP server answering the queries of SCPI clients.
+
+    This is an abstract base, subclasses must override reply() and
+    may override session(); ReplayServer and soak.StandIn are examples.
+    """
+
+    daemon_threads      = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        socketserver.ThreadingTCPServer.__init__(self, (host, port), _Handler)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        """Serve in a background thread."""
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def session(self):
+        """State of a new connection, passed to reply()."""
+        return None
+
+    @abc.abstractmethod
+    def reply(self, session, query):
+        """Return the reply to `query` (bytes, delimiter included) and its
+        delay in seconds after the query was received.
+        """
+
+
+class ReplayServer(Server):
+    """TCP server replaying the replies of a recorded trace.
+
+    Every connection replays the trace from the start. Queries that do
+    not match the recorded ones are answered anyway and counted in
+    `mismatches`.
+    """
+
+    def __init__(self, path, host='127.0.0.1', port=0, timing=False):
+        """With `timing` each reply is delayed as in the recording."""
+        self.script     = replies(load(path))
+        self.timing     = timing
+        self.mismatches = 0
+        self.lock       = threading.Lock()
+        Server.__init__(self, host, port)
+
+    def session(self):
+        return iter(self.script)
+
+    def reply(self, session, query):
+        recorded, reply, delay = next(session, (None, b'', 0.0))
+        if recorded != query:
+            with self.lock:
+                self.mismatches += 1
+        return reply, delay if self.timing else 0.0
@@ -0,0 +1,19 @@
+from setuptools import setup
+
+setup(
+    name='redpitaya-scpi',
+    version='0.1',
+    description='SCPI client and command line tools for Red Pitaya',
+    url='https://github.com/RedPitaya/RedPitaya',
+    py_modules=['redpitaya_scpi'],
+    packages=['rptools'],
+    entry_points={
+        'console_scripts': [
+            'rp-acquire  = rptools.cli:acquire_main',
+            'rp-generate = rptools.cli:generate_main',
+            'rp-dio      = rptools.cli:dio_main',
+            'rp-replay   = rptools.cli:replay_main',
+            'rp-soak     = rptools.cli:soak_main',
+        ],
+    },
+)
@@ -0,0 +1,177 @@
+"""Fixed rate control loops on slow analog pins.
+
+A Loop reads analog inputs (rp_AIpinGetValue), calls a step function
+and writes analog outputs (rp_AOpinSetValue) once per period. Periods
+are scheduled by deadlines on the monotonic clock, sleeping until
+shortly before a deadline and busy-waiting the rest. The ctypes
+functions and the pin values are bound once, so an iteration does not
+build ctypes objects. Loop period and lateness are collected in
+histograms.
+
+The analog pin functions are exported by librp (api/), not by librp1
+wrapped by redpitaya.py, so the loop takes a librp handle:
+
+    pid = Pid(kp=0.5, ki=20.0, setpoint=0.9, period=1e-3)
+    loop = Loop(load(), inputs=[0], outputs=[0], step=pid, period=1e-3)
+    loop.run(duration=60)
+"""
+
+import ctypes
+import time
+
+import numpy as np
+
+LIBRP = '/opt/redpitaya/lib/librp.so'
+
+# rp_AOpinGetRange()
+AO_MIN = 0.0
+AO_MAX = 1.8
+
+
+def load(path=LIBRP):
+    """Load and initialize librp, returns the library handle."""
+    api = ctypes.CDLL(path)
+    if api.rp_Init() != 0:
+        raise OSError('CONTROL >> rp_Init() of {} failed'.format(path))
+    return api
+
+
+class Pid(object):
+    """PID step of a Loop, controls `outputs[output]` from `inputs[input]`."""
+
+    def __init__(self, kp, ki=0.0, kd=0.0, setpoint=0.0, period=1e-3,
+                 limits=(AO_MIN, AO_MAX), input=0, output=0):
+        self.kp       = kp
+        self.ki       = ki
+        self.kd       = kd
+        self.setpoint = setpoint
+        self.period   = period
+        self.limits   = limits
+        self.input    = input
+        self.output   = output
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.error    = 0.0
+
+    def __call__(self, inputs, outputs):
+        error = self.setpoint - inputs[self.input].value
+        integral = self.integral + error * self.period
+        u = self.kp * error + self.ki * integral + self.kd * (error - self.error) / self.period
+        lo, hi = self.limits
+        # the integral is held while the output saturates (anti-windup)
+        if u > hi:
+            u = hi
+        elif u < lo:
+            u = lo
+        else:
+            self.integral = integral
+        self.error = error
+        outputs[self.output].value = u
+
+
+class Loop(object):
+    """Fixed period loop reading and writing slow analog pins.
+
+    `api` is the loaded librp (see load()), `step` is called as
+    step(inputs, outputs) with lists of c_float values, one per pin.
+    The step can stop the loop by calling stop().
+    """
+
+    def __init__(self, api, inputs, outputs, step, period=1e-3, spin=200e-6, resolution=1e-6):
+        """`spin` is the time busy-waited before each deadline,
+        `resolution` the bin width of the histograms.
+        """
+        self.step       = step
+        self.period     = period
+        self.spin       = spin
+        self.resolution = resolution
+        try:
+            self._get = api.rp_AIpinGetValue
+            self._set = api.rp_AOpinSetValue
+        except AttributeError:
+            raise AttributeError('CONTROL >> {!r} has no analog pin functions, load librp with load()'.format(api))
+        self._get.argtypes = [ctypes.c_uint, ctypes.POINTER(ctypes.c_float)]
+        self._set.argtypes = [ctypes.c_uint, ctypes.c_float]
+        self.inputs  = [ctypes.c_float(0) for pin in inputs]
+        self.outputs = [ctypes.c_float(0) for pin in outputs]
+        self._reads  = [(ctypes.c_uint(pin), ctypes.pointer(v)) for pin, v in zip(inputs, self.inputs)]
+        self._writes = [(ctypes.c_uint(pin), v) for pin, v in zip(outputs, self.outputs)]
+        # periods up to 2 periods, lateness up to 1 period, the last bin collects the rest
+        self.period_hist = np.zeros(int(2 * period / resolution) + 1, dtype=np.int64)
+        self.late_hist   = np.zeros(int(period / resolution) + 1, dtype=np.int64)
+        self.iterations  = 0
+        self.overruns    = 0
+        self._running    = False
+
+    def stop(self):
+        self._running = False
+
+    def run(self, iterations=None, duration=None):
+        """Run until stopped, for a number of iterations or seconds.
+        A deadline missed by more than a period is skipped and counted
+        as an overrun.
+        """
+        get, set_, step = self._get, self._set, self.step
+        reads, writes, inputs, outputs = self._reads, self._writes, self.inputs, self.outputs
+        period, spin, scale = self.period, self.spin, 1.0 / self.resolution
+        period_hist, late_hist = self.period_hist, self.late_hist
+        period_last, late_last = len(period_hist) - 1, len(late_hist) - 1
+        clock, sleep = time.perf_counter, time.sleep
+        if duration is not None:
+            duration_n = int(duration / period)
+            iterations = duration_n if iterations is None else min(iterations, duration_n)
+        n = 0
+        self._running = True
+        deadline = clock()
+        last = None
+        while self._running and (iterations is None or n < iterations):
+            remaining = deadline - clock()
+            if remaining > spin:
+                sleep(remaining - spin)
+            now = clock()
+            while now < deadline:
+                now = clock()
+            for pin, ptr in reads:
+                get(pin, ptr)
+            step(inputs, outputs)
+            for pin, value in writes:
+                set_(pin, value)
+            late = now - deadline
+            late_hist[min(int(late * scale), late_last)] += 1
+            if last is not None:
+                period_hist[min(int((now - last) * scale), period_last)] += 1
+            last = now
+            deadline += period
+            if late > period:
+                skipped = int(late / period)
+                self.overruns += skipped
+                deadline += skipped * period
+            n += 1
+        self.iterations += n
+        self._running = False
+        return self
+
+    def clear(self):
+        """Clear histograms and counters."""
+        self.period_hist[:] = 0
+        self.late_hist[:] = 0
+        self.iterations = 0
+        self.overruns = 0
+
+    def percentile(self, hist, q):
+        """Percentile `q` (0 to 100) of a histogram in seconds."""
+        cdf = np.cumsum(hist)
+        if not cdf[-1]:
+            return 0.0
+        return float(np.searchsorted(cdf, cdf[-1] * q / 100.0) * self.resolution)
+
+    def summary(self):
+        """Median and 99th percentile of period and lateness, in seconds."""
+        return {'iterations': self.iterations,
+                'overruns':   self.overruns,
+                'period_p50': self.percentile(self.period_hist, 50),
+                'period_p99': self.percentile(self.period_hist, 99),
+                'late_p50':   self.percentile(self.late_hist, 50),
+                'late_p99':   self.percentile(self.late_hist, 99)}
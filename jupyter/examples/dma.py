@@ -0,0 +1,125 @@
+"""Zero-copy access to DMA segment buffers (api2 `rp_dma`).
+
+The DMA buffer is mapped once and each segment is exposed as a NumPy
+view into the mapping. In cyclic mode every read() of the device blocks
+until the next segment is complete, segments are filled in order.
+
+The ioctl requests of `rp_dma.c` are issued directly, so the device path
+can point to a plain file of the same size for testing.
+"""
+
+import fcntl
+import mmap
+import os
+import stat
+
+import numpy as np
+
+# ioctl requests from redpitaya/rpdma.h
+STOP_TX           = 0
+STOP_RX           = 1
+CYCLIC_TX         = 2
+CYCLIC_RX         = 3
+SINGLE_RX         = 10
+SINGLE_TX         = 11
+STATUS            = 20
+SET_RX_SGMNT_SIZE = 15
+SET_RX_SGMNT_CNT  = 16
+
+STATUS_STOPPED = 0
+STATUS_READY   = 1
+STATUS_BUSSY   = 2
+STATUS_ERROR   = 3
+
+SGMNT_CNT  = 8
+SGMNT_SIZE = 4*1024*1024
+
+
+class Segment(object):
+    """Completed segment handed out by Dma.ring()."""
+
+    def __init__(self, owner, sequence):
+        self._owner   = owner
+        self.sequence = sequence
+        self.index    = sequence % owner.count
+        self.data     = owner.segments[self.index]
+
+    def release(self):
+        """Return the segment to the DMA, the data view must not be used afterwards."""
+        if self.data is not None:
+            self.data = None
+            self._owner._held.discard(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class Dma(object):
+    """DMA receive buffer split into `count` segments of `size` bytes."""
+
+    def __init__(self, dev='/dev/rprx', count=SGMNT_CNT, size=SGMNT_SIZE, dtype=np.int16, control=None):
+        """`control(fd, request, arg)` issues ioctl requests, it defaults to
+        fcntl.ioctl for devices and to a no-op for regular files.
+        """
+        self.dev   = dev
+        self.count = count
+        self.size  = size
+        self.fd    = os.open(dev, os.O_RDWR)
+        if control is None:
+            control = (lambda fd, request, arg: 0) if stat.S_ISREG(os.fstat(self.fd).st_mode) else fcntl.ioctl
+        self._control = control
+        self._control(self.fd, SET_RX_SGMNT_CNT, count)
+        self._control(self.fd, SET_RX_SGMNT_SIZE, size)
+        self._map     = mmap.mmap(self.fd, count * size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self.segments = np.frombuffer(self._map, dtype=dtype).reshape(count, -1)
+        self._held    = set()
+
+    def close(self):
+        self.segments = None
+        self._map.close()
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        """Start cyclic reception (rp_DmaCtrl RP_DMA_CYCLIC)."""
+        self._control(self.fd, CYCLIC_RX, 0)
+
+    def stop(self):
+        """Stop reception (rp_DmaCtrl RP_DMA_STOP_RX)."""
+        self._control(self.fd, STOP_RX, 0)
+
+    def status(self):
+        """One of the STATUS_* values."""
+        buf = bytearray([0xf0])
+        self._control(self.fd, STATUS, buf)
+        return buf[0]
+
+    def wait(self):
+        """Block until the next segment is complete (rp_DmaRead)."""
+        os.read(self.fd, 1)
+
+    def ring(self, limit=None):
+        """Yield completed segments in order, at most `limit` of them.
+
+        Consumers have to release() each segment (or use it as a context
+        manager) before the DMA wraps around to it again, an overwritten
+        segment that is still held raises BufferError.
+        """
+        self._held.clear()
+        sequence = 0
+        while limit is None or sequence < limit:
+            self.wait()
+            index = sequence % self.count
+            if index in self._held:
+                raise BufferError('DMA >> segment {:d} overwritten while in use'.format(index))
+            self._held.add(index)
+            yield Segment(self, sequence)
+            sequence += 1
@@ -0,0 +1,114 @@
+"""Extension connector GPIO and LEDs through housekeeping registers.
+
+The housekeeping register block (red_pitaya_hk.v) is mapped once and
+each bank of 8 pins is read or written with a single 32-bit access,
+instead of one sysfs GPIO file per pin:
+
+    gpio = Gpio()
+    gpio.p.direction(0x00)           # exp_p_io inputs
+    gpio.n.direction(0xff)           # exp_n_io outputs
+    gpio.n.write(gpio.p.read())      # copy all 8 pins
+    gpio.led.write(0x01, mask=0x0f)  # change LED0-3 only
+
+The mapped region can be any writable buffer, for example a mmap of a
+regular file for testing.
+"""
+
+import mmap
+import os
+import threading
+
+HK_BASE = 0x40000000
+HK_SIZE = 0x1000
+
+# register offsets
+EXP_P_DIR = 0x10
+EXP_N_DIR = 0x14
+EXP_P_OUT = 0x18
+EXP_N_OUT = 0x1c
+EXP_P_IN  = 0x20
+EXP_N_IN  = 0x24
+LED       = 0x30
+
+WIDTH = 8
+
+
+def map_region(base, size, dev='/dev/mem'):
+    """Map a physical address region, returns (fd, mmap)."""
+    fd = os.open(dev, os.O_RDWR | os.O_SYNC)
+    try:
+        return fd, mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE, offset=base)
+    except Exception:
+        os.close(fd)
+        raise
+
+
+class Bank(object):
+    """8 pins with direction, output and input registers."""
+
+    def __init__(self, owner, out_reg, in_reg, dir_reg=None, width=WIDTH):
+        self._owner = owner
+        self._out   = out_reg // 4
+        self._in    = in_reg // 4
+        self._dir   = None if dir_reg is None else dir_reg // 4
+        self.mask   = (1 << width) - 1
+
+    def read(self):
+        """Levels of all pins."""
+        return self._owner.words[self._in] & self.mask
+
+    def output(self):
+        """Output register value."""
+        return self._owner.words[self._out] & self.mask
+
+    def write(self, value, mask=None):
+        """Set the output bits selected by `mask` (default all)."""
+        self._owner.update(self._out, value, self.mask if mask is None else mask & self.mask)
+
+    def direction(self, value=None, mask=None):
+        """Set direction bits (1 for output) selected by `mask`, returns
+        the direction register.
+        """
+        if self._dir is None:
+            raise AttributeError('GPIO >> bank has no direction register')
+        if value is not None:
+            self._owner.update(self._dir, value, self.mask if mask is None else mask & self.mask)
+        return self._owner.words[self._dir] & self.mask
+
+
+class Gpio(object):
+    """exp_p_io, exp_n_io and LED banks."""
+
+    def __init__(self, regs=None, dev='/dev/mem', base=HK_BASE):
+        """`regs` is the mapped housekeeping block, `dev` is mapped at
+        `base` when not given.
+        """
+        self._fd = None
+        if regs is None:
+            self._fd, regs = map_region(base, HK_SIZE, dev)
+        self._regs = regs
+        self.words = memoryview(regs).cast('I')
+        self._lock = threading.Lock()
+        self.p   = Bank(self, EXP_P_OUT, EXP_P_IN, EXP_P_DIR)
+        self.n   = Bank(self, EXP_N_OUT, EXP_N_IN, EXP_N_DIR)
+        self.led = Bank(self, LED, LED)
+
+    def close(self):
+        self.words.release()
+        if self._fd is not None:
+            self._regs.close()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def update(self, index, value, mask):
+        """Read-modify-write of register word `index`, only bits in `mask`
+        change. Updates from threads of this process do not interleave.
+        """
+        with self._lock:
+            self.words[index] = (self.words[index] & ~mask) | (value & mask)
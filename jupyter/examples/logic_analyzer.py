@@ -0,0 +1,193 @@
+"""Logic analyzer data access and RLE decoding.
+
+The logic analyzer (api2 `la_acq`) writes 16 bit words into a DMA ring
+buffer. In RLE mode the upper byte of a word is the run length minus one
+and the lower byte is the sampled value of the 8 digital inputs, without
+RLE the lower byte holds one sample per word.
+
+Decoding works on whole arrays: runs are expanded with `np.repeat` and
+transitions are found on run boundaries, so no Python loop touches
+individual samples.
+"""
+
+import mmap
+import os
+
+import numpy as np
+
+BITS = 8
+
+# trigger is registered one sample after the event (TRIG_DELAY_SAMPLES)
+TRIG_DELAY_SAMPLES = 1
+
+# byte offsets into rp_la_acq_regset_t
+REG_CFG_RLE = 0x54
+REG_STS_PRE = 0x18
+REG_STS_PST = 0x1c
+REG_STS_CUR = 0x58
+REG_STS_LST = 0x5c
+LA_ACQ_BASE_SIZE = 0x00010000
+
+# /dev/rprx as configured by rp_LaAcqOpen(), 8 segments of 256 KiB;
+# the ring holds DMA_SIZE/2 samples (rp_LaAcqBufLenInSamples)
+DMA_SIZE = 8 * 256 * 1024
+
+
+def trigger_address(sts_pre, buflen):
+    """Buffer index of the trigger sample, same as rp_LaAcqGetCntStatus().
+    Returns (index, overflow).
+    """
+    return (sts_pre % buflen - TRIG_DELAY_SAMPLES) % buflen, sts_pre >= buflen
+
+
+def last_address(sts_lst, buflen):
+    """Buffer index of the last RLE word, same as rp_LaAcqGetRLEStatus().
+    Returns (index, overflow).
+    """
+    return (sts_lst % buflen - 1) % buflen, sts_lst >= buflen
+
+
+def runs(words):
+    """Split RLE words into (values, lengths) arrays."""
+    words = np.asarray(words).view(np.uint16)
+    return (words & 0xff).astype(np.uint8), (words >> 8).astype(np.int64) + 1
+
+
+def unroll(buf, last, total):
+    """Extract RLE words of the last `total` samples from the ring buffer.
+    `last` is the index of the newest word. The oldest run is shortened so
+    that the runs cover exactly `total` samples (as rp_GetValues() does).
+    Returns (values, lengths) in time order.
+    """
+    buf = np.asarray(buf).view(np.uint16)
+    # a word holds at most 256 samples, read more words until they cover total
+    n = min(len(buf), -(-total // 256))
+    while True:
+        if n <= last + 1:
+            words = buf[last + 1 - n:last + 1]
+        else:
+            words = np.concatenate((buf[len(buf) - (n - last - 1):], buf[:last + 1]))
+        values, lengths = runs(words)
+        covered = np.cumsum(lengths[::-1])
+        if covered[-1] >= total or n == len(buf):
+            break
+        n = min(len(buf), 4 * n)
+    if covered[-1] < total:
+        raise ValueError('LA >> buffer holds only {:d} of {:d} samples'.format(int(covered[-1]), total))
+    n = int(np.searchsorted(covered, total)) + 1
+    values, lengths = values[-n:], lengths[-n:].copy()
+    lengths[0] -= covered[n - 1] - total
+    return values, lengths
+
+
+def expand(values, lengths):
+    """Dense samples from RLE runs."""
+    return np.repeat(values, lengths)
+
+
+def bitplanes(samples, bits=BITS):
+    """Bool array shaped (bits, samples), row i holds input i."""
+    samples = np.ascontiguousarray(samples, dtype=np.uint8)
+    planes = np.unpackbits(samples[:, None], axis=1, bitorder='little')
+    return planes[:, :bits].T.astype(bool)
+
+
+def transitions(values, lengths, bits=BITS):
+    """Transitions of each input computed on run boundaries.
+    Returns a list with (positions, levels) per input, positions are
+    sample indices where the input changes to the given level.
+    """
+    values = np.asarray(values, dtype=np.uint8)
+    starts = np.cumsum(lengths)[:-1]
+    changed = values[1:] ^ values[:-1]
+    # (bits, runs) planes of changed inputs and of the new levels
+    planes = np.unpackbits(changed[None, :], axis=0, bitorder='little')
+    levels = np.unpackbits(values[None, 1:], axis=0, bitorder='little').view(bool)
+    result = []
+    for bit in range(bits):
+        index = np.flatnonzero(planes[bit])
+        result.append((starts[index], levels[bit][index]))
+    return result
+
+
+def align(buf, trig, pre, post):
+    """Samples of a counter mode (non RLE) capture in time order.
+    `trig` is the trigger index from trigger_address(), the returned
+    samples start `pre` samples before it, the trigger is at index `pre`.
+    """
+    buf = np.asarray(buf).view(np.uint16)
+    index = np.arange(trig - pre, trig + post) % len(buf)
+    return (buf[index] & 0xff).astype(np.uint8)
+
+
+class Capture(object):
+    """Decoded logic analyzer capture."""
+
+    def __init__(self, values, lengths, trigger):
+        """`trigger` is the sample index of the trigger event."""
+        self.values  = values
+        self.lengths = lengths
+        self.trigger = trigger
+
+    def __len__(self):
+        return int(np.sum(self.lengths))
+
+    def samples(self):
+        """Dense 8 bit samples."""
+        return expand(self.values, self.lengths)
+
+    def bitplanes(self):
+        """Bool array shaped (8, samples)."""
+        return bitplanes(self.samples())
+
+    def transitions(self, bits=BITS):
+        """Transition positions and levels per input, see transitions()."""
+        return transitions(self.values, self.lengths, bits)
+
+
+class LogicAnalyzer(object):
+    """Read-only access to the logic analyzer status and data buffer.
+
+    Acquisition is configured and run by librp2 (rp_RunBlock), this class
+    maps the register set and the DMA buffer and decodes stopped captures.
+    """
+
+    def __init__(self, dev='/dev/uio/la', dma='/dev/rprx', dma_size=DMA_SIZE):
+        self._regs_fd = os.open(dev, os.O_RDONLY)
+        self._regs    = mmap.mmap(self._regs_fd, LA_ACQ_BASE_SIZE, mmap.MAP_SHARED, mmap.PROT_READ)
+        self._dma_fd  = os.open(dma, os.O_RDONLY)
+        self._dma     = mmap.mmap(self._dma_fd, dma_size, mmap.MAP_SHARED, mmap.PROT_READ)
+        self.buf      = np.frombuffer(self._dma, dtype=np.uint16)
+        self._words   = np.frombuffer(self._regs, dtype=np.uint32)
+
+    def close(self):
+        self.buf    = None
+        self._words = None
+        self._regs.close()
+        self._dma.close()
+        os.close(self._regs_fd)
+        os.close(self._dma_fd)
+
+    def _reg(self, offset):
+        return int(self._words[offset // 4])
+
+    @property
+    def rle(self):
+        return bool(self._reg(REG_CFG_RLE) & 1)
+
+    def status(self):
+        """Trigger index, post trigger length, last RLE word and overflow flags."""
+        trig, trig_ovfl = trigger_address(self._reg(REG_STS_PRE), len(self.buf))
+        last, last_ovfl = last_address(self._reg(REG_STS_LST), len(self.buf))
+        return {'trigger': trig, 'post': self._reg(REG_STS_PST), 'last': last,
+                'overflow': trig_ovfl if not self.rle else last_ovfl}
+
+    def read(self, pre, post):
+        """Decode the stopped capture of `pre` and `post` trigger samples."""
+        sts = self.status()
+        if self.rle:
+            values, lengths = unroll(self.buf, sts['last'], pre + post)
+            # acquisition stops `post` samples after the trigger
+            return Capture(values, lengths, pre)
+        samples = align(self.buf, sts['trigger'], pre, post)
+        return Capture(samples, np.ones(len(samples), dtype=np.int64), pre)
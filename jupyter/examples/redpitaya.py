@@ -1,4 +1,5 @@
 from ctypes import *
+import collections
 import os
 import numpy as np
 
@@ -29,8 +30,11 @@ class redpitaya (object):
     TRIG_STATE_TRIGGERED = 0 # Trigger is triggered/disabled
     TRIG_STATE_WAITING   = 1 # Trigger is set up and waiting (to be triggered)
 
+    ARB_CACHE_SIZE = 16 # number of converted arbitrary waveforms kept by GenArbWaveform
+
     def __init__(self, bitstream = "/opt/redpitaya/fpga/mercury/fpga.bit", init = True):
         self.rp_api = CDLL('/opt/redpitaya/lib/librp1.so')
+        self.arb_cache = collections.OrderedDict()
         if init:
             os.system('cat '+bitstream+' > /dev/xdevcfg')
             self.Init()
@@ -57,9 +61,33 @@ class redpitaya (object):
     def GenWaveform(self, channel, form):
         return self.rp_api.rp_GenWaveform(channel, form)
 
-    def GenArbWaveform(self, channel, buf):
-        arr = (c_float * len(buf))(*buf)
-        return self.rp_api.rp_GenArbWaveform(channel, arr, len(buf));
+    def GenArbBuffer(self, buf):
+        # returns (array, pointer, length) as passed to rp_GenArbWaveform, the
+        # array keeps the pointer valid; public so that waveforms can be
+        # converted ahead of time, contiguous float32 arrays and buffers are
+        # passed without copying; bytes hold float32 samples, memoryviews and
+        # arrays are converted according to their format
+        arr = np.frombuffer(buf, np.float32) if isinstance(buf, (bytes, bytearray)) else buf
+        arr = np.ascontiguousarray(arr, dtype=np.float32)
+        return arr, arr.ctypes.data_as(POINTER(c_float)), len(arr)
+
+    def GenArbWaveform(self, channel, buf = None, key = None):
+        # waveforms given a key are converted once and kept in an LRU cache,
+        # later calls may pass the key alone; passing buf again replaces the
+        # cached waveform
+        if buf is None:
+            if key not in self.arb_cache:
+                raise KeyError('no arbitrary waveform cached for key {!r}'.format(key))
+            self.arb_cache.move_to_end(key)
+            arb = self.arb_cache[key]
+        else:
+            arb = self.GenArbBuffer(buf)
+            if key is not None:
+                self.arb_cache[key] = arb
+                self.arb_cache.move_to_end(key)
+                if len(self.arb_cache) > self.ARB_CACHE_SIZE:
+                    self.arb_cache.popitem(last=False)
+        return self.rp_api.rp_GenArbWaveform(channel, arb[1], arb[2]);
 
     def GenOutEnable(self, channel):
         return self.rp_api.rp_GenOutEnable(channel)
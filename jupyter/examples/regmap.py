@@ -0,0 +1,212 @@
+"""Declarative FPGA register maps (fpga/regset.rst).
+
+A register map lists registers with named bit fields. A Block maps
+the register space of one IP core once; snapshot() copies all
+registers into a NumPy uint32 array with one copy, fields of
+snapshots are decoded and compared with array operations, and sample
+buffers are exposed as zero-copy views of the mapping:
+
+    osc = Block(OSC)
+    before = osc.snapshot()
+    ...
+    for change in osc.diff(before, osc.snapshot()):
+        print(change)
+    data = osc.buffer('cha')      # int32 view of the channel A buffer
+    osc['trig_src'] = 1           # read-modify-write of a field
+
+The mapped region can be any writable buffer, for example a mmap of a
+regular file for testing.
+"""
+
+import collections
+import os
+
+import numpy as np
+
+from gpio import map_region
+
+Field = collections.namedtuple('Field', ['name', 'offset', 'hi', 'lo', 'signed'])
+Field.__doc__ = """Bit field of a register.
+name   -- 'register' or 'register.field'
+offset -- register byte offset
+hi, lo -- bit range, both included
+signed -- two's complement field
+"""
+
+Change = collections.namedtuple('Change', ['name', 'old', 'new'])
+
+
+def reg(name, offset, *fields):
+    """Fields of a register, given as (field, hi, lo) or (field, hi, lo, signed).
+    A field named None stands for the register, without fields the
+    register is a single 32-bit unsigned field.
+    """
+    out = []
+    for f in fields or ((None, 31, 0),):
+        key = name if f[0] is None else name + '.' + f[0]
+        out.append(Field(key, offset, f[1], f[2], len(f) > 3 and f[3]))
+    return out
+
+
+class RegisterMap(object):
+    """Registers and sample buffers of an IP core."""
+
+    def __init__(self, name, base, fields, buffers=None, span=0x30000):
+        """`fields` is a sequence of Fields (see reg()), `buffers` maps
+        buffer names to (offset, samples), one 32-bit word per sample.
+        `span` is the mapped size, covering registers and buffers.
+        """
+        self.name    = name
+        self.base    = base
+        self.span    = span
+        self.fields  = list(fields)
+        self.buffers = dict(buffers or {})
+        self.index   = dict((f.name, i) for i, f in enumerate(self.fields))
+        self.size    = max(f.offset for f in self.fields) + 4
+        self._word   = np.array([f.offset // 4 for f in self.fields])
+        self._shift  = np.array([f.lo for f in self.fields], dtype=np.uint32)
+        width        = np.array([f.hi - f.lo + 1 for f in self.fields], dtype=np.uint64)
+        self._mask   = ((np.uint64(1) << width) - np.uint64(1)).astype(np.uint32)
+        self._sign   = np.array([f.signed for f in self.fields])
+        self._width  = width.astype(np.int64)
+
+    def decode(self, snapshot):
+        """Values of all fields of a snapshot, as an int64 array."""
+        values = ((snapshot[self._word] >> self._shift) & self._mask).astype(np.int64)
+        negative = self._sign & (values >> (self._width - 1) == 1)
+        values[negative] -= np.int64(1) << self._width[negative]
+        return values
+
+    def values(self, snapshot):
+        """Ordered dict of field values of a snapshot."""
+        return collections.OrderedDict(zip((f.name for f in self.fields), self.decode(snapshot).tolist()))
+
+
+class Block(object):
+    """Mapped register space of an IP core."""
+
+    def __init__(self, regmap, regs=None, dev='/dev/mem'):
+        """`regs` is the mapped space, `dev` is mapped at the base
+        address of the map when not given.
+        """
+        self.map = regmap
+        self._fd = None
+        if regs is None:
+            self._fd, regs = map_region(regmap.base, regmap.span, dev)
+        self._regs = regs
+        self.words = np.frombuffer(regs, dtype=np.uint32)
+
+    def close(self):
+        self.words = None
+        if self._fd is not None:
+            self._regs.close()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def snapshot(self):
+        """Copy of all registers as a uint32 array, indexed by offset/4."""
+        return self.words[:self.map.size // 4].copy()
+
+    def values(self, snapshot=None):
+        """Ordered dict of all field values, of a new snapshot by default."""
+        return self.map.values(self.snapshot() if snapshot is None else snapshot)
+
+    def diff(self, old, new):
+        """Changes of field values between two snapshots."""
+        a, b = self.map.decode(old), self.map.decode(new)
+        return [Change(self.map.fields[i].name, int(a[i]), int(b[i])) for i in np.flatnonzero(a != b)]
+
+    def _field(self, name):
+        try:
+            return self.map.fields[self.map.index[name]]
+        except KeyError:
+            raise KeyError('REGMAP >> {} has no field {!r}'.format(self.map.name, name))
+
+    def __getitem__(self, name):
+        f = self._field(name)
+        value = (int(self.words[f.offset // 4]) >> f.lo) & ((1 << (f.hi - f.lo + 1)) - 1)
+        if f.signed and value >> (f.hi - f.lo):
+            value -= 1 << (f.hi - f.lo + 1)
+        return value
+
+    def __setitem__(self, name, value):
+        """Write a field, other fields of the register are kept."""
+        f = self._field(name)
+        mask = ((1 << (f.hi - f.lo + 1)) - 1) << f.lo
+        i = f.offset // 4
+        word = int(self.words[i]) if mask != 0xffffffff else 0
+        self.words[i] = (word & ~mask) | ((int(value) << f.lo) & mask)
+
+    def buffer(self, name, dtype=np.int32):
+        """Zero-copy view of a sample buffer. With int16 the view holds
+        the lower half of each 32-bit word.
+        """
+        offset, samples = self.map.buffers[name]
+        view = np.frombuffer(self._regs, dtype=np.int32, count=samples, offset=offset)
+        if np.dtype(dtype) == np.int16:
+            return view.view(np.int16)[::2]
+        return view.view(dtype)
+
+
+def _channel(prefix, base):
+    """Generator channel registers."""
+    return (reg(prefix + 'amp',   base + 0x00, ('offset', 29, 16, True), ('scale', 13, 0)) +
+            reg(prefix + 'wrap',  base + 0x04, (None, 29, 0)) +
+            reg(prefix + 'start', base + 0x08, (None, 29, 0)) +
+            reg(prefix + 'step',  base + 0x0c, (None, 29, 0)) +
+            reg(prefix + 'rp',    base + 0x10, (None, 15, 2)) +
+            reg(prefix + 'ncyc',  base + 0x14, (None, 15, 0)) +
+            reg(prefix + 'nor',   base + 0x18, (None, 15, 0)) +
+            reg(prefix + 'delay', base + 0x1c))
+
+
+def _axi(prefix, base):
+    """Oscilloscope AXI master registers."""
+    return (reg(prefix + 'axi_lower',   base + 0x00) +
+            reg(prefix + 'axi_upper',   base + 0x04) +
+            reg(prefix + 'axi_dly',     base + 0x08) +
+            reg(prefix + 'axi_en',      base + 0x0c, (None, 0, 0)) +
+            reg(prefix + 'axi_wp_trig', base + 0x10) +
+            reg(prefix + 'axi_wp_cur',  base + 0x14))
+
+
+def _filter(prefix, base):
+    """Oscilloscope equalization filter registers."""
+    return (reg(prefix + 'filt_aa', base + 0x0, (None, 17, 0)) +
+            reg(prefix + 'filt_bb', base + 0x4, (None, 24, 0)) +
+            reg(prefix + 'filt_kk', base + 0x8, (None, 24, 0)) +
+            reg(prefix + 'filt_pp', base + 0xc, (None, 24, 0)))
+
+
+OSC = RegisterMap('osc', 0x40100000,
+                  reg('conf', 0x00, ('arm', 0, 0), ('rst', 1, 1), ('trig_post', 2, 2)) +
+                  reg('trig_src', 0x04, (None, 3, 0)) +
+                  reg('cha_thr', 0x08, (None, 13, 0, True)) +
+                  reg('chb_thr', 0x0c, (None, 13, 0, True)) +
+                  reg('trig_dly', 0x10) +
+                  reg('dec', 0x14, (None, 16, 0)) +
+                  reg('wp_cur', 0x18, (None, 13, 0)) +
+                  reg('wp_trig', 0x1c, (None, 13, 0)) +
+                  reg('cha_hyst', 0x20, (None, 13, 0)) +
+                  reg('chb_hyst', 0x24, (None, 13, 0)) +
+                  reg('avg', 0x28, (None, 0, 0)) +
+                  reg('pre_trig_cnt', 0x2c) +
+                  _filter('cha_', 0x30) + _filter('chb_', 0x40) +
+                  _axi('cha_', 0x50) + _axi('chb_', 0x70) +
+                  reg('trig_debounce', 0x90, (None, 19, 0)) +
+                  reg('cha_offs', 0xa4, (None, 13, 0, True)) +
+                  reg('chb_offs', 0xa8, (None, 13, 0, True)),
+                  buffers={'cha': (0x10000, 16384), 'chb': (0x20000, 16384)})
+
+GEN = RegisterMap('gen', 0x40200000,
+                  reg('conf', 0x00,
+                      ('cha_trig', 3, 0), ('cha_wrap', 4, 4), ('cha_rst', 6, 6), ('cha_zero', 7, 7), ('cha_gated', 8, 8),
+                      ('chb_trig', 19, 16), ('chb_wrap', 20, 20), ('chb_rst', 22, 22), ('chb_zero', 23, 23), ('chb_gated', 24, 24)) +
+                  _channel('cha_', 0x04) + _channel('chb_', 0x24),
+                  buffers={'cha': (0x10000, 16384), 'chb': (0x20000, 16384)})
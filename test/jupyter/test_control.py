@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import ctypes
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import control
+
+
+class Plant(object):
+    """First order system standing in for librp, AO0 drives AI0."""
+
+    def __init__(self, gain=2.0, tau=0.01, period=1e-3):
+        self.x = 0.0
+        self.u = 0.0
+        self.a = period / tau
+        self.gain = gain
+        self.rp_AIpinGetValue = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_uint, ctypes.POINTER(ctypes.c_float))(self.get)
+        self.rp_AOpinSetValue = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_uint, ctypes.c_float)(self.set)
+
+    def get(self, pin, value):
+        self.x += self.a * (self.gain * self.u - self.x)
+        value[0] = self.x
+        return 0
+
+    def set(self, pin, value):
+        self.u = value
+        return 0
+
+
+class TestControl(unittest.TestCase):
+
+    def test_pid_settles(self):
+        plant = Plant()
+        pid = control.Pid(kp=0.5, ki=50.0, setpoint=1.0, period=1e-3)
+        loop = control.Loop(plant, [0], [0], pid, period=1e-3)
+        loop.run(iterations=500)
+        self.assertAlmostEqual(plant.x, 1.0, places=2)
+        self.assertAlmostEqual(plant.u, 0.5, places=2)
+
+    def test_saturation(self):
+        plant = Plant(gain=0.1)
+        pid = control.Pid(kp=1.0, ki=100.0, setpoint=1.0, period=1e-3)
+        control.Loop(plant, [0], [0], pid, period=1e-3).run(iterations=100)
+        self.assertAlmostEqual(plant.u, control.AO_MAX, places=5)
+        self.assertLess(pid.integral * pid.ki, control.AO_MAX * 2)
+
+    def test_statistics(self):
+        loop = control.Loop(Plant(), [0], [0], lambda inputs, outputs: None, period=1e-3)
+        loop.run(duration=0.2)
+        self.assertEqual(loop.iterations, 200)
+        self.assertEqual(loop.late_hist.sum(), 200)
+        self.assertEqual(loop.period_hist.sum(), 199)
+        self.assertAlmostEqual(loop.percentile(loop.period_hist, 50), 1e-3, delta=1e-4)
+
+    def test_stop(self):
+        loop = control.Loop(Plant(), [0], [0], None, period=1e-4)
+        loop.step = lambda inputs, outputs: loop.stop() if loop.late_hist.sum() >= 9 else None
+        loop.run()
+        self.assertEqual(loop.iterations, 10)
+
+
+class TestLibrary(unittest.TestCase):
+
+    def test_load(self):
+        api = mock.Mock()
+        api.rp_Init.return_value = 0
+        with mock.patch.object(ctypes, 'CDLL', return_value=api) as cdll:
+            self.assertIs(control.load(), api)
+        cdll.assert_called_once_with(control.LIBRP)
+        api.rp_Init.return_value = 1
+        with mock.patch.object(ctypes, 'CDLL', return_value=api):
+            self.assertRaises(OSError, control.load)
+
+    def test_no_analog_pins(self):
+        # librp1 does not export the analog pin functions
+        self.assertRaises(AttributeError, control.Loop, object(), [0], [0], None)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
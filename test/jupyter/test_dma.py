@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import dma
+
+
+class TestDma(unittest.TestCase):
+
+    count = 4
+    size  = 4096
+
+    def setUp(self):
+        data = np.arange(self.count * self.size // 2, dtype=np.int16)
+        fd, self.path = tempfile.mkstemp()
+        os.write(fd, data.tobytes())
+        os.close(fd)
+        self.requests = []
+        self.dma = dma.Dma(self.path, self.count, self.size,
+                           control=lambda fd, request, arg: self.requests.append((request, arg)))
+
+    def tearDown(self):
+        self.dma.close()
+        os.remove(self.path)
+
+    def test_setup(self):
+        self.assertEqual(self.requests, [(dma.SET_RX_SGMNT_CNT, self.count), (dma.SET_RX_SGMNT_SIZE, self.size)])
+        self.assertEqual(self.dma.segments.shape, (self.count, self.size // 2))
+
+    def test_zero_copy(self):
+        self.dma.segments[1][0] = -1
+        with open(self.path, 'rb') as f:
+            f.seek(self.size)
+            self.assertEqual(np.frombuffer(f.read(2), dtype=np.int16)[0], -1)
+
+    def test_ring(self):
+        indices = []
+        for segment in self.dma.ring(2 * self.count):
+            with segment:
+                indices.append(segment.index)
+                self.assertEqual(segment.data[0], segment.index * self.size // 2)
+        self.assertEqual(indices, list(range(self.count)) * 2)
+
+    def test_overrun(self):
+        held = []
+        with self.assertRaises(BufferError):
+            for segment in self.dma.ring(2 * self.count):
+                held.append(segment)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
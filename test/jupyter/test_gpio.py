@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import gpio
+
+
+class TestGpio(unittest.TestCase):
+
+    def setUp(self):
+        self.file = tempfile.TemporaryFile()
+        self.file.write(bytes(gpio.HK_SIZE))
+        self.file.flush()
+        self.regs = mmap.mmap(self.file.fileno(), gpio.HK_SIZE)
+        self.gpio = gpio.Gpio(self.regs)
+
+    def tearDown(self):
+        self.gpio.close()
+        self.regs.close()
+        self.file.close()
+
+    def word(self, offset):
+        return struct.unpack_from('<I', self.regs, offset)[0]
+
+    def test_read(self):
+        struct.pack_into('<I', self.regs, gpio.EXP_P_IN, 0xa5)
+        struct.pack_into('<I', self.regs, gpio.EXP_N_IN, 0x1ff)
+        self.assertEqual(self.gpio.p.read(), 0xa5)
+        self.assertEqual(self.gpio.n.read(), 0xff)
+
+    def test_masked_write(self):
+        self.gpio.n.write(0xf0)
+        self.gpio.n.write(0x0f, mask=0x03)
+        self.assertEqual(self.word(gpio.EXP_N_OUT), 0xf3)
+        self.gpio.led.write(0x00, mask=0x80)
+        self.gpio.led.write(0xff, mask=0x01)
+        self.assertEqual(self.word(gpio.LED), 0x01)
+        self.assertEqual(self.gpio.led.read(), 0x01)
+
+    def test_direction(self):
+        self.assertEqual(self.gpio.p.direction(0xff, mask=0x0f), 0x0f)
+        self.assertEqual(self.word(gpio.EXP_P_DIR), 0x0f)
+        self.assertRaises(AttributeError, self.gpio.led.direction, 1)
+
+    def test_copy(self):
+        struct.pack_into('<I', self.regs, gpio.EXP_P_IN, 0x3c)
+        self.gpio.n.write(self.gpio.p.read())
+        self.assertEqual(self.gpio.n.output(), 0x3c)
+
+    def test_concurrent_updates(self):
+        def toggle(bit):
+            for i in range(2000):
+                self.gpio.led.write(i & 1 and 0xff, mask=1 << bit)
+            self.gpio.led.write(0xff, mask=1 << bit)
+        threads = [threading.Thread(target=toggle, args=(bit,)) for bit in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.gpio.led.output(), 0xff)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
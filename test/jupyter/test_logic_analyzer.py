@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import logic_analyzer as la
+
+
+def encode(samples):
+    """Reference RLE encoder, runs are limited to 256 samples."""
+    words = []
+    prev, count = int(samples[0]), 0
+    for s in samples[1:]:
+        if s == prev and count < 255:
+            count += 1
+        else:
+            words.append((count << 8) | prev)
+            prev, count = int(s), 0
+    words.append((count << 8) | prev)
+    return np.array(words, dtype=np.uint16)
+
+
+class TestRle(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.samples = np.repeat(rng.randint(0, 256, 500), rng.randint(1, 600, 500)).astype(np.uint8)
+        self.words   = encode(self.samples)
+
+    def test_expand(self):
+        values, lengths = la.runs(self.words)
+        np.testing.assert_array_equal(la.expand(values, lengths), self.samples)
+
+    def test_unroll_wrapped(self):
+        buf = np.concatenate((self.words, np.zeros(100, dtype=np.uint16)))
+        # newest words wrap around to the start of the buffer
+        shift = len(buf) - len(self.words) // 2
+        buf = np.roll(buf, shift)
+        last = (len(self.words) - 1 + shift) % len(buf)
+        total = len(self.samples) - 1000
+        values, lengths = la.unroll(buf, last, total)
+        np.testing.assert_array_equal(la.expand(values, lengths), self.samples[-total:])
+
+    def test_transitions(self):
+        values, lengths = la.runs(self.words)
+        planes = la.bitplanes(self.samples)
+        for bit, (pos, level) in enumerate(la.transitions(values, lengths)):
+            expected = np.flatnonzero(np.diff(planes[bit].astype(np.int8))) + 1
+            np.testing.assert_array_equal(pos, expected)
+            np.testing.assert_array_equal(level, planes[bit][expected])
+
+    def test_trigger(self):
+        self.assertEqual(la.trigger_address(5, 16), (4, False))
+        self.assertEqual(la.trigger_address(16, 16), (15, True))
+        buf = np.arange(16, dtype=np.uint16)
+        np.testing.assert_array_equal(la.align(buf, 1, 3, 2), [14, 15, 0, 1, 2])
+
+
+class TestLogicAnalyzer(unittest.TestCase):
+    """Register set and DMA ring mapped from regular files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.regs = np.zeros(la.LA_ACQ_BASE_SIZE // 4, dtype=np.uint32)
+        self.ring = np.zeros(la.DMA_SIZE // 2, dtype=np.uint16)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open(self):
+        dev, dma = os.path.join(self.tmp.name, 'la'), os.path.join(self.tmp.name, 'rprx')
+        self.regs.tofile(dev)
+        self.ring.tofile(dma)
+        return la.LogicAnalyzer(dev, dma)
+
+    def test_ring_length(self):
+        # the real ring holds 1M samples, trigger positions wrap at it
+        self.ring[:] = np.arange(len(self.ring)) & 0xff
+        self.regs[la.REG_STS_PRE // 4] = (1 << 20) + 10
+        self.regs[la.REG_STS_PST // 4] = 5
+        analyzer = self.open()
+        try:
+            self.assertEqual(len(analyzer.buf), 1 << 20)
+            status = analyzer.status()
+            self.assertEqual((status['trigger'], status['overflow']), (9, True))
+            capture = analyzer.read(20, 5)
+        finally:
+            analyzer.close()
+        np.testing.assert_array_equal(capture.samples(), (np.arange(-11, 14) % (1 << 20)) & 0xff)
+
+    def test_rle_ring(self):
+        rng = np.random.RandomState(2)
+        samples = np.repeat(rng.randint(0, 256, 300), rng.randint(1, 600, 300)).astype(np.uint8)
+        words = encode(samples)
+        # newest words wrap around the end of the 1M word ring
+        start = len(self.ring) - len(words) // 2
+        self.ring[(start + np.arange(len(words))) % len(self.ring)] = words
+        self.regs[la.REG_CFG_RLE // 4] = 1
+        self.regs[la.REG_STS_LST // 4] = start + len(words)
+        analyzer = self.open()
+        try:
+            self.assertEqual(analyzer.status()['last'], (start + len(words) - 1) % len(self.ring))
+            # the word counter passed the ring length, older words were overwritten
+            self.assertTrue(analyzer.status()['overflow'])
+            capture = analyzer.read(50000, 1000)
+        finally:
+            analyzer.close()
+        np.testing.assert_array_equal(capture.samples(), samples[-51000:])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
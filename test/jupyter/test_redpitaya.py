@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import ctypes
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import redpitaya
+
+
+class Api(object):
+    """Stand-in for librp1, records the waveforms passed to the generator."""
+
+    def __init__(self):
+        self.waveforms = []
+
+    def rp_GenArbWaveform(self, channel, data, length):
+        self.waveforms.append((channel, ctypes.addressof(data.contents), np.ctypeslib.as_array(data, (length,)).copy()))
+        return 0
+
+    def rp_Release(self):
+        return 0
+
+
+class TestArbWaveform(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api()
+        with mock.patch.object(redpitaya, 'CDLL', return_value=self.api):
+            self.rp = redpitaya.redpitaya(init=False)
+
+    def test_no_copy(self):
+        wave = np.linspace(-1, 1, 1000, dtype=np.float32)
+        self.rp.GenArbWaveform(1, wave)
+        self.assertEqual(self.api.waveforms[0][1], wave.ctypes.data)
+        self.rp.GenArbWaveform(2, [0.0, 0.5, 1.0])
+        np.testing.assert_array_equal(self.api.waveforms[1][2], [0.0, 0.5, 1.0])
+
+    def test_cache(self):
+        wave = np.sin(np.linspace(0, 2 * np.pi, 1000))
+        with mock.patch.object(self.rp, 'GenArbBuffer', wraps=self.rp.GenArbBuffer) as convert:
+            self.rp.GenArbWaveform(1, wave, key='sine')
+            self.rp.GenArbWaveform(2, key='sine')
+            self.rp.GenArbWaveform(1, key='sine')
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(len(set(address for ch, address, data in self.api.waveforms)), 1)
+        np.testing.assert_allclose(self.api.waveforms[2][2], wave, rtol=1e-6)
+        self.assertRaises(KeyError, self.rp.GenArbWaveform, 1, key='square')
+
+    def test_new_data_replaces_cached(self):
+        self.rp.GenArbWaveform(1, [0.0, 1.0], key='wave')
+        self.rp.GenArbWaveform(1, [0.5, -0.5, 0.25], key='wave')
+        self.rp.GenArbWaveform(2, key='wave')
+        np.testing.assert_array_equal(self.api.waveforms[1][2], [0.5, -0.5, 0.25])
+        np.testing.assert_array_equal(self.api.waveforms[2][2], [0.5, -0.5, 0.25])
+
+    def test_buffer_formats(self):
+        wave = np.array([0.25, -0.5, 1.0])
+        self.rp.GenArbWaveform(1, memoryview(wave))
+        self.rp.GenArbWaveform(1, wave.astype(np.float32).tobytes())
+        self.rp.GenArbWaveform(1, bytearray(wave.astype(np.float32).tobytes()))
+        for ch, address, data in self.api.waveforms:
+            np.testing.assert_array_equal(data, wave)
+
+    def test_cache_size(self):
+        for k in range(self.rp.ARB_CACHE_SIZE + 1):
+            self.rp.GenArbWaveform(1, [float(k)], key=k)
+        self.rp.GenArbWaveform(1, key=1)
+        self.rp.GenArbWaveform(1, [99.0], key=self.rp.ARB_CACHE_SIZE + 2)
+        self.assertNotIn(0, self.rp.arb_cache)
+        self.assertIn(1, self.rp.arb_cache)
+        self.assertNotIn(2, self.rp.arb_cache)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
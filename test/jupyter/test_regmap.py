@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'jupyter', 'examples'))
+import regmap
+
+
+class TestRegmap(unittest.TestCase):
+
+    def setUp(self):
+        self.file = tempfile.TemporaryFile()
+        self.file.write(bytes(regmap.OSC.span))
+        self.file.flush()
+        self.regs = mmap.mmap(self.file.fileno(), regmap.OSC.span)
+        self.osc = regmap.Block(regmap.OSC, self.regs)
+
+    def tearDown(self):
+        self.osc.close()
+        self.regs.close()
+        self.file.close()
+
+    def test_fields(self):
+        struct.pack_into('<I', self.regs, 0x08, 0x3fff)
+        struct.pack_into('<I', self.regs, 0x14, 1024)
+        self.assertEqual(self.osc['cha_thr'], -1)
+        self.assertEqual(self.osc['dec'], 1024)
+        values = self.osc.values()
+        self.assertEqual(values['cha_thr'], -1)
+        self.assertEqual(values['dec'], 1024)
+
+    def test_write_field(self):
+        self.osc['conf.rst'] = 1
+        self.osc['conf.arm'] = 1
+        self.osc['conf.rst'] = 0
+        self.osc['cha_thr'] = -2
+        self.assertEqual(struct.unpack_from('<I', self.regs, 0x00)[0], 1)
+        self.assertEqual(struct.unpack_from('<I', self.regs, 0x08)[0], 0x3ffe)
+        self.assertRaises(KeyError, self.osc.__getitem__, 'nope')
+
+    def test_diff(self):
+        before = self.osc.snapshot()
+        self.osc['trig_dly'] = 100
+        self.osc['conf.trig_post'] = 1
+        after = self.osc.snapshot()
+        self.assertEqual(before.dtype, np.uint32)
+        self.assertEqual(self.osc.diff(before, after),
+                         [regmap.Change('conf.trig_post', 0, 1), regmap.Change('trig_dly', 0, 100)])
+
+    def test_buffer(self):
+        data = self.osc.buffer('cha')
+        data16 = self.osc.buffer('chb', dtype=np.int16)
+        self.assertEqual(len(data), 16384)
+        struct.pack_into('<i', self.regs, 0x10000 + 8, -5)
+        struct.pack_into('<h', self.regs, 0x20000 + 12, -7)
+        self.assertEqual(data[2], -5)
+        self.assertEqual(data16[3], -7)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+"""Stand-in SCPI server emulating the acquisition of a board.
+
+The buffer of each channel holds known RAW samples. Data queries are
+answered as by scpi-server, except that ranged reads crossing the end
+of the buffer (which overrun the reply buffer of the real server) are
+counted in `overruns`.
+"""
+
+import socketserver
+import threading
+
+import numpy as np
+
+BUFF_SIZE = 16384
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        board = self.server
+        buf = b''
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                return
+            *cmds, buf = (buf + data).split(b'\r\n')
+            out = []
+            for cmd in cmds:
+                cmd = cmd.decode()
+                with board.lock:
+                    board.commands.append(cmd)
+                    reply = board.reply(cmd)
+                if reply is not None:
+                    out.append(reply)
+            if out:
+                self.request.sendall(b''.join(out))
+
+
+class Board(socketserver.ThreadingTCPServer):
+
+    daemon_threads      = True
+    allow_reuse_address = True
+
+    def __init__(self, data=None, wpos=BUFF_SIZE - 1, tpos=BUFF_SIZE // 2, triggered=True):
+        """`data` is shaped (2, BUFF_SIZE), indexed by buffer address."""
+        if data is None:
+            data = np.arange(2 * BUFF_SIZE, dtype=np.int16).reshape(2, BUFF_SIZE)
+        self.data      = np.asarray(data, dtype=np.int16)
+        self.wpos      = wpos
+        self.tpos      = tpos
+        self.triggered = triggered
+        self.gain      = 'LV'
+        self.commands  = []
+        self.overruns  = 0
+        self.lock      = threading.Lock()
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+    def _block(self, samples):
+        payload = samples.astype('>i2').tobytes()
+        length = str(len(payload)).encode()
+        return b'#' + str(len(length)).encode() + length + payload + b'\r\n'
+
+    def reply(self, cmd):
+        header, _, args = cmd.partition(' ')
+        if not header.endswith('?'):
+            return None
+        if header == 'ACQ:TRIG:STAT?':
+            return b'TD\r\n' if self.triggered else b'WAIT\r\n'
+        if header == 'ACQ:TPOS?':
+            return '{:d}\r\n'.format(self.tpos).encode()
+        if header == 'ACQ:WPOS?':
+            return '{:d}\r\n'.format(self.wpos).encode()
+        if header.endswith(':GAIN?'):
+            return (self.gain + '\r\n').encode()
+        if header.startswith('ACQ:SOUR') and ':DATA' in header:
+            channel = int(header[len('ACQ:SOUR')]) - 1
+            if header.endswith(':DATA?'):
+                return self._block(np.roll(self.data[channel], -(self.wpos + 1)))
+            if header.endswith(':DATA:LAT:N?'):
+                # the latest samples end at the write pointer
+                size = int(args)
+                return self._block(self.data[channel][(self.wpos + 1 - size + np.arange(size)) % BUFF_SIZE])
+            start, size = [int(v) for v in args.split(',')]
+            if start + size > BUFF_SIZE:
+                self.overruns += 1
+            return self._block(self.data[channel][(start + np.arange(size)) % BUFF_SIZE])
+        return b'1\r\n'
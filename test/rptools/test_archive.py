@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import archive
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.rpa')
+        os.close(fd)
+        rng = np.random.RandomState(0)
+        # slow signal with noise, and full scale steps which wrap the int16 deltas
+        t = np.arange(1000)
+        self.frames = (4000 * np.sin(t / 50.0 + rng.uniform(0, 6, (37, 2, 1))) +
+                       rng.randint(-20, 20, (37, 2, 1000))).astype(np.int16)
+        self.frames[3, 0, ::2] = 32767
+        self.frames[3, 0, 1::2] = -32768
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def round_trip(self, **kwargs):
+        with archive.Writer(self.path, (2, 1000), chunk=8, workers=2, **kwargs) as w:
+            w.write(self.frames[:5])
+            for frame in self.frames[5:]:
+                w.write(frame)
+        self.assertEqual(w.frames, 37)
+        with archive.Reader(self.path) as r:
+            self.assertEqual(len(r), 37)
+            self.assertEqual(r.frames, 37)
+            self.assertEqual(r.shape, (2, 1000))
+            np.testing.assert_array_equal(np.array(list(r)), self.frames)
+            # random access into the last, partial chunk and backwards
+            for i in (36, 3, -1, 17, 0):
+                np.testing.assert_array_equal(r[i], self.frames[i])
+            self.assertRaises(IndexError, r.__getitem__, 37)
+
+    def test_codecs(self):
+        for codec in ('zlib', 'lzma', 'bz2'):
+            self.round_trip(codec=codec)
+
+    def test_filters(self):
+        for filters in ((), ('delta',), ('shuffle',), ('delta', 'shuffle')):
+            self.round_trip(filters=filters, level=1)
+
+    def test_byte_order(self):
+        # the stored bytes are '<i2' as declared in the header, whatever the input order
+        data = np.array([[0x0102, -2]], dtype='>i2')
+        self.assertEqual(archive.encode(data, ()), b'\x02\x01\xfe\xff')
+        self.assertEqual(archive.encode(data, ('shuffle',)), b'\x02\xfe\x01\xff')
+        for filters in ((), ('shuffle',), ('delta', 'shuffle')):
+            out = archive.decode(archive.encode(data, filters), (1, 2), filters)
+            self.assertEqual(out.dtype, np.dtype(np.int16))
+            np.testing.assert_array_equal(out, data)
+
+    def test_not_an_archive(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'RPARC000' + bytes(64))
+        self.assertRaises(ValueError, archive.Reader, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
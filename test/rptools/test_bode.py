@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import acq
+from rptools import bode
+from board import Board, BUFF_SIZE
+
+
+class Filter(Board):
+    """Board whose CH2 sees the generator through a first order low pass."""
+
+    corner = 20e3
+
+    def __init__(self):
+        Board.__init__(self, wpos=5000)
+        self.freq = None
+        self.dec  = 1
+
+    def fill(self):
+        # the oldest sample follows the write pointer
+        t = ((np.arange(BUFF_SIZE) - self.wpos - 1) % BUFF_SIZE) * self.dec / acq.FS
+        h = 1 / (1 + 1j * self.freq / self.corner)
+        x = 4000 * np.exp(2j * np.pi * self.freq * t)
+        self.data = np.array([x.real, (h * x).real]).round().astype(np.int16)
+
+    def reply(self, cmd):
+        header, _, args = cmd.partition(' ')
+        if header == 'SOUR1:FREQ:FIX':
+            self.freq = float(args)
+        elif header == 'ACQ:DEC':
+            self.dec = int(args)
+        elif header == 'ACQ:TRIG':
+            self.fill()
+        return Board.reply(self, cmd)
+
+
+class TestBode(unittest.TestCase):
+
+    def test_plan_point(self):
+        for freq in (10.0, 1e3, 123456.0, 10e6):
+            dec, n = bode.plan_point(freq)
+            periods = n * dec * freq / acq.FS
+            self.assertGreaterEqual(periods, 9.5)
+            self.assertLessEqual(n, acq.BUFF_SIZE)
+            # the smallest decimation is used
+            i = acq.DECIMATION.index(dec)
+            if i:
+                self.assertLess(acq.BUFF_SIZE * acq.DECIMATION[i - 1] * freq / acq.FS, 10)
+        self.assertRaises(ValueError, bode.plan_point, 0.01)
+
+    def test_response(self):
+        freq = 123456.0
+        dec, n = bode.plan_point(freq)
+        t = np.arange(n) * dec / acq.FS
+        data = np.array([1000 * np.sin(2 * np.pi * freq * t),
+                         250 * np.sin(2 * np.pi * freq * t - np.radians(60))])
+        gain, phase = bode.response(data, freq, dec)
+        self.assertAlmostEqual(float(gain), 0.25, places=3)
+        self.assertAlmostEqual(float(phase), -60, delta=0.1)
+        # batches of captures give one result per capture
+        gain, phase = bode.response(np.stack([data, 2 * data[::-1]]), freq, dec)
+        np.testing.assert_allclose(gain, [0.25, 4.0], rtol=1e-3)
+        np.testing.assert_allclose(phase, [-60, 60], atol=0.1)
+
+    def test_sweep(self):
+        board = Filter()
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        freqs = (1e3, 20e3, 200e3)
+        try:
+            f, gain, phase = bode.sweep(rp_s, freqs, settle=0)
+        finally:
+            rp_s.close()
+            board.close()
+        h = 1 / (1 + 1j * np.array(freqs) / Filter.corner)
+        np.testing.assert_array_equal(f, freqs)
+        np.testing.assert_allclose(gain, np.abs(h), rtol=1e-3)
+        np.testing.assert_allclose(phase, np.degrees(np.angle(h)), atol=0.1)
+        # one trigger per point, settings of the next point follow the data queries
+        self.assertEqual(board.commands.count('ACQ:TRIG NOW'), len(freqs))
+        i = board.commands.index('ACQ:SOUR2:DATA:LAT:N? {:d}'.format(bode.plan_point(1e3)[1]))
+        self.assertEqual(board.commands[i + 1], 'SOUR1:FREQ:FIX 20000.0')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
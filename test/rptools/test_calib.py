@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import calib
+from board import Board
+
+# rp_calib_params_t: high and low gain full scales, offsets, back end, magic, high gain offsets
+EEPROM = bytes(calib.EEPROM_OFFS) + calib.PARAMS.pack(28101971, 29205456, 625682246, 601295421, -150, 40,
+                                                      42949673, 42949673, 0, 0, calib.CALIB_MAGIC, 585, -300)
+
+
+class TestCalibration(unittest.TestCase):
+
+    def setUp(self):
+        self.calibration = calib.Calibration.parse(EEPROM)
+
+    def test_parse(self):
+        c = self.calibration
+        self.assertEqual(c.fe_fs_g_lo, [625682246, 601295421])
+        self.assertEqual(c.offset(2, 'HV'), -300)
+        self.assertEqual(c.offset(1, 'LV'), -150)
+        old = EEPROM[:calib.EEPROM_OFFS + 40] + bytes(4) + EEPROM[calib.EEPROM_OFFS + 44:]
+        self.assertEqual(calib.Calibration.parse(old).fe_hi_offs, [-150, 40])
+
+    def test_server_volts(self):
+        # ACQ:DATA:UNITS VOLTS replies of acq_GetDataV() for the same RAW samples
+        c = self.calibration
+        for raw, channel, gain, volts in ((4096, 1, 'LV', 0.364195), (-8192, 2, 'LV', -0.7),
+                                          (1000, 1, 'HV', 1.5974122), (-123, 2, 'HV', -0.20419696)):
+            out = c.to_volts(np.array([raw], dtype='>i2'), channel, gain)
+            self.assertEqual(out.dtype, np.float32)
+            self.assertAlmostEqual(float(out[0]), volts, places=6)
+
+    def test_read_volts(self):
+        board = Board()
+        board.gain = 'HV'
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        try:
+            volts = calib.read_volts(rp_s, self.calibration, (1, 2), -100, 200)
+        finally:
+            rp_s.close()
+            board.close()
+        self.assertEqual(volts.shape, (2, 200))
+        raw = board.data[:, np.arange(-100, 100) % board.data.shape[1]]
+        for i, ch in enumerate((1, 2)):
+            np.testing.assert_allclose(volts[i], raw[i] * self.calibration.coefficient(ch, 'HV'), rtol=1e-6)
+        self.assertEqual(board.overruns, 0)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache:
+            path = os.path.join(cache, 'calib-rp.json')
+            with open(path, 'w') as f:
+                json.dump(self.calibration.to_dict(), f)
+            loaded = calib.load('rp', cache, fetch=False)
+            self.assertEqual(loaded.to_dict(), self.calibration.to_dict())
+            # caches of older versions are fetched again
+            with open(path, 'w') as f:
+                json.dump({'fe_fs_g': [[1, 2], [3, 4]]}, f)
+            self.assertRaises(IOError, calib.load, 'rp', cache, fetch=False)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+from rptools import acq
+from rptools import calib
+from rptools import cli
+from board import Board, BUFF_SIZE
+
+
+class TestDataCmds(unittest.TestCase):
+
+    def test_whole_buffer(self):
+        self.assertEqual(acq.data_cmds(1), ['ACQ:SOUR1:DATA?'])
+
+    def test_range(self):
+        self.assertEqual(acq.data_cmds(2, -100, 50), ['ACQ:SOUR2:DATA:STA:N? 16284,50'])
+
+    def test_wrapping_range(self):
+        self.assertEqual(acq.data_cmds(1, BUFF_SIZE - 10, 30),
+                         ['ACQ:SOUR1:DATA:STA:N? 16374,10', 'ACQ:SOUR1:DATA:STA:N? 0,20'])
+        self.assertEqual(acq.data_cmds(1, 5, BUFF_SIZE),
+                         ['ACQ:SOUR1:DATA:STA:N? 5,16379', 'ACQ:SOUR1:DATA:STA:N? 0,5'])
+        self.assertRaises(ValueError, acq.data_cmds, 1, 0, BUFF_SIZE + 1)
+
+
+class TestAcquire(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+
+    def tearDown(self):
+        self.board.close()
+        os.remove(self.path)
+
+    def acquire(self, *args):
+        cli.acquire_main(['127.0.0.1', '--port', str(self.board.port), '-o', self.path] + list(args))
+        return np.load(self.path)
+
+    def test_whole_buffer(self):
+        self.board = Board(wpos=100)
+        data = self.acquire('-n', '2', '-c', '1', '2')
+        self.assertEqual(data.shape, (2, 2, BUFF_SIZE))
+        self.assertEqual(data.dtype, np.dtype('>i2'))
+        np.testing.assert_array_equal(data[1, 1], np.roll(self.board.data[1], -101))
+
+    def test_range_across_buffer_end(self):
+        self.board = Board(tpos=BUFF_SIZE - 10)
+        data = self.acquire('-s', '-20', '-N', '100')
+        np.testing.assert_array_equal(data[0, 0], self.board.data[0][(np.arange(100) + BUFF_SIZE - 30) % BUFF_SIZE])
+        self.assertEqual(self.board.overruns, 0)
+
+    def test_volts(self):
+        self.board = Board(tpos=100)
+        self.board.gain = 'HV'
+        c = calib.Calibration((28101971, 29205456), (625682246, 601295421), (-150, 40), (585, -300))
+        with tempfile.TemporaryDirectory() as cache:
+            with open(os.path.join(cache, 'calib-127.0.0.1.json'), 'w') as f:
+                json.dump(c.to_dict(), f)
+            data = self.acquire('--volts', '--calib-cache', cache, '-c', '1', '2', '-s', '-200', '-N', '1000')
+        self.assertEqual(data.shape, (1, 2, 1000))
+        self.assertEqual(data.dtype, np.dtype(np.float32))
+        for i, ch in enumerate((1, 2)):
+            raw = self.board.data[i][np.arange(-100, 900) % BUFF_SIZE]
+            np.testing.assert_allclose(data[0, i], raw * c.coefficient(ch, 'HV'), rtol=1e-6)
+        # RAW samples are transferred, the server never converts
+        self.assertIn('ACQ:DATA:UNITS RAW', self.board.commands)
+        self.assertNotIn('ACQ:DATA:UNITS VOLTS', self.board.commands)
+
+    def test_trigger_timeout(self):
+        self.board = Board(triggered=False)
+        with self.assertRaises(SystemExit) as cm:
+            self.acquire('-n', '3', '--timeout', '0.2')
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(np.load(self.path).shape, (0, 1, BUFF_SIZE))
+
+    def test_connect_failed(self):
+        self.board = Board()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        with self.assertRaises(SystemExit) as cm:
+            cli.acquire_main(['127.0.0.1', '--port', str(port), '--timeout', '1', '-o', self.path])
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
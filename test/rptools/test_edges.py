@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import edges
+
+
+def square(n, highs):
+    """Samples at -1 with [start, stop) ranges at +1."""
+    x = -np.ones(n)
+    for start, stop in highs:
+        x[start:stop] = 1
+    return x
+
+
+class TestEdgeIndex(unittest.TestCase):
+
+    def test_edges_across_chunks(self):
+        x = square(100, [(10, 20), (40, 55), (60, 70)])
+        index = edges.EdgeIndex([0.0])
+        for a in range(0, 100, 7):
+            index.feed(x[None, a:a + 7])
+        np.testing.assert_array_equal(index.edges(0, 0.0), [10, 40, 60])
+        np.testing.assert_array_equal(index.edges(0, 0.0, rising=False), [20, 55, 70])
+        self.assertEqual(index.count(0, 0.0, t0=15, t1=60), 2)
+
+    def test_pulses_after_feed(self):
+        x = square(100, [(10, 20), (40, 55), (60, 70)])
+        index = edges.EdgeIndex([0.0])
+        index.feed(x[None, :50])
+        np.testing.assert_array_equal(index.pulses(0, 0.0)[0], [10])
+        index.feed(x[None, 50:])
+        np.testing.assert_array_equal(index.edges(0, 0.0), [10, 40, 60])
+        start, width = index.pulses(0, 0.0)
+        np.testing.assert_array_equal(start, [10, 40, 60])
+        np.testing.assert_array_equal(width, [10, 15, 10])
+        start, width = index.pulses(0, 0.0, positive=False, min_width=10)
+        np.testing.assert_array_equal(start, [20])
+        np.testing.assert_array_equal(width, [20])
+
+    def test_save_load(self):
+        x = np.stack([square(100, [(10, 20)]), square(100, [(30, 90)])])
+        index = edges.EdgeIndex([-0.5, 0.5]).feed(x)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'edges.npz')
+            index.save(path)
+            loaded = edges.EdgeIndex.load(path)
+        self.assertEqual(loaded.length, 100)
+        for ch in range(2):
+            for level in (-0.5, 0.5):
+                for rising in (True, False):
+                    np.testing.assert_array_equal(loaded.edges(ch, level, rising), index.edges(ch, level, rising))
+
+    def test_feed_after_load(self):
+        # the first sample after the split is a falling edge
+        x = square(100, [(10, 50), (60, 80)])
+        index = edges.EdgeIndex([0.0]).feed(x[None, :50])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'edges.npz')
+            index.save(path)
+            loaded = edges.EdgeIndex.load(path)
+        loaded.feed(x[None, 50:])
+        np.testing.assert_array_equal(loaded.edges(0, 0.0), [10, 60])
+        np.testing.assert_array_equal(loaded.edges(0, 0.0, rising=False), [50, 80])
+        np.testing.assert_array_equal(loaded.pulses(0, 0.0)[1], [40, 20])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import acq
+from rptools import lazy
+from board import Board, BUFF_SIZE
+
+
+class TestLazyCapture(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(wpos=100, tpos=BUFF_SIZE - 10)
+        self.rp_s = scpi.scpi('127.0.0.1', timeout=5, port=self.board.port)
+
+    def tearDown(self):
+        self.rp_s.close()
+        self.board.close()
+
+    def test_index_mapping(self):
+        acquisition = lazy.Acquisition(self.rp_s, gap=16)
+        acquisition.arm()
+        capture = acquisition.capture(timeout=1)
+        # samples are indexed oldest first, as returned by DATA?
+        ordered = [np.roll(self.board.data[ch], -101) for ch in range(2)]
+        np.testing.assert_array_equal(capture[1, :10], ordered[0][:10])
+        np.testing.assert_array_equal(capture[2, -50:], ordered[1][-50:])
+        np.testing.assert_array_equal(capture[1, BUFF_SIZE - 200:BUFF_SIZE - 100:3],
+                                      ordered[0][BUFF_SIZE - 200:BUFF_SIZE - 100:3])
+        self.assertEqual(capture[2, 12345], ordered[1][12345])
+        self.assertEqual(capture[1, -1], self.board.data[0][100])
+        # the trigger sample is stored at TPOS
+        self.assertEqual(capture.trigger, BUFF_SIZE - 111)
+        self.assertEqual(capture[1, capture.trigger], self.board.data[0][BUFF_SIZE - 10])
+        self.assertEqual(self.board.overruns, 0)
+
+    def test_cached_ranges(self):
+        acquisition = lazy.Acquisition(self.rp_s, channels=(1,), gap=16)
+        acquisition.arm()
+        capture = acquisition.capture(timeout=1)
+        capture.fetch([(1, slice(0, 10)), (1, slice(20, 30))])
+        capture[1, 5:25]
+        reads = [cmd for cmd in self.board.commands if ':DATA:STA' in cmd]
+        self.assertEqual(reads, ['ACQ:SOUR1:DATA:STA:N? 101,30'])
+        # a range across the buffer end is read with two queries
+        np.testing.assert_array_equal(capture[1, BUFF_SIZE - 101 - 5:BUFF_SIZE - 101 + 5],
+                                      self.board.data[0][(np.arange(10) - 5) % BUFF_SIZE])
+        self.assertEqual(self.board.overruns, 0)
+        acquisition.arm()
+        self.assertTrue(capture.stale)
+        self.assertRaises(RuntimeError, capture.__getitem__, (1, slice(100, 200)))
+
+    def test_post_trigger_wait(self):
+        acquisition = lazy.Acquisition(self.rp_s, decimation=64, delay=1000)
+        acquisition.arm()
+        with mock.patch.object(lazy.time, 'sleep') as sleep:
+            acquisition.capture(timeout=1)
+        sleep.assert_called_once_with((BUFF_SIZE//2 + 1000) * 64 / acq.FS)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
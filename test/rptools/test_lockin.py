@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import lockin
+
+FS   = 1e6
+FREQ = 10e3
+
+
+def tone(n, amplitude, phase, freq=FREQ):
+    return amplitude * np.cos(2 * np.pi * freq * np.arange(n) / FS + phase)
+
+
+class TestLockin(unittest.TestCase):
+
+    def test_amplitude_and_phase(self):
+        demod = lockin.Demodulator(FS, FREQ, decimation=64)
+        z = demod.process(tone(1 << 16, 0.5, 0.3))[0]
+        magnitude, phase = lockin.polar(z[20:])
+        np.testing.assert_allclose(magnitude, 0.5, rtol=1e-3)
+        np.testing.assert_allclose(phase, 0.3, atol=1e-3)
+
+    def test_blocks_are_continuous(self):
+        x = tone(50000, 1.0, -1.0) + tone(50000, 0.2, 0.5, 3 * FREQ)
+        whole = lockin.Demodulator(FS, FREQ, harmonics=(1, 3), decimation=64).process(x)
+        demod = lockin.Demodulator(FS, FREQ, harmonics=(1, 3), decimation=64)
+        # uneven block sizes, including blocks shorter than the filter
+        bounds = [0, 100, 7777, 7800, 31000, 50000]
+        parts = list(demod.stream(x[a:b] for a, b in zip(bounds[:-1], bounds[1:])))
+        np.testing.assert_allclose(np.concatenate(parts, axis=1), whole, atol=1e-9)
+        np.testing.assert_allclose(np.abs(whole[1, 20:]), 0.2, rtol=1e-3)
+        # only the table for the last block length is kept
+        self.assertEqual(demod._table[0], 50000 - 31000)
+
+    def test_silent_reference(self):
+        demod = lockin.Demodulator(FS, FREQ, decimation=64)
+        z = demod.process(tone(1 << 14, 0.5, 0.3), np.zeros(1 << 14))[0]
+        self.assertTrue(np.all(np.isfinite(z)))
+        np.testing.assert_allclose(np.angle(z[20:]), 0.3, atol=1e-3)
+
+    def test_reference_phase(self):
+        demod = lockin.Demodulator(FS, FREQ, decimation=64)
+        # the NCO frequency is off, the phase relative to the reference stays constant
+        x, ref = tone(1 << 16, 1.0, 1.2, FREQ * 1.0001), tone(1 << 16, 1.0, 0.2, FREQ * 1.0001)
+        phase = np.angle(demod.process(x, ref)[0][20:])
+        np.testing.assert_allclose(phase, 1.0, atol=1e-3)
+
+    def test_estimate_frequency(self):
+        self.assertAlmostEqual(lockin.estimate_frequency(tone(10000, 1.0, 0.0, 12345.0), FS), 12345.0, delta=5.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
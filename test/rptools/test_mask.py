@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import acq
+from rptools import mask
+
+# one sample per microsecond at decimation 125
+DEC = 125
+US  = 1e-6
+
+
+class TestMask(unittest.TestCase):
+
+    def setUp(self):
+        # limits of +-1 before and +-2 from the trigger, keep-out triangle at 10..20 us
+        self.mask = mask.Mask(upper=[(-100 * US, 1.0), (-0.5 * US, 1.0), (0, 2.0), (100 * US, 2.0)],
+                              lower=[(-100 * US, -1.0), (100 * US, -1.0)],
+                              regions=[[(10 * US, 0.0), (20 * US, 0.0), (15 * US, 0.5)]])
+
+    def test_compile(self):
+        c = self.mask.compile(200, DEC, trigger=100)
+        self.assertEqual(c.upper[50], 1.0)
+        self.assertEqual(c.upper[150], 2.0)
+        self.assertEqual(c.region_lo.shape, (1, 200))
+        self.assertAlmostEqual(c.region_lo[0, 115], 0.0)
+        self.assertAlmostEqual(c.region_hi[0, 115], 0.5)
+        self.assertAlmostEqual(c.region_hi[0, 112], 0.2)
+        self.assertTrue(np.isinf(c.region_lo[0, 50]))
+        self.assertIs(self.mask.compile(200, DEC, trigger=100), c)
+        # times follow the geometry, the same mask at a shifted trigger
+        self.assertEqual(self.mask.compile(200, DEC, trigger=40).upper[50], 2.0)
+
+    def test_batch(self):
+        captures = np.full((4, 200), -0.5)
+        captures[1, 60] = 1.5      # above the upper limit before the trigger
+        captures[2, 150] = 1.5     # allowed after the trigger
+        captures[3, 114] = 0.1     # inside the keep-out region
+        captures[3, 190] = -3.0
+        result = self.mask.test(captures, DEC, trigger=100)
+        np.testing.assert_array_equal(result.passed, [True, False, True, False])
+        np.testing.assert_array_equal(result.first, [-1, 60, -1, 114])
+        np.testing.assert_array_equal(result.count, [0, 1, 0, 2])
+        # the edges of a region belong to it
+        self.assertEqual(self.mask.test(np.zeros(200), DEC, trigger=100).count[0], 11)
+
+    def test_from_samples(self):
+        ref = np.sin(np.arange(100) / 10.0)
+        m = mask.Mask.from_samples(ref + 0.1, ref - 0.1, decimation=8, trigger=20)
+        result = m.test(np.stack([ref, ref + 0.05 * (np.arange(100) == 30), ref - 0.2]), 8, 20)
+        np.testing.assert_array_equal(result.passed, [True, True, False])
+
+    def test_screen(self):
+        screen = mask.Screen(self.mask)
+        captures = np.full((4, 200), -0.5)
+        captures[1:, 60] = 1.5
+        screen.test(captures, DEC, 100)
+        screen.test(captures[:2], DEC, 100)
+        self.assertEqual((screen.tested, screen.failed), (6, 4))
+        self.assertAlmostEqual(screen.pass_rate, 2 / 6.0)
+        self.assertEqual(screen.hits[(200, DEC, 100)][60], 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import measure
+
+
+class TestMeasure(unittest.TestCase):
+
+    def test_crossings(self):
+        x = np.array([0., 1., 0., -1., 0., 1.])
+        np.testing.assert_array_equal(measure._crossings(x, 0.5, True),  [1, 0, 0, 0, 1])
+        np.testing.assert_array_equal(measure._crossings(x, 0.5, False), [0, 1, 0, 0, 0])
+        # a sample exactly at the level counts once, on the step reaching it
+        np.testing.assert_array_equal(measure._crossings(x, 0.0, True),  [0, 0, 0, 1, 0])
+
+    def test_square_batch(self):
+        fs = 1e6
+        n = np.arange(10000)
+        # (captures, channels, samples): two periods and duty cycles
+        x = np.empty((2, 2, n.size))
+        for i, period in enumerate((100, 200)):
+            for j, duty in enumerate((0.25, 0.5)):
+                x[i, j] = np.where((n % period) < duty * period, 1.0, -1.0)
+        res = measure.measure(x, fs, which=('frequency', 'period', 'duty', 'amplitude', 'vpp'))
+        np.testing.assert_allclose(res['frequency'], [[1e4, 1e4], [5e3, 5e3]])
+        np.testing.assert_allclose(res['period'], [[1e-4, 1e-4], [2e-4, 2e-4]])
+        np.testing.assert_allclose(res['duty'], [[25, 50], [25, 50]])
+        np.testing.assert_allclose(res['amplitude'], 2.0)
+        np.testing.assert_allclose(res['vpp'], 2.0)
+
+    def test_sine_frequency(self):
+        fs = 125e6
+        x = np.sin(2 * np.pi * 1.234e6 * np.arange(16384) / fs + 0.4)
+        res = measure.measure(x, fs, which=('frequency', 'duty'))
+        self.assertAlmostEqual(res['frequency'] / 1.234e6, 1.0, places=4)
+        self.assertAlmostEqual(float(res['duty']), 50.0, delta=1.0)
+
+    def test_rise_and_fall(self):
+        # linear edges of 20 samples from 0 to 1, 10 % to 90 % takes 16 samples
+        edge = np.linspace(0, 1, 21)
+        # long levels, top and base are barely moved by the edge samples
+        flat = np.ones(10000)
+        x = np.concatenate([0 * flat, edge, flat, edge[::-1], 0 * flat])
+        res = measure.measure(x, 1e3, which=('rise', 'fall'))
+        self.assertAlmostEqual(float(res['rise']), 16e-3, delta=1e-4)
+        self.assertAlmostEqual(float(res['fall']), 16e-3, delta=1e-4)
+
+    def test_undefined_is_nan(self):
+        res = measure.measure(np.zeros((3, 100)), which=('frequency', 'duty', 'rise'))
+        for value in res.values():
+            self.assertTrue(np.isnan(value).all())
+
+    def test_unknown_measurement(self):
+        self.assertRaises(ValueError, measure.Statistics, ('vpp', 'jitter'))
+        self.assertRaises(ValueError, measure.measure, np.zeros(10), which=('freq',))
+
+
+class TestStatistics(unittest.TestCase):
+
+    def test_blocks_match_numpy(self):
+        rng = np.random.RandomState(1)
+        n = np.arange(1000)
+        blocks = []
+        for size in (5, 1, 12):
+            # square waves with random periods and levels, (captures, channels, samples)
+            period = rng.randint(20, 80, (size, 2, 1))
+            x = np.where(n % period < period // 3, 1.0, -1.0) * rng.uniform(0.5, 2, (size, 2, 1))
+            blocks.append(x + rng.normal(0, 0.01, x.shape))
+        # a DC capture leaves its frequency undefined (NaN)
+        blocks[2][4] = 0.3
+        stats = measure.Statistics(which=('vpp', 'frequency'))
+        results = [measure.measure(x, 1e6) for x in blocks]
+        for res in results:
+            stats.update(res)
+        self.assertEqual(sorted(stats.count), ['frequency', 'vpp'])
+        for key in ('vpp', 'frequency'):
+            value = np.concatenate([res[key] for res in results])
+            np.testing.assert_array_equal(stats.count[key], (~np.isnan(value)).sum(axis=0))
+            np.testing.assert_allclose(stats.mean[key], np.nanmean(value, axis=0), rtol=1e-12)
+            np.testing.assert_allclose(stats.std(key), np.nanstd(value, axis=0, ddof=1), rtol=1e-9)
+            np.testing.assert_array_equal(stats.min[key], np.nanmin(value, axis=0))
+            np.testing.assert_array_equal(stats.max[key], np.nanmax(value, axis=0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
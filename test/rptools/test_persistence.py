@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import persistence
+
+
+def nrz(bits, period, phase, n):
+    """NRZ levels of `bits` with a crossing at `phase`, linear edges of 2 samples."""
+    t = (np.arange(n) - phase) / period
+    x = 2.0 * np.asarray(bits)[np.floor(t).astype(int) % len(bits)] - 1
+    prev = 2.0 * np.asarray(bits)[(np.floor(t).astype(int) - 1) % len(bits)] - 1
+    frac = np.clip(((t % 1) * period + 1) / 2.0, 0, 1)
+    return prev + (x - prev) * frac
+
+
+class TestRecoverClock(unittest.TestCase):
+
+    def test_period_and_phase(self):
+        bits = np.random.RandomState(3).randint(0, 2, 127)
+        x = nrz(bits, 12.37, 5.2, 12000)
+        x += np.random.RandomState(4).normal(0, 0.05, x.size)
+        period, phase = persistence.recover_clock(x)
+        self.assertAlmostEqual(period, 12.37, delta=0.001)
+        self.assertAlmostEqual(phase, 5.2, delta=0.2)
+
+    def test_crossings_within_half_period(self):
+        x = np.zeros(100)
+        x[10:20] = 1
+        x[30:] = 1
+        period, phase = persistence.recover_clock(x, 0.5, period=1000.0)
+        self.assertEqual(period, 1000.0)
+        self.assertAlmostEqual(phase, 9.5)
+
+    def test_no_crossings(self):
+        self.assertRaises(ValueError, persistence.recover_clock, np.ones(100))
+
+
+class TestPersistence(unittest.TestCase):
+
+    def test_histogram(self):
+        p = persistence.Persistence(4, 2, (-1, 1))
+        p.add(np.array([[-0.5, -0.5, 0.5, 0.5], [0.5, 0.5, 0.5, 2.0]]))
+        np.testing.assert_array_equal(p.image(dtype=np.uint8), [[128, 128, 255, 128], [128, 128, 0, 0]])
+
+    def test_eye(self):
+        bits = np.random.RandomState(5).randint(0, 2, 63)
+        eye = persistence.Eye(40, 20, (-1.5, 1.5), period=10.0, level=0.0)
+        eye.add(nrz(bits, 10.0, 3.0, 5000)[None], phase=3.0)
+        img = eye.image()
+        # the crossings are at 0.5 and 1.5 unit intervals, the eye is open at 1
+        self.assertGreater(img[:, 10].sum(), 0)
+        self.assertEqual(img[8:12, 20].sum(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
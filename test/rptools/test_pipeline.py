@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import pipeline
+
+
+def peak(capture):
+    return int(np.abs(capture).max())
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_results_in_order(self):
+        captures = np.random.RandomState(0).randint(-8192, 8192, (20, 2, 1024)).astype(np.int16)
+        with pipeline.Pipeline(peak, (2, 1024), workers=2) as p:
+            self.assertEqual(p.workers, 2)
+            self.assertEqual(len(p._slots), 4)
+            for capture in captures:
+                p.submit(capture, timeout=10)
+            results = list(p.results())
+        self.assertEqual(results, [peak(c) for c in captures])
+
+    def test_slots_are_reused(self):
+        with pipeline.Pipeline(peak, (16,), slots=1, workers=1) as p:
+            first = p.submit(np.full(16, 3, dtype=np.int16), timeout=10)
+            self.assertEqual(first.result(timeout=10), 3)
+            # the single slot is released when the result is done
+            second = p.submit(np.full(16, -7, dtype=np.int16), timeout=10)
+            self.assertEqual(second.result(timeout=10), 7)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
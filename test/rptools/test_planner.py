@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import acq
+from rptools import planner
+from board import Board, BUFF_SIZE
+
+
+class TestPlan(unittest.TestCase):
+
+    def test_largest_decimation(self):
+        p = planner.plan(1e-3)
+        self.assertEqual(p.decimation, 65536)
+        self.assertTrue(p.averaging)
+        self.assertEqual(p.size, 3)
+
+    def test_points(self):
+        p = planner.plan(1e-3, points=1000)
+        self.assertEqual(p.decimation, 64)
+        self.assertEqual(p.sample_rate, acq.FS / 64)
+        self.assertEqual(p.size, 1955)
+        self.assertEqual(p.step, 1)
+        p = planner.plan(1e-4, points=100)
+        self.assertEqual((p.decimation, p.size, p.step), (64, 197, 1))
+        p = planner.plan(1e-6, points=10)
+        self.assertEqual((p.decimation, p.size, p.step), (8, 17, 1))
+
+    def test_bandwidth(self):
+        p = planner.plan(1e-3, bandwidth=1e6)
+        self.assertEqual(p.decimation, 8)
+        self.assertEqual(p.size, 15626)
+        p = planner.plan(1e-5, bandwidth=10e6)
+        self.assertEqual(p.decimation, 1)
+        self.assertFalse(p.averaging)
+
+    def test_pre_trigger(self):
+        p = planner.plan(1e-3, points=1000, pre=0.25e-3)
+        self.assertEqual(p.start, -489)
+        # the trigger delay leaves exactly the post trigger part of the window
+        self.assertEqual(p.delay + BUFF_SIZE//2, p.size - 489)
+
+    def test_impossible(self):
+        self.assertRaises(ValueError, planner.plan, 1e-3, bandwidth=50e6)
+        self.assertRaises(ValueError, planner.plan, 1.0, points=BUFF_SIZE + 1)
+        self.assertRaises(ValueError, planner.plan, 1e-3, pre=2e-3)
+
+
+class TestRead(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(tpos=5)
+        self.rp_s = scpi.scpi('127.0.0.1', timeout=5, port=self.board.port)
+
+    def tearDown(self):
+        self.rp_s.close()
+        self.board.close()
+
+    def test_read_window(self):
+        p = planner.plan(1e-4, points=50, pre=2e-5)
+        self.assertEqual(planner.apply(self.rp_s, p), '1')
+        self.assertIn('ACQ:DEC {:d}'.format(p.decimation), self.board.commands)
+        data = planner.read(self.rp_s, p, channels=(1, 2))
+        window = (np.arange(p.size) + 5 + p.start) % BUFF_SIZE
+        self.assertEqual(data.shape, (2, len(range(0, p.size, p.step))))
+        for ch in range(2):
+            np.testing.assert_array_equal(data[ch], self.board.data[ch][window][::p.step])
+        self.assertEqual(self.board.overruns, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import profiles
+from board import Board
+
+
+class TestProfiles(unittest.TestCase):
+
+    def test_snapshot(self):
+        board = Board()
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        try:
+            state = profiles.snapshot(rp_s)
+        finally:
+            rp_s.close()
+            board.close()
+        self.assertEqual(list(state), profiles.settings())
+        self.assertEqual(state['ACQ:SOUR1:GAIN'], 'LV')
+        self.assertEqual(board.commands, [cmd + '?' for cmd in profiles.settings()])
+
+    def test_diff(self):
+        current = {'SOUR1:FREQ:FIX': '1000', 'SOUR1:FUNC': 'sine', 'ACQ:DEC': '8'}
+        target = {'SOUR1:FREQ:FIX': '1000.0000001', 'SOUR1:FUNC': 'SINE', 'ACQ:DEC': '64', 'ACQ:AVG': 'ON'}
+        self.assertEqual(list(profiles.diff(current, target).items()), [('ACQ:DEC', '64'), ('ACQ:AVG', 'ON')])
+
+    def test_order(self):
+        current = {'SOUR1:VOLT': '0.2', 'SOUR1:VOLT:OFFS': '0.7'}
+        changes = {'OUTPUT1:STATE': 'ON', 'OUTPUT2:STATE': 'OFF', 'SOUR1:VOLT:OFFS': '0.1', 'SOUR1:VOLT': '0.8'}
+        # outputs off first and on last, the decreasing offset before the amplitude
+        self.assertEqual([cmd for cmd, value in profiles.order(changes, current)],
+                         ['OUTPUT2:STATE', 'SOUR1:VOLT:OFFS', 'SOUR1:VOLT', 'OUTPUT1:STATE'])
+        current['SOUR1:VOLT:OFFS'] = '0.0'
+        self.assertEqual([cmd for cmd, value in profiles.order(changes, current)][1:3],
+                         ['SOUR1:VOLT', 'SOUR1:VOLT:OFFS'])
+
+    def test_restore(self):
+        board = Board()
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        try:
+            current = {'SOUR1:FREQ:FIX': '1000', 'ACQ:DEC': '1'}
+            state = profiles.restore(rp_s, {'SOUR1:FREQ:FIX': '1000', 'ACQ:DEC': '64'}, current)
+            rp_s.txrx_txt('*OPC?')
+        finally:
+            rp_s.close()
+            board.close()
+        self.assertEqual(board.commands, ['ACQ:DEC 64', '*OPC?'])
+        self.assertEqual(state['ACQ:DEC'], '64')
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profiles.json')
+            store = profiles.Store(path)
+            store['sine'] = [('SOUR1:FUNC', 'SINE'), ('SOUR1:FREQ:FIX', '1000')]
+            store['dc'] = {'SOUR1:FUNC': 'DC'}
+            del store['dc']
+            loaded = profiles.Store(path)
+            self.assertEqual(loaded.names(), ['sine'])
+            self.assertEqual(list(loaded['sine']), ['SOUR1:FUNC', 'SOUR1:FREQ:FIX'])
+            self.assertNotIn('dc', loaded)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
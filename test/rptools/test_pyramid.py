@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+from rptools import pyramid
+
+
+class TestPyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'rec.npy')
+        # length is not a multiple of any block size
+        self.data = np.random.RandomState(1).randint(-8192, 8192, (2, 10000)).astype(np.int16)
+        np.save(self.path, self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check_levels(self, p):
+        x = self.data.astype(np.float64)
+        for level in range(len(p.levels)):
+            step = p.step(level)
+            rows = np.asarray(p.levels[level])
+            self.assertEqual(len(rows), -(-x.shape[1] // step))
+            for e in (0, len(rows) // 2, len(rows) - 1):
+                block = x[:, e * step:(e + 1) * step]
+                np.testing.assert_array_equal(rows[e, :, 0], block.min(axis=1))
+                np.testing.assert_array_equal(rows[e, :, 1], block.max(axis=1))
+                # means of partial blocks are weighted by their sample counts
+                np.testing.assert_allclose(rows[e, :, 2], block.mean(axis=1), rtol=1e-5, atol=1e-3)
+        self.assertEqual(len(p.levels[-1]), 1)
+
+    def test_build(self):
+        p = pyramid.build(self.path, base=64, factor=4)
+        self.assertEqual(len(p.levels), 5)
+        self.check_levels(p)
+
+    def test_incremental(self):
+        builder = pyramid.Builder(self.path, 2, fs=1e3, base=64, factor=4)
+        for a in range(0, 10000, 999):
+            builder.feed(self.data[:, a:a + 999])
+        builder.close()
+        p = pyramid.Pyramid(self.path)
+        self.assertEqual(p.length, 10000)
+        self.check_levels(p)
+
+    def test_view(self):
+        p = pyramid.build(self.path, fs=1e3, base=64, factor=4)
+        # a 10 s window on 100 pixels uses 64 sample entries
+        view = p.view(0, 10, 100)
+        self.assertEqual((view.start, view.step), (0, 64))
+        self.assertEqual(view.min.shape, (2, 157))
+        # zoomed in beyond the base level, samples of the recording are returned
+        view = p.view(1.0, 1.05, 100)
+        self.assertEqual((view.start, view.step), (1000, 1))
+        np.testing.assert_array_equal(view.mean, self.data[:, 1000:1050])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import segmented
+from board import Board, BUFF_SIZE
+
+
+class TestSegmented(unittest.TestCase):
+
+    def tearDown(self):
+        self.rp_s.close()
+        self.board.close()
+
+    def acquire(self, board, *args, **kwargs):
+        self.board = board
+        self.rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        return segmented.acquire(self.rp_s, *args, **kwargs)
+
+    def test_window_across_buffer_end(self):
+        out = self.acquire(Board(tpos=5), 3, 20, 30, channels=(1, 2), timeout=1)
+        self.assertEqual(out.shape, (3, 2, 50))
+        window = (np.arange(50) + 5 - 20) % BUFF_SIZE
+        for ch in range(2):
+            np.testing.assert_array_equal(out[:, ch], np.tile(self.board.data[ch][window], (3, 1)))
+        self.assertEqual(self.board.overruns, 0)
+        # re-armed after the data queries of all but the last segment
+        self.assertEqual(self.board.commands.count('ACQ:START'), 3)
+        self.assertIn('ACQ:TRIG:DLY {:d}'.format(30 - BUFF_SIZE//2), self.board.commands)
+
+    def test_invalid_window(self):
+        self.board = Board()
+        self.rp_s = scpi.scpi('127.0.0.1', timeout=5, port=self.board.port)
+        self.assertRaises(ValueError, segmented.acquire, self.rp_s, 1, BUFF_SIZE, 1)
+
+    def test_trigger_timeout(self):
+        self.assertRaises(TimeoutError, self.acquire, Board(triggered=False), 1, 10, 10, timeout=0.2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import sequence
+from board import Board
+
+
+class TestCompile(unittest.TestCase):
+
+    def test_changes_only(self):
+        seq = sequence.Sequence()
+        seq.set(1, func='SINE', freq=1e3, volt=0.5, output=True)
+        seq.wait(0.01).set(1, freq=1e3, volt=0.5)
+        seq.wait(0.01).set(1, freq=2e3)
+        steps = seq.compile()
+        self.assertEqual([s.time for s in steps], [0.0, 0.02])
+        # outputs are switched on after the other settings
+        self.assertEqual(steps[0].cmds, ['SOUR1:FUNC SINE', 'SOUR1:FREQ:FIX 1000.0', 'SOUR1:VOLT 0.5', 'OUTPUT1:STATE ON'])
+        self.assertEqual(steps[1].cmds, ['SOUR1:FREQ:FIX 2000.0'])
+        self.assertEqual(steps[1].payload, b'SOUR1:FREQ:FIX 2000.0\r\n')
+        # settings equal to the state before the start are dropped
+        steps = seq.compile({'SOUR1:FUNC': 'SINE', 'SOUR1:FREQ:FIX': '1000', 'SOUR1:VOLT': '0.5'})
+        self.assertEqual(steps[0].cmds, ['OUTPUT1:STATE ON'])
+
+    def test_bursts(self):
+        seq = sequence.Sequence()
+        seq.burst(2, cycles=10, repetitions=3, period=5e-3, source='EXT_PE').trigger(2)
+        seq.wait(0.1).set(2, source='EXT_PE').trigger(2)
+        steps = seq.compile()
+        self.assertEqual(steps[0].cmds[-1], 'SOUR2:TRIG:IMM')
+        self.assertIn('SOUR2:BURS:INT:PER 5000', steps[0].cmds)
+        # triggering switched the source to INT, it is written again
+        self.assertEqual(steps[1].cmds, ['SOUR2:TRIG:SOUR EXT_PE', 'SOUR2:TRIG:IMM'])
+        self.assertEqual(seq.duration, 0.1)
+
+    def test_validate(self):
+        seq = sequence.Sequence()
+        self.assertRaises(ValueError, seq.set, 3, volt=0.1)
+        self.assertRaises(TypeError, seq.set, 1, amplitude=0.1)
+        self.assertRaises(ValueError, seq.set, 1, func='NOISE')
+        self.assertRaises(ValueError, seq.set, 1, volt=1.5)
+        self.assertRaises(ValueError, seq.burst, 1, cycles=0)
+        self.assertRaises(ValueError, seq.burst, 1, cycles=1, period=1e3)
+        self.assertRaises(ValueError, seq.at, -1)
+
+    def test_amplitude_with_offset(self):
+        seq = sequence.Sequence().set(1, volt=0.6, offset=-0.4)
+        self.assertRaises(ValueError, seq.wait(0.1).set, 1, offset=0.5)
+        # the rejected setting is not kept
+        self.assertEqual(seq.compile()[-1].cmds, ['SOUR1:VOLT 0.6', 'SOUR1:VOLT:OFFS -0.4'])
+        self.assertRaises(ValueError, sequence.Sequence().set(2, volt=0.6).compile, {'SOUR2:VOLT:OFFS': '0.5'})
+        sequence.Sequence().set(2, volt=0.5).compile({'SOUR2:VOLT:OFFS': '0.5'})
+
+
+class TestRun(unittest.TestCase):
+
+    def test_run(self):
+        board = Board()
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=board.port)
+        try:
+            seq = sequence.Sequence().set(1, func='SQUARE', volt=0.2)
+            for k in range(5):
+                seq.wait(0.01).set(1, freq=1e3 * (k + 1))
+            report = seq.run(rp_s)
+        finally:
+            rp_s.close()
+            board.close()
+        self.assertEqual([c for c in board.commands if c.startswith('SOUR1:FREQ')],
+                         ['SOUR1:FREQ:FIX {!r}'.format(1e3 * (k + 1)) for k in range(5)])
+        self.assertEqual(board.commands[-1], '*OPC?')
+        self.assertEqual(len(report.sent), 6)
+        self.assertTrue((report.error >= 0).all())
+        self.assertLess(report.worst, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
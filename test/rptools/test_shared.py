@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import concurrent.futures
+import threading
+import time
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+sys.path.insert(0, os.path.dirname(__file__))
+import redpitaya_scpi as scpi
+from rptools import shared
+from board import Board
+
+
+class TestConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(tpos=1234)
+        self.conn = shared.Connection(scpi.scpi('127.0.0.1', timeout=5, port=self.board.port))
+
+    def tearDown(self):
+        self.conn.close()
+        self.board.close()
+
+    def test_concurrent_clients(self):
+        errors = []
+
+        def client(k):
+            try:
+                for i in range(50):
+                    start = 100 * k + i
+                    # each reply is known from the query, a mismatch shows crossed replies
+                    tpos, block = self.conn.batch([('ACQ:TRIG:LEV 0.1', None), ('ACQ:TPOS?', shared.TXT),
+                                                   ('ACQ:SOUR1:DATA:STA:N? {:d},3'.format(start), shared.ARB)]).result(5)
+                    assert tpos == '1234', tpos
+                    assert np.frombuffer(block, '>i2').tolist() == [start, start + 1, start + 2], (k, i)
+                    data = self.conn.query_arb('ACQ:SOUR2:DATA:STA:N? {:d},1'.format(start)).result(5)
+                    assert np.frombuffer(data, '>i2')[0] == self.board.data[1][start], (k, i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=client, args=(k,)) for k in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.board.commands.count('ACQ:TPOS?'), 400)
+
+    def test_write_and_close(self):
+        done = self.conn.write('ACQ:START', 'ACQ:TRIG NOW')
+        status = self.conn.query('ACQ:TRIG:STAT?')
+        self.assertEqual(done.result(5), [])
+        self.assertEqual(self.conn.txrx_txt('ACQ:WPOS?', 5), str(self.board.wpos))
+        self.conn.close()
+        self.assertEqual(status.result(0), 'TD')
+        self.assertRaises(RuntimeError, self.conn.query, 'ACQ:TPOS?')
+
+
+class Silent(Board):
+    """Board that never answers *WAI?."""
+
+    def reply(self, cmd):
+        return None if cmd == '*WAI?' else Board.reply(self, cmd)
+
+
+class TestClose(unittest.TestCase):
+
+    def test_close_timeout(self):
+        board = Silent()
+        conn = shared.Connection(scpi.scpi('127.0.0.1', port=board.port))
+        try:
+            first = conn.query('ACQ:TPOS?')
+            lost = conn.query('*WAI?')
+            start = time.monotonic()
+            conn.close(timeout=0.2)
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertEqual(first.result(0), str(board.tpos))
+            self.assertRaises(TimeoutError, lost.result, 0)
+        finally:
+            board.close()
+
+    def test_submit_while_closing(self):
+        board = Board()
+        conn = shared.Connection(scpi.scpi('127.0.0.1', timeout=5, port=board.port))
+        futures = []
+
+        def client():
+            try:
+                while True:
+                    futures.append(conn.query('ACQ:TPOS?'))
+            except RuntimeError:
+                pass
+
+        threads = [threading.Thread(target=client) for k in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        conn.close()
+        for t in threads:
+            t.join()
+        board.close()
+        # every accepted request completes
+        done, not_done = concurrent.futures.wait(futures, timeout=5)
+        self.assertEqual(len(not_done), 0)
+        self.assertTrue(all(f.result() == str(board.tpos) for f in done))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
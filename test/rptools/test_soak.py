@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+import math
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+import redpitaya_scpi as scpi
+from rptools import acq
+from rptools import soak
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        hist = soak.Histogram()
+        for i in range(1, 1001):
+            hist.add(i * 1e-5)
+        self.assertEqual(hist.count, 1000)
+        self.assertEqual(hist.max, 1e-2)
+        for q in (50, 90, 99):
+            self.assertAlmostEqual(hist.percentile(q) / (q * 1e-4), 1.0, delta=0.05)
+        self.assertEqual(hist.percentile(100), 1e-2)
+
+    def test_merge_and_range(self):
+        a, b = soak.Histogram(), soak.Histogram()
+        a.add(1e-9)
+        b.add(1e6)
+        a.merge(soak.Histogram()).merge(b)
+        self.assertEqual((a.count, a.max), (2, 1e6))
+        self.assertEqual(a.counts[0], 1)
+        self.assertEqual(a.counts[-1], 1)
+        # empty histograms have no percentiles
+        self.assertTrue(math.isnan(soak.Histogram().percentile(50)))
+
+
+class TestSoak(unittest.TestCase):
+
+    def setUp(self):
+        self.server = soak.StandIn(size=1024).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stand_in(self):
+        rp_s = scpi.scpi('127.0.0.1', timeout=5, port=self.server.port)
+        try:
+            rp_s.tx_batch(['ACQ:START', 'ACQ:TRIG:STAT?', acq.data_cmds(1)[0], '*OPC?'])
+            self.assertEqual(rp_s.rx_txt(), 'TD')
+            self.assertEqual(len(rp_s.rx_arb()), 2048)
+            self.assertEqual(rp_s.rx_txt(), '1')
+            # the trigger wait of the acquisition helpers returns at once
+            self.assertTrue(acq.wait_trigger(rp_s, 1))
+        finally:
+            rp_s.close()
+
+    def test_run(self):
+        run = soak.Soak('127.0.0.1', self.server.port, clients=3, timeout=2).run(0.5)
+        summary = run.summary()
+        self.assertEqual(summary['errors'] + summary['timeouts'], 0)
+        self.assertGreater(summary['operations'], 3)
+        self.assertEqual(sum(summary[name]['count'] for name in soak.MIX if name in summary), summary['operations'])
+        self.assertEqual(sum(row['operations'] for row in run.client_summary()), summary['operations'])
+        self.assertLessEqual(summary['query']['p50'], summary['query']['max'])
+
+    def test_timeouts(self):
+        self.server.delay = 0.3
+        summary = soak.Soak('127.0.0.1', self.server.port, clients=2, mix={'query': 1}, timeout=0.1).run(0.5).summary()
+        self.assertGreater(summary['timeouts'], 0)
+        self.assertEqual(summary['operations'], 0)
+
+    def test_connect_errors(self):
+        # a port nobody listens on
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        rp_s = scpi.scpi('127.0.0.1', timeout=1, port=port)
+        self.assertFalse(rp_s.connected)
+        self.assertIsInstance(rp_s.error, ConnectionRefusedError)
+        summary = soak.Soak('127.0.0.1', port, clients=1, timeout=1).run(0.3).summary()
+        self.assertGreater(summary['errors'], 0)
+        self.assertEqual(summary['operations'], 0)
+        rp_s = scpi.scpi('127.0.0.1', timeout=1, port=self.server.port)
+        self.assertTrue(rp_s.connected)
+        rp_s.close()
+        self.assertFalse(rp_s.connected)
+
+    def test_unknown_operation(self):
+        self.assertRaises(ValueError, soak.Soak, '127.0.0.1', mix={'dance': 1})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Examples', 'python'))
+import redpitaya_scpi as scpi
+from rptools import trace
+
+PAYLOAD = bytes(range(256)) * 128
+
+
+class _Server(socketserver.BaseRequestHandler):
+    """Minimal stand-in for the SCPI server."""
+
+    def handle(self):
+        buf = b''
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            *cmds, buf = (buf + data).split(b'\r\n')
+            for cmd in cmds:
+                if cmd == b'*IDN?':
+                    time.sleep(0.05)
+                    self.request.sendall(b'REDPITAYA,INSTR2014,0,01-02\r\n')
+                elif cmd == b'ACQ:SOUR1:DATA?':
+                    self.request.sendall(b'#5' + str(len(PAYLOAD)).encode() + PAYLOAD + b'\r\n')
+
+
+def session(port):
+    return scpi.scpi('127.0.0.1', timeout=5, port=port)
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _Server)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+        rp_s = trace.record(session(self.server.server_address[1]), self.path)
+        rp_s.tx_batch(['OUTPUT1:STATE ON', '*IDN?', 'ACQ:SOUR1:DATA?'])
+        self.idn  = rp_s.rx_txt()
+        self.data = rp_s.rx_arb()
+        rp_s.close()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        os.remove(self.path)
+
+    def replay(self, timing):
+        server = trace.ReplayServer(self.path, timing=timing).start()
+        try:
+            rp_s = session(server.port)
+            start = time.monotonic()
+            self.assertEqual(rp_s.txrx_txt('*IDN?'), self.idn)
+            elapsed = time.monotonic() - start
+            rp_s.tx_txt('OUTPUT1:STATE ON')
+            rp_s.tx_txt('ACQ:SOUR1:DATA?')
+            self.assertEqual(bytes(rp_s.rx_arb()), PAYLOAD)
+            rp_s.close()
+            self.assertEqual(server.mismatches, 0)
+        finally:
+            server.shutdown()
+            server.server_close()
+        return elapsed
+
+    def test_replies(self):
+        script = trace.replies(trace.load(self.path))
+        self.assertEqual([q for q, reply, delay in script], [b'*IDN?', b'ACQ:SOUR1:DATA?'])
+        self.assertEqual(bytes(self.data), PAYLOAD)
+        self.assertGreaterEqual(script[0][2], 0.05)
+
+    def test_replay(self):
+        self.assertLess(self.replay(False), 0.05)
+        self.assertGreaterEqual(self.replay(True), 0.05)
+
+    def test_server_is_abstract(self):
+        # the base class has no replies, servers have to provide them
+        self.assertRaises(TypeError, trace.Server)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)